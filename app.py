@@ -3,6 +3,7 @@ import base64
 import sys
 import os
 import pickle
+import shutil
 from datetime import datetime
 from pathlib import Path
 
@@ -10,10 +11,42 @@ from pathlib import Path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from dataset import load_documents
-from preprocessing import preprocess_kumpulan_dokumen, preprocess_query_pengguna
+from dataset import DatasetManager, diff_manifest
+from preprocessing import (
+    preprocess_stream, preprocess_query_pengguna,
+    load_stem_cache, save_stem_cache, get_stem_cache_stats
+)
 from retrieval import build_index, search
-from evaluation import evaluate_system, auto_save_evaluation
+from index_store import IndexWriter, load_index, append_to_index
+from positional_index import positional_scores, parse_phrase_query
+from boolean_query import search_boolean, is_boolean_query
+from rerank import RerankPipeline
+from query_cache import QueryResultCache, cached_search, cached_ranking, ranking_entry, rank_scores
+from shared_index import SharedIndex
+from evaluation import evaluate_system, auto_save_evaluation, get_evaluation_store
+import metrics
+
+# Jumlah worker preprocessing (None = semua core, 1 = serial)
+PREPROCESS_WORKERS = None
+
+# Jumlah thread untuk membaca file dokumen secara concurrent
+LOAD_WORKERS = 8
+
+# Jumlah dokumen per chunk saat streaming dokumen ke preprocessing & index
+STREAM_CHUNK_SIZE = 1000
+
+# Scorer ranking: "tfidf" (cosine similarity) atau "bm25" (skor ternormalisasi 0-1)
+SCORER = os.environ.get("DOUGGLE_SCORER", "tfidf")
+
+# Positional index untuk "phrase query" dan proximity boost, DOUGGLE_POSITIONAL=1 untuk mengaktifkan
+# (tanpa positional index, frasa dicocokkan sebagai kata biasa)
+POSITIONAL = os.environ.get("DOUGGLE_POSITIONAL", "0") == "1"
+# Proximity boost untuk query tanpa kutip dengan lebih dari satu term, DOUGGLE_PROXIMITY=1 untuk mengaktifkan
+PROXIMITY = os.environ.get("DOUGGLE_PROXIMITY", "0") == "1"
+
+# Search dua tahap (top-N cosine lalu rerank BM25F/proximity/panjang), DOUGGLE_RERANK=1 untuk mengaktifkan
+RERANK = os.environ.get("DOUGGLE_RERANK", "0") == "1"
+RERANK_CANDIDATES = int(os.environ.get("DOUGGLE_RERANK_CANDIDATES", 100))
 
 # =====================
 # Page Config
@@ -34,6 +67,10 @@ def load_base64_image(path: str) -> str:
             return base64.b64encode(f.read()).decode()
     return ""
 
+# Histogram metrics (nama, keterangan) untuk I/O cache di app.py
+CACHE_METRIC = ("douggle_cache_io_seconds", "Durasi baca/tulis cache di app.py")
+
+@metrics.timed(*CACHE_METRIC, op="save_pickle")
 def save_to_cache(data, filename):
     """Save data to cache folder"""
     cache_dir = os.path.join(current_dir, "cache")
@@ -43,6 +80,7 @@ def save_to_cache(data, filename):
         pickle.dump(data, f)
     return cache_path
 
+@metrics.timed(*CACHE_METRIC, op="load_pickle")
 def load_from_cache(filename):
     """Load data from cache folder"""
     cache_path = os.path.join(current_dir, "cache", filename)
@@ -51,17 +89,34 @@ def load_from_cache(filename):
             return pickle.load(f)
     return None
 
-def check_cache_valid(raw_docs):
-    """Check if cache is valid by comparing document count"""
-    cache_count = load_from_cache("doc_count.pkl")
-    current_count = len(raw_docs) if raw_docs else 0
-    return cache_count == current_count
+def get_stem_cache_path():
+    """Path kamus stem persisten di folder cache"""
+    return os.path.join(current_dir, "cache", "stem_cache.pkl")
+
+def get_index_dir():
+    """Folder index biner (memory-mapped) di folder cache"""
+    return os.path.join(current_dir, "cache", "index")
+
+@st.cache_resource
+def get_query_cache():
+    """Cache hasil search yang dipakai bersama oleh semua session di proses ini"""
+    return QueryResultCache(max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=600)
 
 # =====================
 # Auto-Load System dengan Cache
 # =====================
-def auto_load_system(folder_path="data"):
-    """Auto-load system dengan cache mechanism"""
+def auto_load_system(folder_path="data", scorer=SCORER):
+    """
+    Auto-load system dengan cache mechanism.
+    Manifest (path, mtime, size, hash per dokumen) dipakai untuk re-index incremental:
+    hanya dokumen baru/berubah yang dipreprocess ulang, lalu TF-IDF di-fit ulang
+    dari teks hasil preprocessing yang tersimpan di cache.
+    Dokumen di-stream per chunk (dibaca, dipreprocess, ditulis ke index) sehingga
+    memori tidak bergantung pada ukuran corpus. Index disimpan dalam format biner
+    (index_store) dan dibuka dengan np.memmap. Dengan scorer "hashing", jika file lama
+    tidak berubah dan hanya ada file baru, dokumen baru ditempel lewat append_to_index
+    tanpa fit ulang.
+    """
     
     # Gunakan absolute path
     data_folder = os.path.join(current_dir, folder_path)
@@ -71,63 +126,190 @@ def auto_load_system(folder_path="data"):
         os.makedirs(data_folder, exist_ok=True)
         return False, f"📁 Folder 'data' dibuat di: {data_folder}\nSilakan tambahkan file .txt"
     
-    # Load raw documents
-    raw_docs = load_documents(data_folder)
+    manager = DatasetManager(folder_path=data_folder)
+    message = manager.check_folder()
+    if message is not None:
+        return False, f"❌ Error: {message}"
     
-    if isinstance(raw_docs, str):
-        return False, f"❌ Error: {raw_docs}"
+    # Muat kamus stem supaya kata yang sudah pernah di-stem tidak diproses ulang
+    with metrics.timer(*CACHE_METRIC, op="load_stem_cache"):
+        load_stem_cache(get_stem_cache_path())
     
-    if not raw_docs:
-        return False, f"🔭 Folder 'data' kosong: {data_folder}\nTambahkan file .txt"
+    with metrics.timer(*CACHE_METRIC, op="load_index"):
+        index = load_index(get_index_dir())
+    old_manifest = load_from_cache("manifest.pkl") if index is not None else None
+    old_file_stats = load_from_cache("file_stats.pkl") if index is not None else None
     
-    # Simpan jumlah dokumen untuk cache validation
-    doc_count = len(raw_docs)
-    save_to_cache(doc_count, "doc_count.pkl")
+    # Cek cepat: mtime & size semua file sama -> index dipakai tanpa membaca isi dokumen
+    file_stats = manager.stat_files()
+    reusable = (index is not None and old_manifest is not None and old_file_stats is not None
+                and index["manifest"]["scorer"] == scorer
+                and (index["positions"] is not None) == POSITIONAL)
+    if reusable and old_file_stats == file_stats:
+        changes = diff_manifest(old_manifest, old_manifest)
+        index.update({"from_cache": True, "changes": changes})
+        return True, index
     
-    # Cek cache
-    processed_docs = load_from_cache("processed_docs.pkl")
-    vectorizer = load_from_cache("vectorizer.pkl")
-    doc_vectors = load_from_cache("doc_vectors.pkl")
-    
-    # Jika cache tidak valid atau tidak ada, process ulang
-    if not processed_docs or not vectorizer or not check_cache_valid(raw_docs):
-        # Preprocess
-        raw_documents = list(raw_docs.values())
-        document_ids = list(raw_docs.keys())
-        
-        processed_docs = preprocess_kumpulan_dokumen(raw_documents)
-        save_to_cache(processed_docs, "processed_docs.pkl")
-        
-        # Build index
-        vectorizer, doc_vectors = build_index(processed_docs)
-        save_to_cache(vectorizer, "vectorizer.pkl")
-        save_to_cache(doc_vectors, "doc_vectors.pkl")
+    # Scorer hashing & hanya ada file baru: tempel dokumen baru, index lama tidak dibangun ulang
+    if (reusable and scorer == "hashing"
+            and all(file_stats.get(name) == stat for name, stat in old_file_stats.items())):
+        new_stats = {name: file_stats[name] for name in file_stats if name not in old_file_stats}
+        manifest = dict(old_manifest)
+        new_ids, new_texts = [], []
+        for doc_id, text in manager.iter_documents(n_workers=LOAD_WORKERS, file_stats=new_stats):
+            manifest[doc_id] = manager.manifest_entry(doc_id, text, file_stats[doc_id])
+            new_ids.append(doc_id)
+            new_texts.append(text)
+        if new_ids:
+            new_processed = [processed for _, processed in preprocess_stream(
+                zip(new_ids, new_texts), chunk_size=STREAM_CHUNK_SIZE, n_workers=PREPROCESS_WORKERS)]
+            with metrics.timer(*CACHE_METRIC, op="append_index"):
+                append_to_index(get_index_dir(), new_ids, new_texts, new_processed)
+        save_to_cache(manifest, "manifest.pkl")
+        save_to_cache(file_stats, "file_stats.pkl")
+        with metrics.timer(*CACHE_METRIC, op="save_stem_cache"):
+            save_stem_cache(get_stem_cache_path())
         
-        # Simpan raw data juga
-        save_to_cache(raw_documents, "raw_documents.pkl")
-        save_to_cache(document_ids, "document_ids.pkl")
-        
-        return True, {
-            "raw_documents": raw_documents,
-            "document_ids": document_ids,
-            "processed_documents": processed_docs,
-            "vectorizer": vectorizer,
-            "doc_vectors": doc_vectors,
-            "from_cache": False
-        }
+        changes = diff_manifest(old_manifest, manifest)
+        with metrics.timer(*CACHE_METRIC, op="load_index"):
+            index = load_index(get_index_dir())
+        index.update({"from_cache": False, "changes": changes})
+        return True, index
+    
+    # Streaming: baca -> manifest -> preprocess (hanya yang baru/berubah) -> index
+    old_positions = {}
+    if index is not None:
+        old_positions = {doc_id: i for i, doc_id in enumerate(index["document_ids"])}
+    manifest = {}
+    writer = IndexWriter(get_index_dir())
+    id_writer = writer.strings("document_ids")
+    raw_writer = writer.strings("raw_documents")
+    processed_writer = writer.strings("processed_documents")
+    # Data snippet & posisi dokumen yang tidak berubah disalin dari index lama lewat add_from()
+    old_snippets = index["snippets"] if index is not None else None
+    old_positional = index["positions"] if index is not None else None
+    snippet_writer = writer.snippets(base=old_snippets, n_base_docs=0)
+    position_writer = writer.positions(base=old_positional) if POSITIONAL else None
+    # Teks mentah menunggu hasil preprocessing-nya (paling banyak satu chunk stream)
+    pending_texts = {}
+    
+    def read_documents():
+        # Metadata file dari scan yang sama dengan file_stats, bukan os.stat ulang per dokumen
+        for doc_id, text in manager.iter_documents(n_workers=LOAD_WORKERS, file_stats=file_stats):
+            manifest[doc_id] = manager.manifest_entry(doc_id, text, file_stats[doc_id])
+            id_writer.append(doc_id)
+            raw_writer.append(text)
+            pending_texts[doc_id] = text
+            yield doc_id, text
+    
+    def old_document(doc_id):
+        # Posisi dokumen di index lama jika hash isinya sama, None jika baru/berubah
+        old_entry = (old_manifest or {}).get(doc_id)
+        if old_entry is None or old_entry["hash"] != manifest[doc_id]["hash"]:
+            return None
+        return old_positions.get(doc_id)
+    
+    def reuse_processed(doc_id, text):
+        # Teks hasil preprocessing lama dipakai ulang jika hash isi dokumen sama
+        old_index = old_document(doc_id)
+        if old_index is None:
+            return None
+        return index["processed_documents"][old_index]
+    
+    def processed_documents():
+        for doc_id, processed in preprocess_stream(read_documents(), chunk_size=STREAM_CHUNK_SIZE,
+                                                   n_workers=PREPROCESS_WORKERS,
+                                                   lookup=reuse_processed):
+            processed_writer.append(processed)
+            text = pending_texts.pop(doc_id)
+            old_index = old_document(doc_id)
+            if old_index is not None:
+                snippet_writer.add_from(old_index)
+            else:
+                # Posisi term dihitung setelah preprocessing, saat stem kata sudah ada di stem_cache
+                snippet_writer.add(text)
+            if position_writer is not None:
+                if old_index is not None and old_positional is not None:
+                    position_writer.add_from(old_index)
+                else:
+                    position_writer.add(processed)
+            yield processed
+    
+    try:
+        # Build index (fit ulang, dokumen dikonsumsi satu per satu dari stream)
+        vectorizer, doc_vectors = build_index(processed_documents(), scorer=scorer)
+    except ValueError:
+        writer.abort()
+        if not manifest:
+            return False, f"🔭 Folder 'data' kosong: {data_folder}\nTambahkan file .txt"
+        raise
+    
+    # Simpan index biner dan manifest, lalu buka ulang lewat memmap
+    with metrics.timer(*CACHE_METRIC, op="save_index"):
+        writer.commit(vectorizer, doc_vectors)
+    save_to_cache(manifest, "manifest.pkl")
+    save_to_cache(file_stats, "file_stats.pkl")
+    with metrics.timer(*CACHE_METRIC, op="save_stem_cache"):
+        save_stem_cache(get_stem_cache_path())
+    
+    changes = diff_manifest(old_manifest, manifest)
+    with metrics.timer(*CACHE_METRIC, op="load_index"):
+        index = load_index(get_index_dir())
+    index.update({"from_cache": False, "changes": changes})
+    return True, index
+
+def load_shared_system():
+    """
+    Loader untuk SharedIndex: memuat sistem sekali untuk seluruh proses,
+    menyusun pesan status, dan membuang hasil search dari index versi lama.
+    """
+    success, result = auto_load_system("data")
+    if not success:
+        return False, result
+    
+    changes = result["changes"]
+    if result["from_cache"]:
+        cache_status = " (from cache)"
+    elif changes["unchanged"]:
+        cache_status = (f" (incremental: +{len(changes['added'])} baru, "
+                        f"{len(changes['changed'])} berubah, {len(changes['removed'])} dihapus)")
     else:
-        # Load dari cache
-        raw_documents = load_from_cache("raw_documents.pkl")
-        document_ids = load_from_cache("document_ids.pkl")
-        
-        return True, {
-            "raw_documents": raw_documents,
-            "document_ids": document_ids,
-            "processed_documents": processed_docs,
-            "vectorizer": vectorizer,
-            "doc_vectors": doc_vectors,
-            "from_cache": True
-        }
+        cache_status = " (fresh load)"
+    result["load_message"] = f"✅ Sistem siap! {len(result['document_ids'])} dokumen{cache_status}"
+    get_query_cache().invalidate(keep_version=result["index_version"])
+    return True, result
+
+def clear_index_cache():
+    """Hapus index dan manifest di cache sehingga load berikutnya membangun ulang index"""
+    shutil.rmtree(get_index_dir(), ignore_errors=True)
+    for file in ["manifest.pkl", "file_stats.pkl"]:
+        cache_path = os.path.join(current_dir, "cache", file)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+    get_query_cache().invalidate()
+
+@st.cache_resource
+def get_shared_index():
+    """Index read-only yang dipakai bersama oleh semua session di proses ini"""
+    return SharedIndex(load_shared_system)
+
+@st.cache_resource
+def get_rerank_pipeline():
+    """Pipeline retrieve-then-rerank yang dipakai bersama oleh semua session"""
+    return RerankPipeline(n_candidates=RERANK_CANDIDATES)
+
+def cached_positional_search(data, query, processed_query, phrases, k=10, min_score=0.0):
+    """
+    Phrase query / proximity boost lewat positional index, dengan ranking di query cache.
+    Key memuat mode "positional" dan frasanya, sehingga tidak tertukar dengan search biasa.
+    """
+    def rank(max_results):
+        scores = positional_scores(query, data["vectorizer"], data["doc_vectors"], data["positions"])
+        return ranking_entry(*rank_scores(scores, max_results))
+
+    key = (processed_query, data["manifest"]["scorer"], data["index_version"], "positional",
+           tuple(tuple(phrase) for phrase in phrases))
+    return cached_ranking(get_query_cache(), key, rank, k, min_score)
 
 # =====================
 # Global CSS (MATCH NEW DESIGN)
@@ -202,6 +384,10 @@ st.markdown("""
     color: #333;
     line-height: 1.5;
 }
+.result-snippet mark {
+    background-color: #fff3b0;
+    padding: 0 2px;
+}
 
 /* Sidebar styling */
 [data-testid="stSidebar"] {
@@ -217,20 +403,22 @@ if 'system_loaded' not in st.session_state:
     st.session_state.system_loaded = False
     st.session_state.system_data = None
     st.session_state.load_message = ""
+    st.session_state.index_generation = None
 
 # =====================
 # Auto-Load pada Startup
 # =====================
-if not st.session_state.system_loaded:
-    success, result = auto_load_system("data")
-    
-    if success:
-        st.session_state.system_loaded = True
-        st.session_state.system_data = result
-        cache_status = " (from cache)" if result["from_cache"] else " (fresh load)"
-        st.session_state.load_message = f"✅ Sistem siap! {len(result['document_ids'])} dokumen{cache_status}"
-    else:
-        st.session_state.load_message = result
+# Index dimuat sekali per proses; session hanya menyimpan referensi ke index bersama
+success, result, generation = get_shared_index().get()
+st.session_state.index_generation = generation
+if success:
+    st.session_state.system_loaded = True
+    st.session_state.system_data = result
+    st.session_state.load_message = result["load_message"]
+else:
+    st.session_state.system_loaded = False
+    st.session_state.system_data = None
+    st.session_state.load_message = result
 
 # =====================
 # Sidebar
@@ -252,20 +440,46 @@ with st.sidebar:
         with col2:
             st.metric("Vocabulary", len(data["vectorizer"].get_feature_names_out()))
         
+        stem_stats = get_stem_cache_stats()
+        st.caption(f"Stem cache: {stem_stats['hits']} hits • {stem_stats['misses']} misses "
+                   f"• hit rate {stem_stats['hit_rate']:.1%} • {stem_stats['size']} kata")
+        query_stats = get_query_cache().stats()
+        st.caption(f"Query cache: {query_stats['hits']} hits • {query_stats['misses']} misses "
+                   f"• {query_stats['entries']} entri")
+        
         # Reload Button
         if st.button("🔄 Force Reload Documents"):
-            # Clear cache
-            cache_files = ["processed_docs.pkl", "vectorizer.pkl", "doc_vectors.pkl", 
-                          "raw_documents.pkl", "document_ids.pkl", "doc_count.pkl"]
-            cache_dir = os.path.join(current_dir, "cache")
-            for file in cache_files:
-                cache_path = os.path.join(cache_dir, file)
-                if os.path.exists(cache_path):
-                    os.remove(cache_path)
-            
-            st.session_state.system_loaded = False
+            # Clear cache lalu load ulang sekali; index baru ditukar secara atomik
+            # untuk semua session (klik bersamaan dari session lain tidak me-reload lagi)
+            get_shared_index().reload(seen_generation=st.session_state.index_generation,
+                                      before_load=clear_index_cache)
             st.rerun()
         
+        # Metrics Section
+        st.markdown("---")
+        st.markdown("### ⏱️ Metrics")
+        metrics_on = st.toggle("Catat timing per tahap", value=metrics.is_enabled(),
+                               help="Bisa juga diaktifkan sejak startup dengan DOUGGLE_METRICS=1")
+        if metrics_on:
+            metrics.enable()
+        else:
+            metrics.disable()
+        
+        metric_summary = metrics.summary()
+        if metric_summary["timers"] or metric_summary["counters"]:
+            with st.expander("Lihat metrics", expanded=False):
+                if metric_summary["timers"]:
+                    st.dataframe(metric_summary["timers"], hide_index=True, use_container_width=True)
+                if metric_summary["counters"]:
+                    st.dataframe(metric_summary["counters"], hide_index=True, use_container_width=True)
+                st.download_button("⬇️ Prometheus text", metrics.export_prometheus(),
+                                   file_name="douggle_metrics.prom", mime="text/plain")
+                if st.button("🧹 Reset metrics"):
+                    metrics.reset()
+                    st.rerun()
+        elif metrics_on:
+            st.caption("Belum ada data. Lakukan pencarian atau reload dokumen.")
+        
         # Evaluation Section
         st.markdown("---")
         st.markdown("### 📈 Evaluation")
@@ -299,13 +513,18 @@ with st.sidebar:
                     st.success(f"✅ Evaluation saved to {saved_file}")
                     
                     st.markdown("#### Evaluation Metrics")
-                    for k, metrics in eval_results.items():
+                    for k, k_metrics in eval_results.items():
                         if k != 'MAP':
-                            st.write(f"**K={k}**: Precision={metrics['precision_avg']:.3f}, "
-                                   f"Recall={metrics['recall_avg']:.3f}, "
-                                   f"F1={metrics['f1_avg']:.3f}")
+                            st.write(f"**K={k}**: Precision={k_metrics['precision_avg']:.3f}, "
+                                   f"Recall={k_metrics['recall_avg']:.3f}, "
+                                   f"F1={k_metrics['f1_avg']:.3f}")
                     
                     st.metric("MAP Score", eval_results.get('MAP', 0))
+                    
+                    # Rata-rata semua run untuk query ini, dihitung langsung di store
+                    history = get_evaluation_store(eval_folder).aggregate(query=test_query)
+                    st.caption(f"Riwayat query ini: {history['num_runs']} run, "
+                               f"rata-rata MAP {history['MAP']:.3f}")
     else:
         st.warning("⚠️ System belum dimuat")
         st.info(st.session_state.load_message)
@@ -425,24 +644,56 @@ with col_results:
         st.info("Start by typing a query above.")
     else:
         with st.spinner("🔍 Searching..."):
-            # Process query
-            processed_query = preprocess_query_pengguna(query)
-            
-            # Search
-            results, doc_ids, scores = search(
-                processed_query,
-                data["vectorizer"],
-                data["doc_vectors"]
-            )
+            # Process query ("frasa" bertanda kutip dipisahkan)
+            processed_query, phrases = parse_phrase_query(query)
             
-            # Filter by min_score
-            filtered_results = [
-                (doc_ids[i], scores[i]) 
-                for i in range(len(doc_ids)) 
-                if scores[i] >= min_score
-            ]
-            
-            found_count = len(filtered_results)
+            if is_boolean_query(query):
+                # AND / OR / NOT / +kata / -kata / "frasa": saring lewat posting list
+                # (frasa lewat positional index), lalu ranking TF-IDF
+                doc_ids, scores, found_count = search_boolean(
+                    query,
+                    data["vectorizer"],
+                    data["doc_vectors"],
+                    data["inverted_index"],
+                    k=max_docs,
+                    min_score=min_score,
+                    positions=data["positions"]
+                )
+            elif RERANK and not phrases:
+                # Stage 1 top-N cosine, lalu rerank hanya kandidat tersebut
+                doc_ids, scores, found_count, rerank_report = get_rerank_pipeline().search(
+                    processed_query,
+                    data,
+                    k=max_docs,
+                    min_score=min_score
+                )
+                st.caption(
+                    f"Stage 1: {rerank_report['stage1_ms']:.1f} ms ({rerank_report['n_candidates']} kandidat) • "
+                    f"Rerank: {rerank_report['rerank_ms']:.1f} ms ({rerank_report['n_reranked']} dokumen)"
+                )
+            elif data["positions"] is not None and (
+                    phrases or (PROXIMITY and len(processed_query.split()) > 1)):
+                # Phrase query (dan proximity boost jika diaktifkan) lewat positional index
+                doc_ids, scores, found_count = cached_positional_search(
+                    data,
+                    query,
+                    processed_query,
+                    phrases,
+                    k=max_docs,
+                    min_score=min_score
+                )
+            else:
+                # Search (hanya top-k, sudah difilter min_score; hasil di-cache per query)
+                doc_ids, scores, found_count = cached_search(
+                    get_query_cache(),
+                    processed_query,
+                    data["vectorizer"],
+                    data["doc_vectors"],
+                    data["index_version"],
+                    data["manifest"]["scorer"],
+                    k=max_docs,
+                    min_score=min_score
+                )
             
             if found_count == 0:
                 st.warning(f"No documents found with score ≥ {min_score}. Try lowering the minimum score.")
@@ -450,14 +701,12 @@ with col_results:
                 st.success(f"Found **{found_count}** documents (showing top {min(max_docs, found_count)})")
                 
                 # Display results with new card design
-                display_count = min(max_docs, found_count)
-                for i in range(display_count):
-                    doc_idx, score = filtered_results[i]
-                    
-                    # Get document info
+                query_term_ids = data['snippets'].query_term_ids(processed_query)
+                for doc_idx, score in zip(doc_ids, scores):
+                    # Get document info (snippet hanya membaca jendela terbaik dokumen)
                     title = data['document_ids'][doc_idx]
-                    snippet = data['raw_documents'][doc_idx][:200] + "..."
-                    word_count = len(data['raw_documents'][doc_idx].split())
+                    snippet = data['snippets'].snippet(data['raw_documents'], doc_idx, query_term_ids)
+                    word_count = data['snippets'].word_count(doc_idx)
                     
                     # Display card
                     st.markdown(f"""
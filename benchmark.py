@@ -0,0 +1,426 @@
+# benchmark.py (Benchmark Suite)
+"""
+Benchmark reproducible untuk ingest, preprocessing, build index, ukuran index, waktu startup
+(proses baru sampai query pertama), dan latency query di atas corpus sintetis berbahasa Indonesia.
+
+Corpus dibangkitkan secara deterministik dari seed: kata dasar dari kamus Sastrawi diberi
+imbuhan me-/ber-/di-/ter-/pe-/ke- dan -kan/-an/-i/-nya, lalu diambil dengan distribusi Zipf
+dan dicampur stopword, sehingga Sastrawi melakukan pekerjaan yang realistis.
+
+Contoh:
+  python benchmark.py --sizes 1000 10000 --output hasil.json
+  python benchmark.py --sizes 1000 10000 --compare hasil_lama.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from dataset import DatasetManager
+from preprocessing import (preprocess_kumpulan_dokumen, preprocess_query_pengguna, stem_cache,
+                           clear_word_caches)
+from retrieval import SCORERS, build_index, build_index_from_texts, search, search_top_k
+from index_store import save_index
+
+# Kata dasar bahasa Indonesia (dikenal kamus Sastrawi)
+ROOT_WORDS = [
+    "ajar", "baca", "tulis", "kerja", "main", "jalan", "lari", "makan", "minum", "tidur",
+    "pikir", "hitung", "ukur", "bangun", "buat", "kirim", "terima", "bayar", "jual", "beli",
+    "cari", "temu", "pakai", "guna", "ubah", "ganti", "tambah", "kurang", "bagi", "kali",
+    "atur", "susun", "olah", "proses", "kembang", "tumbuh", "hasil", "dapat", "ambil", "beri",
+    "tanya", "jawab", "bicara", "dengar", "lihat", "tonton", "rasa", "pegang", "tarik", "dorong",
+    "potong", "ikat", "buka", "tutup", "masuk", "keluar", "naik", "turun", "pindah", "tinggal",
+    "latih", "didik", "uji", "nilai", "teliti", "kaji", "amat", "simpan", "hapus", "salin",
+    "cetak", "rekam", "putar", "hidup", "mati", "sakit", "sehat", "obat", "rawat", "jaga",
+    "lindung", "bantu", "tolong", "dukung", "ikut", "pimpin", "perintah", "larang", "izin", "minta",
+    "harap", "percaya", "yakin", "ragu", "takut", "berani", "marah", "senang", "sedih", "cinta",
+    "suka", "benci", "ingat", "lupa", "tahu", "kenal", "paham", "mengerti", "sadar", "tanam",
+    "panen", "pupuk", "siram", "petik", "masak", "goreng", "rebus", "bakar", "cuci", "sapu",
+    "bersih", "kotor", "rusak", "baik", "benar", "salah", "besar", "kecil", "tinggi", "rendah",
+    "panjang", "pendek", "luas", "sempit", "dalam", "dangkal", "cepat", "lambat", "kuat", "lemah",
+    "data", "sistem", "jaring", "komputer", "mesin", "model", "teknologi", "informasi", "aplikasi", "program",
+    "ekonomi", "pasar", "harga", "modal", "untung", "rugi", "pajak", "dagang", "usaha", "industri",
+    "sekolah", "murid", "guru", "kelas", "ilmu", "buku", "kata", "kalimat", "bahasa", "makna",
+    "negara", "rakyat", "pilih", "wakil", "hukum", "adil", "damai", "perang", "aman", "kuasa",
+    "kota", "desa", "rumah", "gedung", "sungai", "laut", "gunung", "hutan", "tanah", "air",
+    "darat", "udara", "angin", "hujan", "panas", "dingin", "cahaya", "warna", "suara", "gerak",
+]
+
+STOPWORDS = [
+    "yang", "dan", "di", "ke", "dari", "dengan", "untuk", "pada", "dalam", "ini", "itu",
+    "adalah", "akan", "tidak", "juga", "oleh", "sebagai", "karena", "atau", "sudah", "telah",
+    "bisa", "dapat", "lebih", "para", "saat", "agar", "tetapi", "namun", "bahwa", "serta",
+]
+
+PREFIXES = ["", "me", "ber", "di", "ter", "pe", "ke"]
+SUFFIXES = ["", "kan", "an", "i", "nya"]
+
+# retrieval.search mengurutkan seluruh dokumen; di atas batas ini hanya search_top_k yang diukur
+FULL_SEARCH_MAX_DOCS = 100000
+
+def _nasal_prefix(prefix, root):
+    """me-/pe- dengan peluluhan bunyi awal kata dasar (mem-, men-, meng-, meny-)."""
+    first = root[0]
+    if first in "bfv":
+        return prefix + "m" + root
+    if first == "p":
+        return prefix + "m" + root[1:]
+    if first in "dcjz":
+        return prefix + "n" + root
+    if first == "t":
+        return prefix + "n" + root[1:]
+    if first in "gh" or first in "aiueo":
+        return prefix + "ng" + root
+    if first == "k":
+        return prefix + "ng" + root[1:]
+    if first == "s":
+        return prefix + "ny" + root[1:]
+    return prefix + root
+
+def affix_word(root, prefix="", suffix=""):
+    """Membentuk kata berimbuhan dari kata dasar."""
+    if prefix in ("me", "pe"):
+        word = _nasal_prefix(prefix, root)
+    elif prefix in ("ber", "ter") and root[0] == "r":
+        word = prefix[:-1] + root
+    else:
+        word = prefix + root
+    return word + suffix
+
+def _dictionary_roots():
+    """Kata dasar dari kamus Sastrawi (huruf saja, 3-10 karakter), terurut."""
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    return sorted(word for word in StemmerFactory().get_words()
+                  if word.isalpha() and 3 <= len(word) <= 10)
+
+def build_vocabulary(n_roots=2000, forms_per_root=4, seed=42):
+    """
+    Vocabulary kata berimbuhan dengan urutan frekuensi acak (deterministik).
+    Kata dasar: ROOT_WORDS ditambah sampel kamus Sastrawi sampai n_roots.
+    Output: list of str, urutan = peringkat Zipf
+    """
+    rng = np.random.default_rng(seed)
+    roots = list(ROOT_WORDS)
+    seen = set(roots)
+    candidates = [word for word in _dictionary_roots() if word not in seen]
+    extra = rng.choice(len(candidates), size=max(0, n_roots - len(roots)), replace=False)
+    roots += [candidates[i] for i in sorted(extra)]
+
+    words = []
+    seen = set()
+    for root in roots[:n_roots]:
+        forms = [("", "")] + [(PREFIXES[rng.integers(len(PREFIXES))], SUFFIXES[rng.integers(len(SUFFIXES))])
+                              for _ in range(forms_per_root - 1)]
+        for prefix, suffix in forms:
+            word = affix_word(root, prefix, suffix)
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+    rng.shuffle(words)
+    return words
+
+def _zipf_cdf(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return np.cumsum(weights) / weights.sum()
+
+def generate_corpus(n_docs, seed=42, vocabulary=None, zipf_exponent=1.07,
+                    stopword_ratio=0.3, mean_length=120):
+    """
+    Generator dokumen sintetis. Seed yang sama selalu menghasilkan corpus yang sama.
+    Input: n_docs, seed, vocabulary (default build_vocabulary(seed=seed)), eksponen Zipf,
+           proporsi stopword, rata-rata panjang dokumen (kata)
+    Output: generator of str
+    """
+    vocabulary = np.array(vocabulary if vocabulary is not None else build_vocabulary(seed=seed))
+    stopwords = np.array(STOPWORDS)
+    word_cdf = _zipf_cdf(len(vocabulary), zipf_exponent)
+    stop_cdf = _zipf_cdf(len(stopwords), 1.0)
+    rng = np.random.default_rng(seed + 1)
+
+    for _ in range(n_docs):
+        length = int(np.clip(rng.lognormal(np.log(mean_length), 0.5), 10, 2000))
+        words = vocabulary[np.minimum(np.searchsorted(word_cdf, rng.random(length)), len(vocabulary) - 1)]
+        is_stop = rng.random(length) < stopword_ratio
+        words[is_stop] = stopwords[np.minimum(np.searchsorted(stop_cdf, rng.random(is_stop.sum())),
+                                              len(stopwords) - 1)]
+        words = words.tolist()
+
+        # Kalimat 8-20 kata dengan huruf kapital, tanda baca, dan sesekali angka
+        sentences = []
+        start = 0
+        while start < len(words):
+            end = start + int(rng.integers(8, 21))
+            sentence = words[start:end]
+            if rng.random() < 0.2:
+                sentence.insert(int(rng.integers(len(sentence) + 1)), str(rng.integers(1, 2025)))
+            if len(sentence) > 6 and rng.random() < 0.3:
+                sentence[len(sentence) // 2] += ","
+            sentences.append(" ".join(sentence).capitalize() + ".")
+            start = end
+        yield " ".join(sentences)
+
+def generate_queries(n_queries, vocabulary, seed=42, min_rank=10, max_rank=2000):
+    """Query 2-4 kata dari kata berfrekuensi menengah (peringkat min_rank..max_rank)."""
+    rng = np.random.default_rng(seed + 2)
+    pool = vocabulary[min_rank:max_rank]
+    return [" ".join(rng.choice(pool, size=rng.integers(2, 5), replace=False))
+            for _ in range(n_queries)]
+
+def write_corpus(folder, docs):
+    """Menulis dokumen sebagai file .txt (doc0000001.txt, ...). Output: jumlah file."""
+    os.makedirs(folder, exist_ok=True)
+    n = 0
+    for n, text in enumerate(docs, 1):
+        with open(os.path.join(folder, f"doc{n:07d}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+    return n
+
+def folder_size(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+def latency_stats(seconds):
+    """p50/p95/p99/mean dalam milidetik."""
+    ms = np.asarray(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "n_queries": len(ms),
+    }
+
+def _rate(n_docs, seconds):
+    return {"seconds": round(seconds, 4), "docs_per_sec": round(n_docs / seconds, 1) if seconds else None}
+
+# Dijalankan di proses Python baru: waktu import, buka index, dan query pertama
+STARTUP_SCRIPT = """
+import sys, json, time
+start = time.perf_counter()
+from index_store import load_index
+from preprocessing import preprocess_query_pengguna
+from retrieval import search_top_k
+imported = time.perf_counter()
+index = load_index(sys.argv[1])
+loaded = time.perf_counter()
+search_top_k(preprocess_query_pengguna(sys.argv[2]), index["vectorizer"], index["doc_vectors"], k=10)
+done = time.perf_counter()
+print(json.dumps({"import_seconds": imported - start, "load_index_seconds": loaded - imported,
+                  "first_query_seconds": done - loaded}))
+"""
+
+def measure_startup(index_dir, query, repeats=3):
+    """
+    Waktu dari start proses sampai query pertama terjawab (index sudah ada di disk),
+    median dari beberapa proses baru. Rinciannya diukur di dalam proses tersebut.
+    Output: dict {process_seconds, import_seconds, load_index_seconds, first_query_seconds}
+    """
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, index_dir, query],
+                                   cwd=current_dir, capture_output=True, text=True, check=True)
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        run["process_seconds"] = time.perf_counter() - start
+        runs.append(run)
+    return {name: round(float(np.median([run[name] for run in runs])), 4)
+            for name in ("process_seconds", "import_seconds", "load_index_seconds",
+                         "first_query_seconds")}
+
+def run_benchmark(n_docs, seed=42, n_queries=200, scorer="tfidf", preprocess_workers=1,
+                  load_workers=8, k=10, ingest=True, work_dir=None, n_roots=2000):
+    """
+    Menjalankan semua tahap untuk satu ukuran corpus.
+    Output: dict hasil (siap ditulis sebagai JSON)
+    """
+    vocabulary = build_vocabulary(n_roots=n_roots, seed=seed)
+    work_dir = tempfile.mkdtemp(prefix="douggle-bench-", dir=work_dir)
+    result = {"n_docs": n_docs, "scorer": scorer}
+    try:
+        # 1. Ingest: baca file .txt lewat DatasetManager
+        if ingest:
+            corpus_dir = os.path.join(work_dir, "data")
+            write_corpus(corpus_dir, generate_corpus(n_docs, seed, vocabulary))
+            manager = DatasetManager(folder_path=corpus_dir)
+            start = time.perf_counter()
+            n_read = sum(1 for _ in manager.iter_documents(n_workers=load_workers))
+            result["ingest"] = _rate(n_read, time.perf_counter() - start)
+            result["ingest"]["corpus_bytes"] = folder_size(corpus_dir)
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+        # 2. Preprocessing dengan stem cache kosong supaya setiap ukuran sebanding
+        docs = list(generate_corpus(n_docs, seed, vocabulary))
+        stem_cache.clear()
+        clear_word_caches()
+        start = time.perf_counter()
+        processed = preprocess_kumpulan_dokumen(docs, n_workers=preprocess_workers)
+        result["preprocess"] = _rate(n_docs, time.perf_counter() - start)
+        result["preprocess"]["stem_cache"] = stem_cache.stats()
+
+        # 3. Build index
+        start = time.perf_counter()
+        vectorizer, doc_vectors = build_index(processed, scorer=scorer)
+        result["build"] = {"seconds": round(time.perf_counter() - start, 4)}
+
+        # 3b. Pipeline gabungan (teks mentah -> token -> CSR), cache kosong juga,
+        # dibandingkan dengan preprocessing + build di atas (hanya untuk 1 worker)
+        if preprocess_workers == 1:
+            stem_cache.clear()
+            clear_word_caches()
+            start = time.perf_counter()
+            build_index_from_texts(docs, scorer=scorer)
+            result["fused_build"] = _rate(n_docs, time.perf_counter() - start)
+
+        # 4. Ukuran index (format biner index_store)
+        index_dir = os.path.join(work_dir, "index")
+        save_index(index_dir, vectorizer, doc_vectors, [f"doc{i:07d}.txt" for i in range(n_docs)],
+                   docs, processed)
+        matrix_bytes = doc_vectors.data.nbytes + doc_vectors.indices.nbytes + doc_vectors.indptr.nbytes
+        result["index"] = {
+            "bytes_on_disk": folder_size(index_dir),
+            "matrix_bytes": int(matrix_bytes),
+            "n_terms": int(doc_vectors.shape[1]),
+            "nnz": int(doc_vectors.nnz),
+        }
+        del docs
+
+        # 5. Startup: proses baru sampai query pertama terjawab dari index di disk
+        queries = generate_queries(n_queries, np.array(vocabulary), seed)
+        result["startup"] = measure_startup(index_dir, queries[0])
+
+        # 6. Latency query: preprocessing query + search_top_k, dan search penuh untuk corpus kecil
+        timings = {"query_top_k": [], "search": []}
+        for query in queries:
+            start = time.perf_counter()
+            processed_query = preprocess_query_pengguna(query)
+            search_top_k(processed_query, vectorizer, doc_vectors, k=k)
+            timings["query_top_k"].append(time.perf_counter() - start)
+            if n_docs <= FULL_SEARCH_MAX_DOCS:
+                start = time.perf_counter()
+                search(processed_query, vectorizer, doc_vectors)
+                timings["search"].append(time.perf_counter() - start)
+        result["query"] = {name: latency_stats(values) if values else None
+                           for name, values in timings.items()}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=current_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Metrik yang dibandingkan dengan --compare: (path, True jika makin besar makin baik)
+COMPARED_METRICS = [
+    (("ingest", "docs_per_sec"), True),
+    (("preprocess", "docs_per_sec"), True),
+    (("build", "seconds"), False),
+    (("fused_build", "docs_per_sec"), True),
+    (("index", "bytes_on_disk"), False),
+    (("startup", "process_seconds"), False),
+    (("query", "query_top_k", "p50_ms"), False),
+    (("query", "query_top_k", "p95_ms"), False),
+    (("query", "query_top_k", "p99_ms"), False),
+]
+
+def _get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or data.get(key) is None:
+            return None
+        data = data[key]
+    return data
+
+def compare_results(baseline, current, tolerance=0.1):
+    """
+    Membandingkan dua file hasil per ukuran corpus.
+    Output: list of dict {n_docs, metric, baseline, current, change, regression}
+    """
+    base_by_size = {r["n_docs"]: r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = base_by_size.get(result["n_docs"])
+        if base is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            old, new = _get_path(base, path), _get_path(result, path)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append({"n_docs": result["n_docs"], "metric": ".".join(path), "baseline": old,
+                         "current": new, "change": round(change, 4), "regression": worse > tolerance})
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Douggle dengan corpus sintetis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Jumlah dokumen (misalnya 1000 10000 100000 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--roots", type=int, default=2000, help="Jumlah kata dasar di vocabulary")
+    parser.add_argument("--scorer", default="tfidf", choices=list(SCORERS))
+    parser.add_argument("--workers", type=int, default=1, help="Worker preprocessing (0 = semua core)")
+    parser.add_argument("--load-workers", type=int, default=8)
+    parser.add_argument("--skip-ingest", action="store_true", help="Lewati tahap tulis/baca file")
+    parser.add_argument("--work-dir", default=None, help="Folder sementara (default: temp sistem)")
+    parser.add_argument("--output", default=None, help="File JSON hasil (default: stdout)")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Perubahan relatif yang dianggap regresi (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+    logging.getLogger("dataset").setLevel(logging.WARNING)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {"seed": args.seed, "queries": args.queries, "roots": args.roots,
+                       "scorer": args.scorer,
+                       "workers": args.workers, "load_workers": args.load_workers},
+        },
+        "results": [],
+    }
+    for n_docs in args.sizes:
+        print(f"Benchmark {n_docs} dokumen...", file=sys.stderr)
+        report["results"].append(run_benchmark(
+            n_docs, seed=args.seed, n_queries=args.queries, scorer=args.scorer,
+            preprocess_workers=args.workers or None, load_workers=args.load_workers,
+            ingest=not args.skip_ingest, work_dir=args.work_dir, n_roots=args.roots
+        ))
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            rows = compare_results(json.load(f), report, args.tolerance)
+        report["comparison"] = rows
+        for row in rows:
+            flag = "REGRESI" if row["regression"] else ""
+            print(f"{row['n_docs']:>8d} {row['metric']:<28s} {row['baseline']:>12} -> "
+                  f"{row['current']:>12} ({row['change']:+.1%}) {flag}", file=sys.stderr)
+        exit_code = 1 if any(row["regression"] for row in rows) else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
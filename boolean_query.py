@@ -0,0 +1,281 @@
+# boolean_query.py (Modul 3i - Boolean Query)
+import re
+import sys
+import time
+import numpy as np
+from preprocessing import preprocess_query_pengguna
+from retrieval import TOKEN_PATTERN, compute_scores, term_column
+
+# Operator hanya dikenali dalam huruf kapital, supaya kata "and"/"or" biasa tetap jadi term
+OPERATORS = ("AND", "OR", "NOT")
+# Jika posting list panjang > GALLOP_RATIO x posting list pendek, irisan dilakukan dengan
+# binary search per dokumen dari list pendek (galloping), bukan merge kedua list
+GALLOP_RATIO = 8
+
+# "frasa" bertanda kutip adalah satu token; tanda kutip tanpa pasangan diabaikan
+_TOKEN = re.compile(r'[+-]?"[^"]*"|[()]|[^\s()"]+')
+
+def intersect_postings(a, b):
+    """
+    Irisan dua posting list terurut naik.
+    List panjang lebih dulu dipotong ke rentang [a[0], a[-1]] (lompatan seperti skip pointer),
+    lalu setiap dokumen list pendek dicari dengan searchsorted: O(m log n), bukan O(m + n).
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return np.asarray(a)
+    a, b = np.asarray(a), np.asarray(b)
+    b = b[np.searchsorted(b, a[0]):np.searchsorted(b, a[-1], side='right')]
+    if len(b) > GALLOP_RATIO * len(a):
+        return a[_contains(b, a)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+def subtract_postings(a, b):
+    """Dokumen di posting list a yang tidak ada di b (keduanya terurut naik)."""
+    a = np.asarray(a)
+    if len(a) == 0 or len(b) == 0:
+        return a
+    return a[~_contains(np.asarray(b), a)]
+
+def union_postings(lists):
+    """Gabungan beberapa posting list terurut naik."""
+    lists = [np.asarray(docs) for docs in lists]
+    if len(lists) == 1:
+        return lists[0]
+    return np.unique(np.concatenate(lists))
+
+def _contains(sorted_docs, docs):
+    """Mask: docs[i] ada di sorted_docs."""
+    pos = np.searchsorted(sorted_docs, docs)
+    pos_clip = np.minimum(pos, len(sorted_docs) - 1)
+    return (pos < len(sorted_docs)) & (sorted_docs[pos_clip] == docs)
+
+def parse_boolean_query(query):
+    """
+    Mengubah query boolean menjadi pohon node:
+    - ("term", [term hasil preprocessing])  (kosong jika kata adalah stopword)
+    - ("phrase", [term, ...])  untuk "frasa" bertanda kutip (term harus berurutan)
+    - ("or", [node, ...])
+    - ("and", [(mode, node), ...]) dengan mode "must", "should", atau "not"
+    Aturan: kata yang berdampingan = AND; OR mengikat lebih lemah dari AND; NOT / -kata
+    mengecualikan; +kata wajib ada. Jika sebuah kelompok memuat +kata, kata biasa di
+    kelompok itu hanya opsional (ikut menentukan ranking, tidak menyaring). "Frasa"
+    diperlakukan seperti satu kata (bisa diberi +, -, NOT, dan digabung dengan AND/OR).
+    """
+    tokens = _TOKEN.findall(query)
+    node, i = _parse_or(tokens, 0)
+    # Sisa token (misalnya ")" tanpa pasangan) diabaikan, tetapi isinya tetap di-parse
+    while i < len(tokens):
+        rest, i = _parse_or(tokens, i + 1)
+        node = ("and", [("must", node), ("must", rest)])
+    return node
+
+def _parse_or(tokens, i):
+    children = []
+    node, i = _parse_and(tokens, i)
+    children.append(node)
+    while i < len(tokens) and tokens[i] == "OR":
+        node, i = _parse_and(tokens, i + 1)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ("or", children)), i
+
+def _parse_and(tokens, i):
+    clauses = []
+    required_next = False
+    while i < len(tokens) and tokens[i] not in (")", "OR"):
+        token = tokens[i]
+        if token == "AND":
+            # Kedua sisi AND wajib ada
+            if clauses and clauses[-1][0] == "default":
+                clauses[-1] = ("must", clauses[-1][1])
+            required_next = True
+            i += 1
+            continue
+        mode = "must" if required_next else "default"
+        required_next = False
+        if token == "NOT":
+            mode, i = "not", i + 1
+        elif token in ("+", "-"):
+            # Modifier sebelum kurung, misalnya -(a OR b)
+            mode, i = ("must" if token == "+" else "not"), i + 1
+        if i >= len(tokens) or tokens[i] in (")", "OR"):
+            break
+        token = tokens[i]
+        if token == "(":
+            node, i = _parse_or(tokens, i + 1)
+            if i < len(tokens) and tokens[i] == ")":
+                i += 1
+        else:
+            if token[0] in "+-" and len(token) > 1:
+                mode, token = ("must" if token[0] == "+" else "not"), token[1:]
+            terms = TOKEN_PATTERN.findall(preprocess_query_pengguna(token.strip('"')).lower())
+            # Frasa satu term sama dengan kata biasa
+            node, i = ("phrase" if token[0] == '"' and len(terms) > 1 else "term", terms), i + 1
+        clauses.append((mode, node))
+
+    # Kata biasa opsional hanya jika kelompok memuat +kata
+    has_plus = any(mode == "must" for mode, _ in clauses)
+    default = "should" if has_plus else "must"
+    clauses = [(default if mode == "default" else mode, node) for mode, node in clauses]
+    if len(clauses) == 1 and clauses[0][0] == "must":
+        return clauses[0][1], i
+    return ("and", clauses), i
+
+def is_boolean_query(query):
+    """True jika query memakai operator AND/OR/NOT, +kata/-kata, atau kurung."""
+    for token in _TOKEN.findall(query):
+        if token in OPERATORS or token in "()" or (token[0] in "+-" and len(token) > 1):
+            return True
+    return False
+
+def query_terms(node, negated=False):
+    """Term positif (bukan di bawah NOT) untuk ranking, urut sesuai query."""
+    kind, value = node
+    if kind in ("term", "phrase"):
+        return [] if negated else list(value)
+    if kind == "or":
+        return [term for child in value for term in query_terms(child, negated)]
+    return [term for mode, child in value for term in query_terms(child, negated or mode == "not")]
+
+class BooleanQueryEngine:
+    """
+    Evaluator query boolean di atas posting list InvertedIndex (doc ID terurut naik).
+    Term dievaluasi dari posting list terpendek sehingga query yang makin restriktif
+    makin sedikit dokumen yang disentuh. Node frasa dievaluasi dengan positional index
+    (PositionalIndex.phrase_documents); tanpa positional index, frasa hanya mensyaratkan
+    semua term-nya ada di dokumen.
+    """
+    def __init__(self, vectorizer, index, positions=None):
+        self.vectorizer = vectorizer
+        self.index = index
+        self.positions = positions
+
+    def postings(self, term):
+        term_id = term_column(self.vectorizer, term)
+        if term_id is None:
+            return np.empty(0, dtype=self.index.doc_ids.dtype)
+        return self.index.postings(term_id)[0]
+
+    def evaluate(self, node):
+        """
+        Dokumen yang memenuhi node.
+        Output: np.ndarray doc ID terurut naik, atau None jika node tidak membatasi
+                apa pun (misalnya hanya berisi stopword)
+        """
+        kind, value = node
+        if kind == "term" or (kind == "phrase" and self.positions is None):
+            if not value:
+                return None
+            return self._intersect([self.postings(term) for term in value])
+        if kind == "phrase":
+            return np.asarray(self.positions.phrase_documents(value)[0], dtype=self.index.doc_ids.dtype)
+        if kind == "or":
+            results = [docs for docs in map(self.evaluate, value) if docs is not None]
+            return union_postings(results) if results else None
+
+        # "and": irisan must (atau gabungan should), lalu kurangi not
+        groups = {"must": [], "should": [], "not": []}
+        for mode, child in value:
+            docs = self.evaluate(child)
+            if docs is not None:
+                groups[mode].append(docs)
+        if groups["must"]:
+            result = self._intersect(groups["must"])
+        elif groups["should"]:
+            result = union_postings(groups["should"])
+        elif groups["not"]:
+            result = np.arange(self.index.n_docs, dtype=self.index.doc_ids.dtype)
+        else:
+            return None
+        for docs in groups["not"]:
+            result = subtract_postings(result, docs)
+        return result
+
+    @staticmethod
+    def _intersect(lists):
+        # Mulai dari posting list terpendek, berhenti begitu hasil kosong
+        lists = sorted(lists, key=len)
+        result = lists[0]
+        for docs in lists[1:]:
+            if len(result) == 0:
+                break
+            result = intersect_postings(result, docs)
+        return np.asarray(result)
+
+def search_boolean(query, vectorizer, doc_vectors, index, k=10, min_score=0.0, positions=None):
+    """
+    Search dengan query boolean: dokumen disaring lewat posting list, lalu hanya dokumen
+    yang lolos yang diskor dengan TF-IDF (atau BM25) dari term positif query.
+    Dokumen yang lolos tetap ditampilkan walaupun skornya 0 (misalnya query "NOT x")
+    selama min_score = 0.
+    Input: query (str mentah), vectorizer, doc_vectors, index (InvertedIndex), k, min_score,
+           positions (PositionalIndex untuk "frasa", opsional)
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    node = parse_boolean_query(query)
+    docs = BooleanQueryEngine(vectorizer, index, positions).evaluate(node)
+    if docs is None or len(docs) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), 0
+
+    # Skor hanya untuk dokumen yang lolos
+    docs = np.asarray(docs, dtype=np.int64)
+    terms = query_terms(node)
+    if terms:
+        query_vector = vectorizer.transform([" ".join(terms)])
+        scores = compute_scores(query_vector, vectorizer, doc_vectors[docs])
+    else:
+        scores = np.zeros(len(docs), dtype=np.float64)
+
+    keep = scores >= min_score
+    docs, scores = docs[keep], scores[keep]
+    # Skor menurun, seri diurutkan berdasarkan ID dokumen (sama dengan search)
+    order = np.lexsort((docs, -scores))[:k]
+    return docs[order], scores[order], len(docs)
+
+# Benchmark: query restriktif lewat posting list vs search cosine + filter per dokumen
+if __name__ == "__main__":
+    from benchmark import build_vocabulary, generate_corpus
+    from preprocessing import preprocess_kumpulan_dokumen
+    from retrieval import build_index, search
+    from inverted_index import build_inverted_index
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rng = np.random.default_rng(42)
+    vocabulary = build_vocabulary()
+    # +kata jarang, kata umum opsional, -kata umum dikecualikan
+    words = [w for w in vocabulary[:3000]]
+    queries = [f"+{words[rng.integers(1000, 3000)]} {words[rng.integers(0, 50)]} "
+               f"-{words[rng.integers(0, 50)]}" for _ in range(50)]
+
+    print(f"{'docs':>8s} {'filter (ms)':>12s} {'boolean (ms)':>13s} {'speedup':>8s} {'same hits':>10s}")
+    for n_docs in sizes:
+        docs = list(generate_corpus(n_docs, vocabulary=vocabulary))
+        processed = preprocess_kumpulan_dokumen(docs)
+        vectorizer, doc_vectors = build_index(processed)
+        index = build_inverted_index(doc_vectors)
+        token_sets = [set(document.split()) for document in processed]
+
+        same = True
+        t_filter = t_boolean = 0.0
+        for query in queries:
+            required, optional, excluded = (preprocess_query_pengguna(word.lstrip("+-"))
+                                            for word in query.split())
+            start = time.perf_counter()
+            # Cara lama: search seluruh corpus lalu filter setiap dokumen di Python
+            _, _, scores = search(f"{required} {optional}", vectorizer, doc_vectors)
+            hits = [i for i, tokens in enumerate(token_sets)
+                    if required in tokens and excluded not in tokens]
+            t_filter += time.perf_counter() - start
+
+            start = time.perf_counter()
+            search_boolean(query, vectorizer, doc_vectors, index, k=10)
+            t_boolean += time.perf_counter() - start
+            # Bandingkan himpunan dokumen yang lolos, bukan hanya jumlahnya
+            boolean_hits, _, _ = search_boolean(query, vectorizer, doc_vectors, index, k=None)
+            same &= set(boolean_hits.tolist()) == set(hits)
+
+        ms_filter = t_filter / len(queries) * 1000
+        ms_boolean = t_boolean / len(queries) * 1000
+        print(f"{n_docs:>8d} {ms_filter:>12.3f} {ms_boolean:>13.3f} "
+              f"{ms_filter / ms_boolean:>7.1f}x {str(same):>10s}")
@@ -1,6 +1,11 @@
 # dataset.py (Modul 1 - Dataset - Improved Version)
 import os
+import time
+import hashlib
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import metrics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -15,74 +20,115 @@ class DatasetManager:
         self.folder_path = folder_path
         self.documents = {}
         self.errors = []
+        self.load_stats = {}
+        # {nama file: (mtime, size)} dari scan terakhir iter_documents
+        self.file_stats = {}
 
-    def load_documents(self):
+    def check_folder(self):
         """
-        Memuat seluruh dokumen dari folder dataset.
-        Output: Dictionary dengan nama file sebagai ID dan isi teks sebagai value.
+        Mengecek folder dataset sebelum dokumen dimuat.
+        Output: pesan error/warning (str), atau None jika ada file .txt yang bisa dimuat.
         """
         if not os.path.exists(self.folder_path):
             error_msg = f"Error: Folder '{self.folder_path}' tidak ditemukan."
             logger.error(error_msg)
             return error_msg
 
-        txt_files = [f for f in os.listdir(self.folder_path) if f.endswith(".txt")]
-        
-        if not txt_files:
+        if not self.list_files():
             warning_msg = f"Warning: Folder '{self.folder_path}' tidak memiliki file .txt"
             logger.warning(warning_msg)
             return warning_msg
 
-        loaded_count = 0
-        empty_files = []
-        
-        for filename in txt_files:
-            file_path = os.path.join(self.folder_path, filename)
+        return None
+
+    def list_files(self):
+        """Daftar file .txt di folder dataset, terurut nama (urutan stabil)."""
+        return sorted(f for f in os.listdir(self.folder_path) if f.endswith(".txt"))
+
+    def stat_files(self):
+        """
+        Metadata file tanpa membaca isinya (satu kali os.scandir).
+        Output: Dictionary {nama file: (mtime, size)}
+        """
+        stats = {}
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".txt") and entry.is_file():
+                    stat = entry.stat()
+                    stats[entry.name] = (stat.st_mtime, stat.st_size)
+        return stats
+
+    @metrics.timed("douggle_read_file_seconds", "Durasi membaca satu file dokumen")
+    def _read_file(self, filename, file_size):
+        """
+        Membaca satu file dokumen (dengan fallback encoding latin-1).
+        Aman dipanggil dari banyak thread: tidak mengubah state DatasetManager.
+        Output: (isi teks atau None, status, list error) dengan status
+                "loaded", "latin-1", "empty", "skipped", atau "failed".
+        """
+        file_path = os.path.join(self.folder_path, filename)
+        errors = []
+        try:
+            # Ukuran file sudah didapat dari os.scandir
+            if file_size == 0:
+                return None, "empty", errors
+            
+            # Read file
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+                if content.strip():  # Skip empty content
+                    return content, "loaded", errors
+                return None, "empty", errors
+                    
+        except UnicodeDecodeError:
+            errors.append(f"Encoding error in {filename}, trying with different encoding")
+            
+            # Try with different encoding
             try:
-                # Check file size
-                file_size = os.path.getsize(file_path)
-                if file_size == 0:
-                    empty_files.append(filename)
-                    logger.warning(f"⚠️ {filename} is empty (0 bytes)")
-                    continue
-                
-                # Read file
-                with open(file_path, 'r', encoding='utf-8') as file:
+                with open(file_path, 'r', encoding='latin-1') as file:
                     content = file.read()
-                    if content.strip():  # Skip empty content
-                        self.documents[filename] = content
-                        loaded_count += 1
-                        logger.info(f"✅ Loaded: {filename} ({file_size} bytes)")
-                    else:
-                        empty_files.append(filename)
-                        logger.warning(f"⚠️ {filename} has no content after stripping")
-                        
-            except UnicodeDecodeError:
-                error = f"Encoding error in {filename}, trying with different encoding"
-                logger.error(error)
-                self.errors.append(error)
-                
-                # Try with different encoding
-                try:
-                    with open(file_path, 'r', encoding='latin-1') as file:
-                        content = file.read()
-                        if content.strip():
-                            self.documents[filename] = content
-                            loaded_count += 1
-                            logger.info(f"✅ Loaded with latin-1: {filename}")
-                except Exception as e:
-                    self.errors.append(f"Failed to load {filename}: {str(e)}")
-                    
+                    if content.strip():
+                        return content, "latin-1", errors
             except Exception as e:
-                error = f"Failed to read {filename}: {str(e)}"
-                logger.error(error)
-                self.errors.append(error)
-        
-        # Summary
+                errors.append(f"Failed to load {filename}: {str(e)}")
+                return None, "failed", errors
+            return None, "skipped", errors
+                
+        except Exception as e:
+            errors.append(f"Failed to read {filename}: {str(e)}")
+            return None, "failed", errors
+
+    def _read_files(self, files, n_workers):
+        """
+        Membaca file (nama, ukuran) secara berurutan atau lewat thread pool terbatas.
+        Jumlah file yang sedang dibaca dibatasi n_workers * 4 supaya memori tetap kecil.
+        Output: generator (nama file, hasil _read_file) dengan urutan sama seperti input
+        """
+        if n_workers <= 1:
+            for filename, file_size in files:
+                yield filename, self._read_file(filename, file_size)
+            return
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            pending = deque()
+            for filename, file_size in files:
+                pending.append((filename, executor.submit(self._read_file, filename, file_size)))
+                if len(pending) >= n_workers * 4:
+                    done_name, future = pending.popleft()
+                    yield done_name, future.result()
+            while pending:
+                done_name, future = pending.popleft()
+                yield done_name, future.result()
+
+    def _log_summary(self, empty_files, elapsed):
+        stats = self.load_stats
         logger.info(f"\n{'='*50}")
         logger.info(f"📊 LOADING SUMMARY")
         logger.info(f"{'='*50}")
-        logger.info(f"✅ Successfully loaded: {loaded_count} documents")
+        logger.info(f"✅ Successfully loaded: {stats['loaded']} documents "
+                    f"({stats['bytes']} bytes, {elapsed:.2f}s)")
+        if stats["latin-1"]:
+            logger.info(f"   Loaded with latin-1: {stats['latin-1']}")
         if empty_files:
             logger.warning(f"⚠️ Empty files found: {len(empty_files)}")
             for f in empty_files[:5]:  # Show first 5
@@ -91,7 +137,64 @@ class DatasetManager:
                 logger.warning(f"   ... and {len(empty_files)-5} more")
         if self.errors:
             logger.error(f"❌ Errors encountered: {len(self.errors)}")
+            for error in self.errors[:5]:
+                logger.error(f"   - {error}")
         logger.info(f"{'='*50}\n")
+
+    def iter_documents(self, n_workers=1, file_stats=None):
+        """
+        Streaming dokumen satu per satu tanpa menyimpannya di self.documents.
+        Urutan stabil (terurut nama file); file kosong dan fallback encoding
+        ditangani sama seperti load_documents. n_workers > 1 membaca file lewat
+        thread pool (berguna untuk filesystem jaringan / cache dingin).
+        Log per file diganti counter di self.load_stats dan satu ringkasan di akhir.
+        file_stats (hasil stat_files) dipakai jika sudah ada, sehingga folder tidak di-scan ulang.
+        Output: generator (doc_id, text)
+        """
+        if self.check_folder() is not None:
+            return
+
+        start = time.perf_counter()
+        self.load_stats = {"loaded": 0, "latin-1": 0, "empty": 0, "failed": 0, "bytes": 0}
+        empty_files = []
+        
+        # Satu kali os.scandir untuk ukuran semua file
+        if file_stats is None:
+            file_stats = self.stat_files()
+        self.file_stats = file_stats
+        files = [(filename, file_stats[filename][1]) for filename in sorted(file_stats)]
+        
+        for filename, (content, status, errors) in self._read_files(files, n_workers):
+            self.errors.extend(errors)
+            metrics.inc("douggle_documents_read_total", help_text="File dokumen yang dibaca per status",
+                        status=status)
+            if status in self.load_stats:
+                self.load_stats[status] += 1
+            if status == "empty":
+                empty_files.append(filename)
+            if content is not None:
+                if status == "latin-1":
+                    self.load_stats["loaded"] += 1
+                self.load_stats["bytes"] += file_stats[filename][1]
+                yield filename, content
+        
+        # Summary
+        self._log_summary(empty_files, time.perf_counter() - start)
+
+    @metrics.timed("douggle_load_documents_seconds", "Durasi DatasetManager.load_documents")
+    def load_documents(self, n_workers=1):
+        """
+        Memuat seluruh dokumen dari folder dataset.
+        n_workers > 1 membaca file secara concurrent lewat thread pool.
+        Output: Dictionary dengan nama file sebagai ID dan isi teks sebagai value
+                (urutan key terurut nama file).
+        """
+        message = self.check_folder()
+        if message is not None:
+            return message
+
+        for doc_id, content in self.iter_documents(n_workers=n_workers):
+            self.documents[doc_id] = content
         
         return self.documents
 
@@ -126,6 +229,29 @@ class DatasetManager:
         
         return metadata
 
+    def manifest_entry(self, doc_id, content, file_stat):
+        """
+        Entri manifest satu dokumen: path, mtime, size, dan hash isi.
+        file_stat adalah (mtime, size) dari stat_files, tanpa os.stat ulang.
+        """
+        mtime, size = file_stat
+        return {
+            "path": os.path.join(self.folder_path, doc_id),
+            "mtime": mtime,
+            "size": size,
+            "hash": hashlib.sha1(content.encode('utf-8')).hexdigest(),
+        }
+
+    def build_manifest(self):
+        """
+        Membuat manifest untuk dokumen yang sudah dimuat.
+        Output: Dictionary {doc_id: {"path", "mtime", "size", "hash"}}
+        """
+        return {
+            doc_id: self.manifest_entry(doc_id, content, self.file_stats[doc_id])
+            for doc_id, content in self.documents.items()
+        }
+
     def get_document_list(self):
         """Return list of loaded document names"""
         return list(self.documents.keys())
@@ -134,6 +260,25 @@ class DatasetManager:
         """Get specific document by ID"""
         return self.documents.get(doc_id, None)
 
+def diff_manifest(old_manifest, new_manifest):
+    """
+    Membandingkan dua manifest dokumen.
+    Dokumen dianggap berubah jika hash isinya berbeda.
+    Output: Dictionary berisi list doc_id untuk "added", "changed", "removed", "unchanged"
+    """
+    old_manifest = old_manifest or {}
+    changes = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for doc_id, entry in new_manifest.items():
+        old_entry = old_manifest.get(doc_id)
+        if old_entry is None:
+            changes["added"].append(doc_id)
+        elif old_entry.get("hash") != entry["hash"]:
+            changes["changed"].append(doc_id)
+        else:
+            changes["unchanged"].append(doc_id)
+    changes["removed"] = [doc_id for doc_id in old_manifest if doc_id not in new_manifest]
+    return changes
+
 # Demonstrasi penggunaan mandiri untuk pengecekan kualitas
 if __name__ == "__main__":
     manager = DatasetManager(folder_path="data")
@@ -162,10 +307,17 @@ if __name__ == "__main__":
             print(f"   Length: {len(content.split())} words")
 
 # Function wrapper untuk kemudahan import
-def load_documents(folder_path="data"):
+def load_documents(folder_path="data", n_workers=1):
     """
     Fungsi utama untuk memuat dokumen dengan lebih mudah.
     Langsung dipanggil dari app.py tanpa perlu instantiate class.
     """
     manager = DatasetManager(folder_path=folder_path)
-    return manager.load_documents()
\ No newline at end of file
+    return manager.load_documents(n_workers=n_workers)
+
+def iter_documents(folder_path="data", n_workers=1):
+    """
+    Versi streaming dari load_documents: generator (doc_id, text) dengan urutan stabil.
+    """
+    manager = DatasetManager(folder_path=folder_path)
+    return manager.iter_documents(n_workers=n_workers)
\ No newline at end of file
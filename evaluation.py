@@ -1,6 +1,17 @@
 import json
 import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
 from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nama file store evaluasi di dalam folder evaluasi
+EVALUATION_DB = "evaluations.sqlite3"
 
 def precision_at_k(retrieved_docs, relevant_docs, k):
     """Calculate precision@k"""
@@ -78,59 +89,523 @@ def evaluate_system(retrieved_docs_list, relevant_docs_list, k_values=[1, 3, 5,
     
     return results
 
-def auto_save_evaluation(query, retrieved_docs, relevant_docs, metrics, folder="evaluasi"):
+def _json_default(value):
+    """Serialisasi tipe NumPy (ID dokumen / skor hasil search) ke JSON."""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa disimpan sebagai JSON")
+
+def _to_epoch(value):
+    """datetime / string ISO / angka detik -> detik epoch (None tetap None)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+class _closing_transaction:
+    """Context manager: commit/rollback transaksi lalu menutup koneksi SQLite."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+        return False
+
+class EvaluationStore:
     """
-    Auto-save evaluation results to folder
+    Store evaluasi append-only di satu file SQLite.
+    Setiap run adalah satu baris baru (tidak pernah di-update); metrik per k juga disimpan
+    sebagai kolom di tabel run_metrics sehingga agregasi dilakukan oleh SQLite tanpa
+    mem-parse JSON seluruh riwayat. Index pada waktu dan query membuat filter tetap cepat
+    seiring bertambahnya run, dan ID yang naik monoton dipakai untuk incremental loading.
     """
-    # Create folder if not exists
-    os.makedirs(folder, exist_ok=True)
-    
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{folder}/evaluation_{timestamp}.json"
-    
-    # Prepare data
-    eval_data = {
-        "timestamp": timestamp,
-        "query": query,
-        "retrieved_docs": retrieved_docs,
-        "relevant_docs": relevant_docs,
-        "metrics": metrics,
-        "summary": {
-            "num_retrieved": len(retrieved_docs),
-            "num_relevant": len(relevant_docs),
-            "relevant_in_top_10": sum(1 for doc in retrieved_docs[:10] if doc in relevant_docs)
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created REAL NOT NULL,
+        timestamp TEXT NOT NULL,
+        query TEXT NOT NULL,
+        retrieved_docs TEXT NOT NULL,
+        relevant_docs TEXT NOT NULL,
+        metrics TEXT NOT NULL,
+        num_retrieved INTEGER NOT NULL,
+        num_relevant INTEGER NOT NULL,
+        relevant_in_top_10 INTEGER NOT NULL,
+        map REAL
+    );
+    CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+    CREATE INDEX IF NOT EXISTS runs_query_created ON runs (query, created);
+    CREATE TABLE IF NOT EXISTS run_metrics (
+        run_id INTEGER NOT NULL REFERENCES runs (id),
+        k INTEGER NOT NULL,
+        precision REAL,
+        recall REAL,
+        f1 REAL,
+        PRIMARY KEY (run_id, k)
+    );
+    CREATE TABLE IF NOT EXISTS legacy_files (
+        filename TEXT PRIMARY KEY,
+        run_id INTEGER
+    );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            # Mode WAL tersimpan di file database, cukup diset sekali
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        # Satu koneksi per operasi: aman dipakai dari banyak thread (session Streamlit)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return _closing_transaction(conn)
+
+    def append(self, query, retrieved_docs, relevant_docs, metrics, created=None):
+        """
+        Menambahkan satu run evaluasi.
+        Output: ID run (int, naik monoton)
+        """
+        with self._connect() as conn:
+            return self._insert_run(conn, query, retrieved_docs, relevant_docs, metrics, created)
+
+    @staticmethod
+    def _insert_run(conn, query, retrieved_docs, relevant_docs, metrics, created=None):
+        """Insert run dan metrik per k-nya di transaksi conn milik pemanggil."""
+        created = time.time() if created is None else _to_epoch(created)
+        relevant_set = set(relevant_docs)
+        row = (
+            created,
+            datetime.fromtimestamp(created).strftime("%Y%m%d_%H%M%S"),
+            query,
+            json.dumps(list(retrieved_docs), default=_json_default),
+            json.dumps(list(relevant_docs), default=_json_default),
+            json.dumps(metrics, default=_json_default, ensure_ascii=False),
+            len(retrieved_docs),
+            len(relevant_docs),
+            sum(1 for doc in list(retrieved_docs)[:10] if doc in relevant_set),
+            metrics.get("MAP"),
+        )
+        cursor = conn.execute(
+            "INSERT INTO runs (created, timestamp, query, retrieved_docs, relevant_docs, "
+            "metrics, num_retrieved, num_relevant, relevant_in_top_10, map) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        run_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO run_metrics (run_id, k, precision, recall, f1) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, int(k), m.get("precision_avg"), m.get("recall_avg"), m.get("f1_avg"))
+             for k, m in metrics.items() if isinstance(m, dict) and str(k).isdigit()])
+        return run_id
+
+    @staticmethod
+    def _where(start=None, end=None, query=None, after_id=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("created >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append("created < ?")
+            params.append(_to_epoch(end))
+        if query is not None:
+            clauses.append("query = ?")
+            params.append(query)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, start=None, end=None, query=None, after_id=None, limit=None, newest_first=True):
+        """
+        Mengambil run berdasarkan rentang waktu [start, end), string query, dan/atau
+        ID > after_id (incremental loading). Hanya baris yang cocok yang di-parse.
+        Output: list of dict dengan format yang sama seperti file JSON lama, ditambah "id"
+        """
+        where, params = self._where(start, end, query, after_id)
+        sql = f"SELECT * FROM runs{where} ORDER BY id {'DESC' if newest_first else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._connect() as conn:
+            return [self._row_to_dict(row) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def _row_to_dict(row):
+        return {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "created": row["created"],
+            "query": row["query"],
+            "retrieved_docs": json.loads(row["retrieved_docs"]),
+            "relevant_docs": json.loads(row["relevant_docs"]),
+            "metrics": json.loads(row["metrics"]),
+            "summary": {
+                "num_retrieved": row["num_retrieved"],
+                "num_relevant": row["num_relevant"],
+                "relevant_in_top_10": row["relevant_in_top_10"],
+            },
         }
-    }
-    
-    # Save to file
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(eval_data, f, indent=2, ensure_ascii=False)
-    
-    return filename
 
-def load_evaluations(folder="evaluasi"):
+    def last_id(self):
+        """ID run terakhir (0 jika kosong); simpan lalu pakai sebagai after_id berikutnya."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM runs").fetchone()[0]
+
+    def count(self, start=None, end=None, query=None):
+        where, params = self._where(start, end, query)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+    def aggregate(self, start=None, end=None, query=None):
+        """
+        Rata-rata metrik seluruh run yang cocok, dihitung oleh SQLite.
+        Output: dict {k: {precision_avg, recall_avg, f1_avg}, "MAP": rata-rata, "num_runs": n}
+        """
+        where, params = self._where(start, end, query)
+        with self._connect() as conn:
+            summary = conn.execute(f"SELECT COUNT(*), AVG(map) FROM runs{where}", params).fetchone()
+            rows = conn.execute(
+                "SELECT k, AVG(precision), AVG(recall), AVG(f1) FROM run_metrics "
+                f"WHERE run_id IN (SELECT id FROM runs{where}) GROUP BY k ORDER BY k", params)
+            results = {row[0]: {"precision_avg": round(row[1] or 0.0, 4),
+                                "recall_avg": round(row[2] or 0.0, 4),
+                                "f1_avg": round(row[3] or 0.0, 4)} for row in rows}
+        results["MAP"] = round(summary[1], 4) if summary[1] is not None else 0.0
+        results["num_runs"] = summary[0]
+        return results
+
+    def import_legacy_folder(self, folder):
+        """
+        Memindahkan file evaluation_*.json lama ke store (sekali per file).
+        File yang tidak bisa dibaca dilaporkan lewat log, bukan diabaikan diam-diam, dan tidak
+        dicatat sebagai sudah diimpor, sehingga dicoba lagi saat store dibuka berikutnya.
+        Output: (jumlah file diimpor, list file gagal)
+        """
+        if not os.path.isdir(folder):
+            return 0, []
+        files = sorted(f for f in os.listdir(folder) if f.endswith('.json'))
+        if not files:
+            return 0, []
+        with self._connect() as conn:
+            # Baris dengan run_id NULL (file gagal dari versi sebelumnya) ikut dicoba ulang
+            done = {row[0] for row in conn.execute(
+                "SELECT filename FROM legacy_files WHERE run_id IS NOT NULL")}
+
+        imported, failed = 0, []
+        for filename in files:
+            if filename in done:
+                continue
+            try:
+                with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                created = datetime.strptime(data["timestamp"], "%Y%m%d_%H%M%S").timestamp()
+                run = (data["query"], data["retrieved_docs"], data["relevant_docs"],
+                       data["metrics"], created)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Evaluasi lama {filename} tidak bisa diimpor: {e}")
+                failed.append(filename)
+                continue
+            # Run dan catatan file lama dalam satu transaksi: crash di antaranya tidak
+            # membuat file yang sama diimpor dua kali
+            with self._connect() as conn:
+                run_id = self._insert_run(conn, *run)
+                conn.execute("INSERT OR REPLACE INTO legacy_files (filename, run_id) VALUES (?, ?)",
+                             (filename, run_id))
+            imported += 1
+        return imported, failed
+
+# Satu store per folder evaluasi untuk seluruh proses (skema & impor file lama sekali saja)
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_evaluation_store(folder="evaluasi"):
     """
-    Load all evaluations from folder
+    Store evaluasi di folder, dibuat sekali per folder lalu dipakai ulang.
+    File JSON lama di folder yang sama diimpor saat store pertama kali dibuka.
+    """
+    key = os.path.abspath(folder)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = EvaluationStore(os.path.join(folder, EVALUATION_DB))
+            store.import_legacy_folder(folder)
+            _stores[key] = store
+    return store
+
+def auto_save_evaluation(query, retrieved_docs, relevant_docs, metrics, folder="evaluasi"):
+    """
+    Auto-save evaluation results ke store append-only (SQLite) di folder.
+    Output: lokasi run yang tersimpan ("<file store>#<id run>")
+    """
+    store = get_evaluation_store(folder)
+    run_id = store.append(query, retrieved_docs, relevant_docs, metrics)
+    return f"{store.path}#{run_id}"
+
+def load_evaluations(folder="evaluasi", start=None, end=None, query=None, after_id=None,
+                     limit=None):
+    """
+    Load evaluations dari store, terbaru lebih dulu.
+    Filter opsional: rentang waktu [start, end), query, after_id (hanya run baru), limit.
     """
     if not os.path.exists(folder):
         return []
-    
-    evaluations = []
-    for file in os.listdir(folder):
-        if file.endswith('.json'):
-            filepath = os.path.join(folder, file)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    evaluations.append(data)
-            except:
+    return get_evaluation_store(folder).query(start=start, end=end, query=query,
+                                              after_id=after_id, limit=limit)
+
+# =====================
+# Evaluasi batch berbasis qrels (vectorized)
+# =====================
+def load_qrels(path):
+    """
+    Membaca file qrels format TREC: "query_id iteration doc_id relevance" per baris.
+    Relevance > 0 dianggap relevan; nilainya dipakai sebagai gain untuk nDCG.
+    Output: dict {query_id: {doc_id: relevance}}
+    """
+    qrels = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 4:
                 continue
-    
-    return sorted(evaluations, key=lambda x: x['timestamp'], reverse=True)
+            query_id, _, doc_id, relevance = parts[:4]
+            qrels.setdefault(query_id, {})[doc_id] = int(relevance)
+    return qrels
+
+def load_queries(path):
+    """
+    Membaca file query: "query_id<TAB>teks query" (atau dipisah spasi pertama) per baris.
+    Output: dict {query_id: teks query} dengan urutan sesuai file
+    """
+    queries = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            query_id, _, text = line.partition("\t") if "\t" in line else line.partition(" ")
+            queries[query_id] = text.strip()
+    return queries
+
+def relevance_matrix(retrieved_ids, qrel_queries, qrel_docs, qrel_gains, n_docs):
+    """
+    Matriks gain query x peringkat dalam satu lookup vectorized.
+    Setiap pasangan (query, dokumen) di-encode menjadi satu integer query * n_docs + doc,
+    lalu dicari di array qrels yang sudah terurut dengan np.searchsorted.
+    Input: retrieved_ids (array n_query x depth, -1 = kosong), qrels sebagai tiga array flat
+           (indeks query, indeks dokumen, gain), n_docs
+    Output: np.ndarray float (n_query x depth), 0 untuk dokumen tidak relevan
+    """
+    n_queries, depth = retrieved_ids.shape
+    gains = np.zeros((n_queries, depth), dtype=np.float64)
+    if len(qrel_queries) == 0 or depth == 0:
+        return gains
+
+    qrel_keys = qrel_queries.astype(np.int64) * n_docs + qrel_docs
+    order = np.argsort(qrel_keys, kind="stable")
+    qrel_keys, qrel_gains = qrel_keys[order], qrel_gains[order]
+
+    valid = retrieved_ids >= 0
+    keys = np.arange(n_queries, dtype=np.int64)[:, None] * n_docs + retrieved_ids
+    pos = np.minimum(np.searchsorted(qrel_keys, keys), len(qrel_keys) - 1)
+    found = valid & (qrel_keys[pos] == keys)
+    gains[found] = qrel_gains[pos[found]]
+    return gains
+
+def _ideal_gains(qrel_queries, qrel_gains, n_queries, depth):
+    """Gain ideal (terurut menurun) per query sampai depth, untuk IDCG."""
+    ideal = np.zeros((n_queries, depth), dtype=np.float64)
+    if len(qrel_queries) == 0 or depth == 0:
+        return ideal
+    order = np.lexsort((-qrel_gains, qrel_queries))
+    queries, gains = qrel_queries[order], qrel_gains[order]
+    # Peringkat di dalam setiap query = posisi dikurangi awal grup query tersebut
+    starts = np.searchsorted(queries, queries, side='left')
+    ranks = np.arange(len(queries)) - starts
+    keep = ranks < depth
+    ideal[queries[keep], ranks[keep]] = gains[keep]
+    return ideal
+
+def evaluate_matrix(gains, n_relevant, ideal_gains, k_values=(1, 3, 5, 10)):
+    """
+    Semua metrik dari matriks gain query x peringkat (tanpa loop per query).
+    Input: gains (n_query x depth), n_relevant (jumlah dokumen relevan per query),
+           ideal_gains (gain ideal terurut per query), k_values
+    Output: dict per k {precision_avg, recall_avg, f1_avg, ndcg_avg}, MAP, MRR, num_queries,
+            dan "per_query" (array per query untuk analisis lanjutan)
+    """
+    n_queries, depth = gains.shape
+    hits = gains > 0
+    n_relevant = np.asarray(n_relevant, dtype=np.float64)
+    has_relevant = n_relevant > 0
+    safe_relevant = np.where(has_relevant, n_relevant, 1.0)
+
+    ranks = np.arange(1, depth + 1)
+    cum_hits = np.cumsum(hits, axis=1)
+    discounts = 1.0 / np.log2(ranks + 1)
+    dcg = np.cumsum((2.0 ** gains - 1) * discounts, axis=1)
+    idcg = np.cumsum((2.0 ** ideal_gains - 1) * discounts, axis=1)
+
+    results = {}
+    per_query = {}
+    for k in k_values:
+        kk = min(k, depth)
+        found = cum_hits[:, kk - 1] if kk > 0 else np.zeros(n_queries)
+        precision = found / k if k > 0 else np.zeros(n_queries)
+        recall = np.where(has_relevant, found / safe_relevant, 0.0)
+        denom = precision + recall
+        f1 = np.divide(2 * precision * recall, denom, out=np.zeros(n_queries), where=denom > 0)
+        if kk > 0:
+            ndcg = np.divide(dcg[:, kk - 1], idcg[:, kk - 1], out=np.zeros(n_queries),
+                             where=idcg[:, kk - 1] > 0)
+        else:
+            ndcg = np.zeros(n_queries)
+        per_query[k] = {"precision": precision, "recall": recall, "f1": f1, "ndcg": ndcg}
+        results[k] = {
+            "precision_avg": round(float(precision.mean()), 4) if n_queries else 0.0,
+            "recall_avg": round(float(recall.mean()), 4) if n_queries else 0.0,
+            "f1_avg": round(float(f1.mean()), 4) if n_queries else 0.0,
+            "ndcg_avg": round(float(ndcg.mean()), 4) if n_queries else 0.0,
+        }
+
+    # AP: rata-rata precision di setiap peringkat dokumen relevan, dibagi jumlah relevan
+    average_precision = np.where(has_relevant,
+                                 (hits * (cum_hits / ranks)).sum(axis=1) / safe_relevant, 0.0)
+    # RR: 1 / peringkat dokumen relevan pertama (0 jika tidak ada)
+    any_hit = hits.any(axis=1)
+    reciprocal_rank = np.where(any_hit, 1.0 / (np.argmax(hits, axis=1) + 1), 0.0)
+    per_query["AP"] = average_precision
+    per_query["RR"] = reciprocal_rank
+
+    results["MAP"] = round(float(average_precision.mean()), 4) if n_queries else 0.0
+    results["MRR"] = round(float(reciprocal_rank.mean()), 4) if n_queries else 0.0
+    results["num_queries"] = int(n_queries)
+    results["per_query"] = per_query
+    return results
+
+def evaluate_rankings(retrieved_docs_list, qrels_list, k_values=(1, 3, 5, 10), depth=None):
+    """
+    Versi vectorized dari evaluate_system untuk ranking yang sudah ada.
+    Input: retrieved_docs_list (list of list ID dokumen, ID apa pun yang hashable),
+           qrels_list (per query: dict {doc: gain} atau list dokumen relevan, gain 1),
+           k_values, depth (panjang ranking yang dinilai; default panjang ranking terpanjang)
+    Output: lihat evaluate_matrix
+    """
+    qrels_list = [q if isinstance(q, dict) else dict.fromkeys(q, 1) for q in qrels_list]
+    if depth is None:
+        depth = max((len(r) for r in retrieved_docs_list), default=0)
+
+    # ID dokumen -> integer (dokumen yang hanya ada di qrels tetap dapat nomor)
+    doc_index = {}
+    retrieved_ids = np.full((len(retrieved_docs_list), depth), -1, dtype=np.int64)
+    for row, retrieved in enumerate(retrieved_docs_list):
+        ids = [doc_index.setdefault(doc, len(doc_index)) for doc in retrieved[:depth]]
+        retrieved_ids[row, :len(ids)] = ids
+
+    qrel_queries, qrel_docs, qrel_gains = [], [], []
+    for row, qrels in enumerate(qrels_list):
+        for doc, gain in qrels.items():
+            if gain > 0:
+                qrel_queries.append(row)
+                qrel_docs.append(doc_index.setdefault(doc, len(doc_index)))
+                qrel_gains.append(gain)
+    qrel_queries = np.asarray(qrel_queries, dtype=np.int64)
+    qrel_docs = np.asarray(qrel_docs, dtype=np.int64)
+    qrel_gains = np.asarray(qrel_gains, dtype=np.float64)
+
+    n_queries = len(retrieved_docs_list)
+    gains = relevance_matrix(retrieved_ids, qrel_queries, qrel_docs, qrel_gains,
+                             max(len(doc_index), 1))
+    n_relevant = np.bincount(qrel_queries, minlength=n_queries)
+    ideal = _ideal_gains(qrel_queries, qrel_gains, n_queries, depth)
+    return evaluate_matrix(gains, n_relevant, ideal, k_values)
+
+def evaluate_batch(queries, qrels, vectorizer, doc_vectors, document_ids,
+                   k_values=(1, 3, 5, 10), depth=100, batch_size=1024):
+    """
+    Menjalankan semua query lewat retrieval.search_batch lalu menilai hasilnya terhadap qrels.
+    Input: queries (dict {query_id: teks}), qrels (dict hasil load_qrels),
+           vectorizer, doc_vectors, document_ids (nama dokumen per baris index),
+           k_values, depth (jumlah hasil per query yang dinilai, untuk MAP/MRR)
+    Output: lihat evaluate_matrix, ditambah "query_ids" (urutan baris per_query)
+    """
+    from retrieval import search_batch
+
+    query_ids = [query_id for query_id in queries if query_id in qrels]
+    depth = max(depth, max(k_values))
+    doc_ids_list, _ = search_batch([queries[q] for q in query_ids], vectorizer, doc_vectors,
+                                   k=depth, batch_size=batch_size)
+    retrieved_ids = np.full((len(query_ids), depth), -1, dtype=np.int64)
+    for row, doc_ids in enumerate(doc_ids_list):
+        retrieved_ids[row, :len(doc_ids)] = doc_ids
+
+    # Nama dokumen di qrels -> baris index; dokumen yang tidak ada di index diberi
+    # nomor di luar rentang sehingga tetap dihitung sebagai relevan tetapi tidak pernah ditemukan
+    doc_positions = {doc: i for i, doc in enumerate(document_ids)}
+    n_docs = len(doc_positions)
+    unknown = {}
+    qrel_queries, qrel_docs, qrel_gains = [], [], []
+    for row, query_id in enumerate(query_ids):
+        for doc, gain in qrels[query_id].items():
+            if gain > 0:
+                position = doc_positions.get(doc)
+                if position is None:
+                    position = n_docs + unknown.setdefault(doc, len(unknown))
+                qrel_queries.append(row)
+                qrel_docs.append(position)
+                qrel_gains.append(gain)
+    qrel_queries = np.asarray(qrel_queries, dtype=np.int64)
+    qrel_docs = np.asarray(qrel_docs, dtype=np.int64)
+    qrel_gains = np.asarray(qrel_gains, dtype=np.float64)
+
+    gains = relevance_matrix(retrieved_ids, qrel_queries, qrel_docs, qrel_gains,
+                             n_docs + len(unknown))
+    n_relevant = np.bincount(qrel_queries, minlength=len(query_ids))
+    ideal = _ideal_gains(qrel_queries, qrel_gains, len(query_ids), depth)
+    results = evaluate_matrix(gains, n_relevant, ideal, k_values)
+    results["query_ids"] = query_ids
+    return results
 
 # Demo mode
-if __name__ == "__main__":
+# Evaluasi qrels: python evaluation.py <qrels> <queries> [folder index, default cache/index]
+if __name__ == "__main__" and len(sys.argv) >= 3:
+    from index_store import load_index
+
+    index_dir = sys.argv[3] if len(sys.argv) > 3 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "cache", "index")
+    index = load_index(index_dir)
+    if index is None:
+        sys.exit(f"Index tidak ditemukan di {index_dir}")
+    qrels = load_qrels(sys.argv[1])
+    queries = load_queries(sys.argv[2])
+
+    start = time.perf_counter()
+    results = evaluate_batch(queries, qrels, index["vectorizer"], index["doc_vectors"],
+                             index["document_ids"])
+    elapsed = time.perf_counter() - start
+
+    print(f"{results['num_queries']} query dievaluasi dalam {elapsed:.2f} detik")
+    for k, m in results.items():
+        if isinstance(k, int):
+            print(f"K={k}: Precision={m['precision_avg']}, Recall={m['recall_avg']}, "
+                  f"F1={m['f1_avg']}, nDCG={m['ndcg_avg']}")
+    print(f"MAP: {results['MAP']}  MRR: {results['MRR']}")
+
+elif __name__ == "__main__":
     # Example usage
     retrieved = list(range(10))
     relevant = [1, 3, 5, 7, 9]
@@ -0,0 +1,395 @@
+# index_store.py (Modul 3c - Index Storage)
+import os
+import json
+import uuid
+import shutil
+from datetime import datetime
+import numpy as np
+from scipy.sparse import csr_matrix
+from retrieval import BM25Vectorizer, TfidfIndexVectorizer, HashingTfidfVectorizer, get_scorer
+from snippets import SnippetIndexWriter, SnippetIndex
+from positional_index import PositionalIndexWriter, load_positional_index
+from inverted_index import save_inverted_index, append_inverted_index, load_inverted_index
+
+# Naikkan jika layout file berubah; index dengan versi lain akan dibangun ulang
+FORMAT_VERSION = 4
+MANIFEST_FILE = "index.json"
+# Jumlah elemen per blok saat menyalin array index lama (append_to_index)
+COPY_BLOCK = 1 << 22
+
+class StringStore:
+    """
+    Kumpulan string read-only di atas file yang di-memory-map.
+    Semua string disimpan berurutan sebagai UTF-8 di <name>.bin, dengan posisi
+    awal/akhir setiap string di <name>.offsets.npy. Hanya string yang diakses
+    yang dibaca dari disk.
+    """
+    def __init__(self, folder, name):
+        self.offsets = np.load(os.path.join(folder, f"{name}.offsets.npy"), mmap_mode='r')
+        blob_path = os.path.join(folder, f"{name}.bin")
+        if os.path.getsize(blob_path) > 0:
+            self.blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        else:
+            # np.memmap tidak bisa membuka file kosong
+            self.blob = np.empty(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("StringStore index out of range")
+        return self.get_bytes(i).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get_bytes(self, i, start=0, end=None):
+        """Potongan byte UTF-8 dari string ke-i (start/end relatif terhadap awal string)."""
+        base, limit = int(self.offsets[i]), int(self.offsets[i + 1])
+        end = limit if end is None else min(base + end, limit)
+        return self.blob[base + start:end].tobytes()
+
+    def byte_length(self, i):
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+class StringStoreWriter:
+    """Menulis StringStore secara streaming, satu string per append()."""
+    def __init__(self, folder, name):
+        self.folder = folder
+        self.name = name
+        self._file = open(os.path.join(folder, f"{name}.bin"), 'wb')
+        self._offsets = [0]
+
+    def append(self, text):
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def extend(self, texts):
+        for text in texts:
+            self.append(text)
+
+    def extend_store(self, store):
+        """Menyalin seluruh string StringStore lain apa adanya (byte mentah, tanpa decode)."""
+        store.blob.tofile(self._file)
+        base = self._offsets[-1]
+        self._offsets.extend((np.asarray(store.offsets[1:]) + base).tolist())
+
+    def close(self):
+        self._file.close()
+        np.save(os.path.join(self.folder, f"{self.name}.offsets.npy"),
+                np.asarray(self._offsets, dtype=np.int64))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_strings(folder, name, texts):
+    """Menyimpan iterable string sebagai StringStore."""
+    with StringStoreWriter(folder, name) as writer:
+        writer.extend(texts)
+
+def _vectorizer_arrays(vectorizer):
+    """Statistik vectorizer yang disimpan sebagai array flat."""
+    scorer = get_scorer(vectorizer)
+    if scorer == "bm25":
+        params = {"k1": vectorizer.k1, "b": vectorizer.b}
+        arrays = {"idf": vectorizer.idf_, "doc_len": vectorizer.doc_len_}
+    elif scorer == "hashing":
+        params = {"n_features": vectorizer.n_features, "n_docs": vectorizer.n_docs_}
+        arrays = {"idf": vectorizer.idf_, "df": vectorizer.df_}
+    else:
+        params = {}
+        arrays = {"idf": vectorizer.idf_}
+    return params, arrays
+
+def _save_appended(path, base, tail, dtype=None):
+    """
+    Menyimpan array .npy berisi base (memmap) diikuti tail. base disalin per blok,
+    sehingga tidak pernah dibaca penuh ke memori.
+    """
+    dtype = dtype or base.dtype
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(len(base) + len(tail),))
+    for start in range(0, len(base), COPY_BLOCK):
+        end = min(start + COPY_BLOCK, len(base))
+        out[start:end] = base[start:end]
+    out[len(base):] = tail
+    out.flush()
+
+class IndexWriter:
+    """
+    Menulis index ke folder sementara, lalu menukarnya dengan folder index lama saat commit().
+    String dokumen bisa ditulis secara streaming lewat strings(name) sebelum index selesai
+    dibangun, sehingga teks dokumen tidak perlu ditahan di memori.
+    """
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        parent = os.path.dirname(os.path.abspath(index_dir))
+        os.makedirs(parent, exist_ok=True)
+        self.tmp_dir = f"{index_dir}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(self.tmp_dir)
+        self._writers = {}
+
+    def strings(self, name, base=None):
+        """StringStoreWriter untuk file <name> di folder index, diawali isi base (StringStore)."""
+        writer = StringStoreWriter(self.tmp_dir, name)
+        self._writers[name] = writer
+        if base is not None:
+            writer.extend_store(base)
+        return writer
+
+    def snippets(self, base=None, n_base_docs=None):
+        """
+        SnippetIndexWriter (jumlah kata dan posisi term per dokumen) di folder index,
+        diawali data n_base_docs dokumen pertama SnippetIndex base (None = semua) jika ada.
+        """
+        writer = SnippetIndexWriter(self.tmp_dir, base=base, n_base_docs=n_base_docs)
+        self._writers["snippets"] = writer
+        return writer
+
+    def positions(self, base=None, n_base_docs=0):
+        """
+        PositionalIndexWriter (opsional) untuk phrase query dan proximity boost,
+        diawali posting n_base_docs dokumen pertama PositionalIndex base jika ada.
+        """
+        writer = PositionalIndexWriter(self.tmp_dir, base=base, n_base_docs=n_base_docs)
+        self._writers["positions"] = writer
+        return writer
+
+    def commit(self, vectorizer, doc_vectors):
+        """
+        Menulis matriks, statistik vectorizer, dan manifest, lalu menukar folder.
+        Output: index_version (str)
+        """
+        self._close_writers()
+        tmp_dir = self.tmp_dir
+
+        # 1. Matriks CSR
+        doc_vectors = csr_matrix(doc_vectors)
+        doc_vectors.sort_indices()
+        np.save(os.path.join(tmp_dir, "data.npy"), doc_vectors.data)
+        np.save(os.path.join(tmp_dir, "indices.npy"), doc_vectors.indices)
+        np.save(os.path.join(tmp_dir, "indptr.npy"), doc_vectors.indptr)
+        # Posting list per term (CSC) untuk query boolean, dibangun sekali di sini
+        save_inverted_index(tmp_dir, doc_vectors)
+        return self._finish(vectorizer, doc_vectors.shape, doc_vectors.nnz)
+
+    def commit_append(self, vectorizer, base_vectors, base_postings, new_rows):
+        """
+        Seperti commit(), untuk index yang hanya bertambah dokumen: matriks base (memmap)
+        disalin per blok dan baris new_rows ditempel di belakangnya, lalu posting list base
+        diperluas dengan posting dokumen baru. Baris maupun CSC lama tidak dibangun ulang.
+        Output: index_version (str)
+        """
+        self._close_writers()
+        tmp_dir = self.tmp_dir
+        new_rows = csr_matrix(new_rows, dtype=base_vectors.dtype)
+        new_rows.sort_indices()
+        nnz = base_vectors.nnz + new_rows.nnz
+        indptr_dtype = np.int64 if nnz > np.iinfo(np.int32).max else base_vectors.indptr.dtype
+
+        # 1. Matriks CSR: baris baru ditempel, indptr-nya digeser sebanyak nnz lama
+        _save_appended(os.path.join(tmp_dir, "data.npy"), base_vectors.data, new_rows.data)
+        _save_appended(os.path.join(tmp_dir, "indices.npy"), base_vectors.indices, new_rows.indices)
+        _save_appended(os.path.join(tmp_dir, "indptr.npy"), base_vectors.indptr,
+                       new_rows.indptr[1:].astype(np.int64) + base_vectors.nnz, dtype=indptr_dtype)
+        append_inverted_index(tmp_dir, base_postings, new_rows)
+        shape = (base_vectors.shape[0] + new_rows.shape[0], base_vectors.shape[1])
+        return self._finish(vectorizer, shape, nnz)
+
+    def _close_writers(self):
+        for writer in self._writers.values():
+            writer.close()
+
+    def _finish(self, vectorizer, shape, nnz):
+        """Menulis statistik vectorizer dan manifest, lalu menukar folder."""
+        tmp_dir = self.tmp_dir
+
+        # 2. Statistik vectorizer dan vocabulary (scorer hashing tidak punya vocabulary)
+        params, arrays = _vectorizer_arrays(vectorizer)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(array))
+        if get_scorer(vectorizer) != "hashing":
+            # Term tidak pernah mengandung newline, jadi cukup satu term per baris
+            with open(os.path.join(tmp_dir, "vocabulary.txt"), 'w', encoding='utf-8') as f:
+                f.write("\n".join(vectorizer.get_feature_names_out()))
+
+        # 3. Manifest ditulis terakhir
+        index_version = uuid.uuid4().hex
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "index_version": index_version,
+            "created": datetime.now().isoformat(),
+            "scorer": get_scorer(vectorizer),
+            "params": params,
+            "n_docs": int(shape[0]),
+            "n_terms": int(shape[1]),
+            "nnz": int(nnz),
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # 4. Tukar folder lama dengan yang baru. Proses lain yang masih memetakan
+        # file lama tetap aman karena file yang sudah dibuka tidak ikut hilang.
+        old_dir = None
+        if os.path.exists(self.index_dir):
+            old_dir = f"{self.index_dir}.old-{uuid.uuid4().hex}"
+            os.rename(self.index_dir, old_dir)
+        os.rename(tmp_dir, self.index_dir)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+        return index_version
+
+    def abort(self):
+        """Membatalkan penulisan dan menghapus folder sementara."""
+        self._close_writers()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+def save_index(index_dir, vectorizer, doc_vectors, document_ids, raw_documents,
+               processed_documents, positional=False):
+    """
+    Menyimpan index ke folder dalam format biner:
+    - index.json: manifest berversi (format, versi index, shape, scorer, parameter)
+    - data.npy / indices.npy / indptr.npy: array CSR doc_vectors
+    - post_*.npy: posting list per term (CSC) dan bobot maksimum per term
+    - idf.npy (dan doc_len.npy untuk BM25), vocabulary.txt: term sesuai urutan kolom
+      (scorer hashing: df.npy, tanpa vocabulary)
+    - document_ids / raw_documents / processed_documents: StringStore
+    - word_counts.npy dan snippet_*: jumlah kata dan posisi byte term per dokumen (snippets)
+    - pos_* dan positions.bin: positional index, hanya jika positional=True
+    Folder ditulis di lokasi sementara lalu ditukar, sehingga pembaca tidak pernah
+    melihat index setengah jadi.
+    Output: index_version (str)
+    """
+    writer = IndexWriter(index_dir)
+    try:
+        writer.strings("document_ids").extend(document_ids)
+        writer.strings("raw_documents").extend(raw_documents)
+        writer.strings("processed_documents").extend(processed_documents)
+        snippet_writer = writer.snippets()
+        for text in raw_documents:
+            snippet_writer.add(text)
+        if positional:
+            position_writer = writer.positions()
+            for processed in processed_documents:
+                position_writer.add(processed)
+        return writer.commit(vectorizer, doc_vectors)
+    except BaseException:
+        writer.abort()
+        raise
+
+def append_to_index(index_dir, document_ids, raw_documents, processed_documents):
+    """
+    Menambahkan dokumen ke index scorer "hashing" tanpa fit ulang: token dokumen baru
+    di-hash dan df ditambah. Bobot dokumen hashing tidak memakai IDF, sehingga baris lama
+    tidak dihitung ulang. Matriks, posting list, string, data snippet, dan positional index
+    dokumen lama hanya disalin per blok dari memmap; yang dihitung hanya baris dan posting
+    dokumen baru.
+    Index ditulis lewat IndexWriter (folder sementara lalu ditukar).
+    Output: index_version (str)
+    """
+    index = load_index(index_dir)
+    if index is None:
+        raise ValueError(f"Index tidak ditemukan di {index_dir}")
+    if index["manifest"]["scorer"] != "hashing":
+        raise ValueError("append_to_index hanya untuk index dengan scorer 'hashing'")
+
+    raw_documents = list(raw_documents)
+    processed_documents = list(processed_documents)
+    vectorizer = index["vectorizer"]
+    new_rows = vectorizer.append_documents(processed_documents)
+
+    writer = IndexWriter(index_dir)
+    try:
+        writer.strings("document_ids", base=index["document_ids"]).extend(document_ids)
+        writer.strings("raw_documents", base=index["raw_documents"]).extend(raw_documents)
+        writer.strings("processed_documents",
+                       base=index["processed_documents"]).extend(processed_documents)
+        snippet_writer = writer.snippets(base=index["snippets"])
+        for text in raw_documents:
+            snippet_writer.add(text)
+        if index["positions"] is not None:
+            position_writer = writer.positions(base=index["positions"],
+                                               n_base_docs=index["manifest"]["n_docs"])
+            for processed in processed_documents:
+                position_writer.add(processed)
+        return writer.commit_append(vectorizer, index["doc_vectors"], index["inverted_index"],
+                                    new_rows)
+    except BaseException:
+        writer.abort()
+        raise
+
+def read_index_manifest(index_dir):
+    """Membaca index.json, None jika tidak ada atau versinya tidak cocok."""
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+def _load_vectorizer(index_dir, manifest):
+    """Membangun ulang vectorizer dari statistik yang tersimpan (tanpa pickle)."""
+    if manifest["scorer"] == "hashing":
+        def load_array(name):
+            return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode='r')
+
+        return HashingTfidfVectorizer.from_statistics(
+            load_array("df"), manifest["params"]["n_docs"], idf=load_array("idf"))
+    with open(os.path.join(index_dir, "vocabulary.txt"), 'r', encoding='utf-8') as f:
+        content = f.read()
+    terms = content.split("\n") if content else []
+    vocabulary = dict(zip(terms, range(len(terms))))
+    idf = np.load(os.path.join(index_dir, "idf.npy"), mmap_mode='r')
+    if manifest["scorer"] == "bm25":
+        doc_len = np.load(os.path.join(index_dir, "doc_len.npy"), mmap_mode='r')
+        return BM25Vectorizer.from_statistics(vocabulary, idf, doc_len, **manifest["params"])
+    return TfidfIndexVectorizer.from_statistics(vocabulary, idf)
+
+def load_index(index_dir):
+    """
+    Membuka index dengan np.memmap: array hanya dipetakan ke memori, bukan dibaca penuh,
+    sehingga waktu startup dan RSS hampir konstan terhadap ukuran corpus, dan beberapa
+    proses di satu host berbagi page cache yang sama.
+    Output: dict berisi vectorizer, doc_vectors, document_ids, raw_documents,
+            processed_documents, snippets, positions (None jika tidak dibangun),
+            inverted_index, index_version, dan manifest; None jika index belum ada.
+    """
+    manifest = read_index_manifest(index_dir)
+    if manifest is None:
+        return None
+
+    def load_array(name):
+        return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode='r')
+
+    shape = (manifest["n_docs"], manifest["n_terms"])
+    doc_vectors = csr_matrix(
+        (load_array("data"), load_array("indices"), load_array("indptr")),
+        shape=shape, copy=False
+    )
+    return {
+        "vectorizer": _load_vectorizer(index_dir, manifest),
+        "doc_vectors": doc_vectors,
+        "document_ids": StringStore(index_dir, "document_ids"),
+        "raw_documents": StringStore(index_dir, "raw_documents"),
+        "processed_documents": StringStore(index_dir, "processed_documents"),
+        "snippets": SnippetIndex(index_dir),
+        "positions": load_positional_index(index_dir),
+        "inverted_index": load_inverted_index(index_dir, manifest["n_docs"]),
+        "index_version": manifest["index_version"],
+        "manifest": manifest,
+    }
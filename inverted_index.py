@@ -0,0 +1,249 @@
+# inverted_index.py (Modul 3b - Inverted Index)
+import os
+import sys
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from retrieval import top_k
+
+# Toleransi floating point saat pruning supaya dokumen di batas skor tidak ikut terbuang
+_PRUNE_EPS = 1e-9
+
+# Nama file posting list di folder index
+POSTING_INDPTR_FILE = "post_indptr.npy"
+POSTING_DOCS_FILE = "post_doc_ids.npy"
+POSTING_WEIGHTS_FILE = "post_weights.npy"
+MAX_WEIGHTS_FILE = "post_max_weights.npy"
+
+# Jumlah posting (kira-kira) per blok term saat posting dokumen baru ditempel ke index lama
+APPEND_BLOCK_POSTINGS = 1_000_000
+
+class InvertedIndex:
+    """
+    Inverted index dari matriks TF-IDF (hasil build_index).
+    Posting list setiap term disimpan sebagai array flat (format CSC):
+    doc_ids[indptr[t]:indptr[t+1]] terurut naik, dengan bobot di weights.
+    Bisa dibangun dari doc_vectors, atau dibuka dari array yang disimpan index_store
+    (load_inverted_index) tanpa menyalin posting list ke memori.
+    """
+    def __init__(self, doc_vectors=None, arrays=None):
+        if arrays is None:
+            csc = doc_vectors.tocsc()
+            csc.sort_indices()
+            arrays = (csc.shape[0], csc.indptr, csc.indices, csc.data, None)
+        self.n_docs, self.indptr, self.doc_ids, self.weights, self.max_weights = arrays
+        self.n_terms = len(self.indptr) - 1
+
+        if self.max_weights is None:
+            # Upper bound bobot per term, dipakai untuk early termination (MaxScore)
+            self.max_weights = max_term_weights(self.indptr, self.weights)
+
+    def postings(self, term_id):
+        """Posting list satu term: (doc_ids, weights)."""
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        return self.doc_ids[start:end], self.weights[start:end]
+
+    def document_frequency(self, term_id):
+        return int(self.indptr[term_id + 1] - self.indptr[term_id])
+
+    def score_top_k(self, term_ids, query_weights, k=10, min_score=0.0):
+        """
+        Skoring term-at-a-time dengan pruning gaya MaxScore.
+        Term diproses dari upper bound terbesar. Begitu sisa upper bound lebih kecil
+        dari skor ke-k saat ini, dokumen baru tidak mungkin masuk top-k, sehingga
+        posting list sisanya hanya di-probe (searchsorted) untuk kandidat yang ada.
+        Output: doc_ids (np.ndarray), scores (np.ndarray)
+        """
+        term_ids = np.asarray(term_ids)
+        query_weights = np.asarray(query_weights, dtype=np.float64)
+
+        # 1. Urutkan term berdasarkan kontribusi maksimum
+        bounds = query_weights * self.max_weights[term_ids]
+        order = np.argsort(-bounds, kind="stable")
+        term_ids, query_weights, bounds = term_ids[order], query_weights[order], bounds[order]
+        # remaining[i] = total upper bound term ke-i dan seterusnya
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        cand_ids = np.empty(0, dtype=self.doc_ids.dtype)
+        cand_scores = np.empty(0, dtype=np.float64)
+
+        for i, (term_id, q_weight) in enumerate(zip(term_ids, query_weights)):
+            docs, weights = self.postings(term_id)
+            if len(docs) == 0:
+                continue
+            theta = self._threshold(cand_scores, k, min_score)
+
+            if remaining[i] < theta - _PRUNE_EPS:
+                # 2a. Term non-esensial: hanya update kandidat yang sudah ada
+                pos = np.searchsorted(docs, cand_ids)
+                pos_clip = np.minimum(pos, len(docs) - 1)
+                found = (pos < len(docs)) & (docs[pos_clip] == cand_ids)
+                cand_scores[found] += q_weight * weights[pos_clip[found]]
+            else:
+                # 2b. Term esensial: gabungkan posting list ke kandidat (tetap terurut)
+                merged_ids = np.union1d(cand_ids, docs)
+                merged_scores = np.zeros(len(merged_ids), dtype=np.float64)
+                merged_scores[np.searchsorted(merged_ids, cand_ids)] = cand_scores
+                merged_scores[np.searchsorted(merged_ids, docs)] += q_weight * weights
+                cand_ids, cand_scores = merged_ids, merged_scores
+
+            # 3. Buang kandidat yang tidak mungkin lagi mencapai threshold
+            theta = self._threshold(cand_scores, k, min_score)
+            if theta > 0:
+                keep = cand_scores + remaining[i + 1] >= theta - _PRUNE_EPS
+                cand_ids, cand_scores = cand_ids[keep], cand_scores[keep]
+
+        # 4. Seleksi top-k dari kandidat; kandidat terurut per ID sehingga seri
+        # diputus berdasarkan ID dokumen, sama dengan search biasa
+        positions, scores, _ = top_k(cand_scores, k, min_score)
+        return cand_ids[positions], scores
+
+    @staticmethod
+    def _threshold(cand_scores, k, min_score):
+        """Batas bawah skor ke-k (minimal min_score)."""
+        if k is None or len(cand_scores) < k or k <= 0:
+            return min_score
+        kth = np.partition(cand_scores, len(cand_scores) - k)[len(cand_scores) - k]
+        return max(kth, min_score)
+
+def max_term_weights(indptr, weights):
+    """Bobot maksimum setiap term (0 untuk term tanpa posting)."""
+    max_weights = np.zeros(len(indptr) - 1, dtype=weights.dtype)
+    non_empty = np.flatnonzero(np.diff(indptr) > 0)
+    if len(non_empty):
+        max_weights[non_empty] = np.maximum.reduceat(weights, indptr[non_empty])
+    return max_weights
+
+def save_inverted_index(folder, doc_vectors):
+    """
+    Menyimpan posting list (CSC doc_vectors) dan bobot maksimum per term ke folder index,
+    sehingga query boolean / MaxScore cukup membuka file lewat memmap.
+    """
+    csc = csr_matrix(doc_vectors).tocsc()
+    csc.sort_indices()
+    np.save(os.path.join(folder, POSTING_INDPTR_FILE), csc.indptr)
+    np.save(os.path.join(folder, POSTING_DOCS_FILE), csc.indices)
+    np.save(os.path.join(folder, POSTING_WEIGHTS_FILE), csc.data)
+    np.save(os.path.join(folder, MAX_WEIGHTS_FILE), max_term_weights(csc.indptr, csc.data))
+
+def append_inverted_index(folder, base, new_rows):
+    """
+    Menyimpan posting list base (InvertedIndex) ditambah dokumen baru new_rows (CSR, ID dokumen
+    lanjut dari base.n_docs) tanpa membangun ulang CSC seluruh matriks: posting baru setiap
+    term ditempel di belakang posting lamanya, per blok term, dan bobot maksimum per term
+    cukup diambil maksimum dengan bobot dokumen baru.
+    """
+    new_csc = csr_matrix(new_rows).tocsc()
+    new_csc.sort_indices()
+    base_indptr = np.asarray(base.indptr, dtype=np.int64)
+    new_indptr = new_csc.indptr.astype(np.int64)
+    indptr = base_indptr + new_indptr
+    n_terms, n_postings = len(indptr) - 1, int(indptr[-1])
+    n_docs = base.n_docs + new_csc.shape[0]
+    doc_dtype = np.int64 if n_docs > np.iinfo(np.int32).max else base.doc_ids.dtype
+
+    indptr_dtype = np.int64 if n_postings > np.iinfo(np.int32).max else base.indptr.dtype
+    np.save(os.path.join(folder, POSTING_INDPTR_FILE), indptr.astype(indptr_dtype))
+    out_docs = np.lib.format.open_memmap(os.path.join(folder, POSTING_DOCS_FILE), mode='w+',
+                                         dtype=doc_dtype, shape=(n_postings,))
+    out_weights = np.lib.format.open_memmap(os.path.join(folder, POSTING_WEIGHTS_FILE), mode='w+',
+                                            dtype=base.weights.dtype, shape=(n_postings,))
+    t_start = 0
+    while t_start < n_terms:
+        t_end = int(np.searchsorted(indptr, indptr[t_start] + APPEND_BLOCK_POSTINGS,
+                                    side='right')) - 1
+        t_end = min(max(t_end, t_start + 1), n_terms)
+        block = slice(int(indptr[t_start]), int(indptr[t_end]))
+        block_docs = np.empty(block.stop - block.start, dtype=doc_dtype)
+        block_weights = np.empty(block.stop - block.start, dtype=base.weights.dtype)
+
+        # 1. Posting lama bergeser sebanyak posting baru milik term-term sebelumnya
+        old = slice(int(base_indptr[t_start]), int(base_indptr[t_end]))
+        terms = np.repeat(np.arange(t_start, t_end), np.diff(base_indptr[t_start:t_end + 1]))
+        target = np.arange(old.start, old.stop) + new_indptr[terms] - block.start
+        block_docs[target] = base.doc_ids[old]
+        block_weights[target] = base.weights[old]
+
+        # 2. Posting baru ditempatkan setelah seluruh posting lama term-nya
+        new = slice(int(new_indptr[t_start]), int(new_indptr[t_end]))
+        terms = np.repeat(np.arange(t_start, t_end), np.diff(new_indptr[t_start:t_end + 1]))
+        target = np.arange(new.start, new.stop) + base_indptr[terms + 1] - block.start
+        block_docs[target] = new_csc.indices[new] + base.n_docs
+        block_weights[target] = new_csc.data[new]
+
+        out_docs[block] = block_docs
+        out_weights[block] = block_weights
+        t_start = t_end
+    out_docs.flush()
+    out_weights.flush()
+    del out_docs, out_weights
+
+    max_weights = np.maximum(np.asarray(base.max_weights),
+                             max_term_weights(new_indptr, new_csc.data.astype(base.weights.dtype)))
+    np.save(os.path.join(folder, MAX_WEIGHTS_FILE), max_weights)
+
+def load_inverted_index(folder, n_docs):
+    """Membuka posting list yang disimpan save_inverted_index (memmap); None jika tidak ada."""
+    if not os.path.exists(os.path.join(folder, POSTING_INDPTR_FILE)):
+        return None
+
+    def load_array(name):
+        return np.load(os.path.join(folder, name), mmap_mode='r')
+
+    return InvertedIndex(arrays=(n_docs, load_array(POSTING_INDPTR_FILE),
+                                 load_array(POSTING_DOCS_FILE), load_array(POSTING_WEIGHTS_FILE),
+                                 load_array(MAX_WEIGHTS_FILE)))
+
+def build_inverted_index(doc_vectors):
+    """
+    Membangun inverted index dari doc_vectors hasil build_index.
+    Output: objek InvertedIndex
+    """
+    return InvertedIndex(doc_vectors)
+
+def search_inverted(query, vectorizer, index, k=10, min_score=0.0):
+    """
+    Mencari top-k dokumen lewat inverted index.
+    Vektor query dan dokumen TF-IDF sudah dinormalisasi L2, sehingga dot product
+    pada posting list menghasilkan skor yang sama dengan cosine similarity.
+    Untuk BM25 (build_index(..., scorer="bm25")) skornya memang dot product.
+    Input: query (str), vectorizer (objek), index (InvertedIndex), k, min_score
+    Output: doc_ids (np.ndarray), scores (np.ndarray)
+    """
+    query_vector = vectorizer.transform([query]).tocsr()
+    return index.score_top_k(query_vector.indices, query_vector.data, k, min_score)
+
+# Benchmark: latency cosine vs inverted index untuk berbagai ukuran corpus
+if __name__ == "__main__":
+    from retrieval import build_index, search_top_k
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rng = np.random.default_rng(42)
+    vocab = np.array([f"kata{i}" for i in range(20000)])
+    # Distribusi Zipf supaya mirip frekuensi kata pada teks asli
+    zipf = 1.0 / np.arange(1, len(vocab) + 1)
+    zipf /= zipf.sum()
+    queries = [" ".join(rng.choice(vocab[:2000], size=rng.integers(2, 5))) for _ in range(50)]
+
+    print(f"{'docs':>8s} {'cosine (ms)':>12s} {'inverted (ms)':>14s} {'speedup':>8s} {'same ranking':>13s}")
+    for n_docs in sizes:
+        docs = [" ".join(rng.choice(vocab, size=rng.integers(50, 200), p=zipf)) for _ in range(n_docs)]
+        vectorizer, doc_vectors = build_index(docs)
+        index = build_inverted_index(doc_vectors)
+
+        same = True
+        t_cosine = t_inverted = 0.0
+        for query in queries:
+            start = time.perf_counter()
+            ids_a, _, _ = search_top_k(query, vectorizer, doc_vectors, k=10)
+            t_cosine += time.perf_counter() - start
+
+            start = time.perf_counter()
+            ids_b, _ = search_inverted(query, vectorizer, index, k=10)
+            t_inverted += time.perf_counter() - start
+            same &= np.array_equal(ids_a, ids_b)
+
+        ms_cosine = t_cosine / len(queries) * 1000
+        ms_inverted = t_inverted / len(queries) * 1000
+        print(f"{n_docs:>8d} {ms_cosine:>12.3f} {ms_inverted:>14.3f} "
+              f"{ms_cosine / ms_inverted:>7.1f}x {str(same):>13s}")
@@ -0,0 +1,262 @@
+# metrics.py (Instrumentasi: timer, histogram, counter)
+import os
+import time
+import bisect
+import threading
+import functools
+
+# Batas bucket histogram dalam detik (100 µs sampai 10 detik)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    """Counter yang hanya bisa bertambah."""
+    def __init__(self, name, help_text="", labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class Histogram:
+    """Histogram dengan bucket tetap (format Prometheus), ditambah total dan jumlah observasi."""
+    def __init__(self, name, help_text="", labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # elemen terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Perkiraan kuantil: batas atas bucket tempat kuantil tersebut jatuh."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+class _Timer:
+    """Context manager yang mencatat durasi blok ke histogram."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class _NoopTimer:
+    """Timer kosong saat metrics dimatikan: tidak membaca jam, tidak mengunci apa pun."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+class MetricsRegistry:
+    """
+    Kumpulan counter dan histogram, di-key oleh (nama, label).
+    Saat enabled False, timer() dan inc() langsung kembali sehingga overhead-nya
+    hanya satu pengecekan boolean per pemanggilan.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text="", **labels):
+        key = (name, _label_key(labels))
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter(name, help_text, key[1]))
+                self._help.setdefault(name, help_text)
+        return counter
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, _label_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, Histogram(name, help_text, key[1], buckets))
+                self._help.setdefault(name, help_text)
+        return histogram
+
+    def timer(self, name, help_text="", **labels):
+        """Context manager pengukur durasi; no-op jika metrics dimatikan."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self.histogram(name, help_text, **labels))
+
+    def inc(self, name, amount=1, help_text="", **labels):
+        if self.enabled:
+            self.counter(name, help_text, **labels).inc(amount)
+
+    def _items(self):
+        """Salinan (counters, histograms) terurut, aman dibaca saat thread lain menambah metrik."""
+        with self._lock:
+            return sorted(self._counters.items()), sorted(self._histograms.items())
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def snapshot(self):
+        """State mentah (bisa di-pickle) untuk dikirim dari worker process ke proses utama."""
+        with self._lock:
+            return {
+                "help": dict(self._help),
+                "counters": {key: c.value for key, c in self._counters.items()},
+                "histograms": {key: (h.buckets, list(h.counts), h.sum, h.count)
+                               for key, h in self._histograms.items()},
+            }
+
+    def drain(self):
+        """snapshot() lalu reset(), dipakai worker setelah setiap chunk."""
+        state = self.snapshot()
+        self.reset()
+        return state
+
+    def merge(self, state):
+        """Menjumlahkan snapshot dari proses lain ke registry ini."""
+        for (name, labels), value in state["counters"].items():
+            self.counter(name, state["help"].get(name, ""), **dict(labels)).inc(value)
+        for (name, labels), (buckets, counts, total, count) in state["histograms"].items():
+            histogram = self.histogram(name, state["help"].get(name, ""), buckets, **dict(labels))
+            with histogram._lock:
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+
+    def to_prometheus(self):
+        """Semua metrik dalam format teks Prometheus (exposition format 0.0.4)."""
+        lines = []
+        by_name = {}
+        counters, histograms = self._items()
+        for key, counter in counters:
+            by_name.setdefault(key[0], ("counter", []))[1].append(counter)
+        for key, histogram in histograms:
+            by_name.setdefault(key[0], ("histogram", []))[1].append(histogram)
+
+        for name, (kind, metrics) in sorted(by_name.items()):
+            if self._help.get(name):
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in metrics:
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(metric.labels)} {metric.value}")
+                    continue
+                cumulative = 0
+                for bound, n in zip(metric.buckets + (float("inf"),), metric.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(metric.labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(metric.labels)} {metric.sum!r}")
+                lines.append(f"{name}_count{_format_labels(metric.labels)} {metric.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def summary(self):
+        """
+        Ringkasan untuk ditampilkan di UI.
+        Output: {"timers": list of dict {metric, labels, count, total_s, mean_ms, p95_ms},
+                 "counters": list of dict {metric, labels, value}}
+        """
+        counters, histograms = self._items()
+        timers = []
+        for (name, labels), h in histograms:
+            timers.append({
+                "metric": name,
+                "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                "count": h.count,
+                "total_s": round(h.sum, 4),
+                "mean_ms": round(h.sum / h.count * 1000, 3) if h.count else 0.0,
+                "p95_ms": round(h.quantile(0.95) * 1000, 3),
+            })
+        counters = [{"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                     "value": c.value}
+                    for (name, labels), c in counters]
+        return {"timers": timers, "counters": counters}
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+# Registry global; aktifkan dengan DOUGGLE_METRICS=1 atau enable()
+registry = MetricsRegistry(enabled=os.environ.get("DOUGGLE_METRICS", "0") == "1")
+
+def enable():
+    registry.enabled = True
+
+def disable():
+    registry.enabled = False
+
+def is_enabled():
+    return registry.enabled
+
+def timer(name, help_text="", **labels):
+    """with metrics.timer("douggle_x_seconds", step="..."): ..."""
+    return registry.timer(name, help_text, **labels)
+
+def inc(name, amount=1, help_text="", **labels):
+    registry.inc(name, amount, help_text, **labels)
+
+def timed(name, help_text="", **labels):
+    """
+    Decorator pengukur durasi fungsi. Saat metrics dimatikan, wrapper langsung
+    memanggil fungsi asli tanpa membaca jam.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            with registry.timer(name, help_text, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def export_prometheus():
+    return registry.to_prometheus()
+
+def summary():
+    return registry.summary()
+
+def reset():
+    registry.reset()
@@ -0,0 +1,512 @@
+# positional_index.py (Modul 3h - Positional Index)
+import os
+import re
+import shutil
+import sys
+import time
+from array import array
+import numpy as np
+from preprocessing import preprocess_query_pengguna
+from retrieval import TOKEN_PATTERN, compute_scores, top_k
+
+# Nama file di folder index
+TERM_INDPTR_FILE = "pos_term_indptr.npy"
+POSTING_DOCS_FILE = "pos_doc_ids.npy"
+POSTING_INDPTR_FILE = "pos_byte_indptr.npy"
+POSITIONS_FILE = "positions.bin"
+VOCABULARY_FILE = "pos_vocabulary.txt"
+# Folder sementara untuk run terurut selama index ditulis
+RUNS_FOLDER = "pos_runs"
+
+# Jumlah token yang ditampung di memori sebelum ditulis ke disk sebagai satu run
+SPILL_TOKENS = 2_000_000
+# Jumlah posting (kira-kira) per blok term saat menggabungkan run
+MERGE_POSTINGS = 1_000_000
+
+# Jumlah dokumen teratas (hasil cosine) yang diberi proximity boost
+PROXIMITY_CANDIDATES = 200
+# Skor akhir = skor * (1 + PROXIMITY_WEIGHT * proximity) / (1 + PROXIMITY_WEIGHT),
+# proximity di rentang 0 - 1, sehingga skor akhir tetap 0 - 1
+PROXIMITY_WEIGHT = 0.5
+
+_PHRASE = re.compile(r'"([^"]*)"')
+
+def encode_varints(values):
+    """
+    Variable-byte encoding: 7 bit per byte, bit tertinggi = masih ada byte berikutnya.
+    Output: bytes (np.ndarray uint8), jumlah byte per nilai (np.ndarray)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    n_bytes = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21, 28, 35):
+        n_bytes += values >= (1 << shift)
+    starts = np.cumsum(n_bytes) - n_bytes
+    out = np.empty(int(n_bytes.sum()), dtype=np.uint8)
+    for j in range(int(n_bytes.max()) if len(values) else 0):
+        has_byte = n_bytes > j
+        byte = (values[has_byte] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        byte |= np.where(n_bytes[has_byte] > j + 1, 0x80, 0).astype(np.uint64)
+        out[starts[has_byte] + j] = byte
+    return out, n_bytes
+
+def decode_varints(data):
+    """Kebalikan encode_varints. Output: (nilai, indeks byte terakhir tiap nilai)"""
+    data = np.asarray(data, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == 0:
+        return np.empty(0, dtype=np.int64), ends
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    value_index = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = (np.arange(len(data)) - starts[value_index]) * 7
+    parts = (data & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts), ends
+
+class PositionalIndexWriter:
+    """
+    Menulis positional index secara streaming, satu dokumen hasil preprocessing per add().
+    Token ditampung per dokumen (term ID per posisi); setiap spill_tokens token, tampungan
+    diurutkan per term dan ditulis ke disk sebagai satu run, sehingga memori hanya sebesar
+    satu run. Setiap posting (term, dokumen) menyimpan daftar posisinya sebagai selisih
+    (delta) yang di-encode variable-byte. Saat close() semua run digabung per blok term.
+    Jika base (PositionalIndex) diberikan, n_base_docs dokumen pertamanya disalin dengan ID
+    yang sama dan dokumen yang di-add() diberi ID mulai n_base_docs. Dokumen base lain bisa
+    disalin satu per satu lewat add_from(). Posting base ikut digabung sebagai satu run
+    (ID dokumen dipetakan ulang, dokumen yang tidak disalin dibuang) tanpa men-decode posisi
+    lama; vocabulary base mendapat term ID pertama sehingga term ID-nya tetap.
+    """
+    def __init__(self, folder, base=None, n_base_docs=0, spill_tokens=SPILL_TOKENS):
+        self.folder = folder
+        self._base = base
+        self._n_base_docs = n_base_docs
+        self._next_doc = n_base_docs
+        # Dokumen base yang disalin lewat add_from(): ID lama -> ID baru
+        self._copied_old = array('q')
+        self._copied_new = array('q')
+        self._spill_tokens = spill_tokens
+        self._terms = dict(base.vocabulary) if base is not None else {}
+        self._term_ids = array('i')
+        self._doc_lengths = array('q')
+        self._run_dir = os.path.join(folder, RUNS_FOLDER)
+        self._n_runs = 0
+        self._closed = False
+
+    def add(self, processed_text):
+        terms = self._terms
+        tokens = TOKEN_PATTERN.findall(processed_text.lower())
+        self._term_ids.extend(terms.setdefault(token, len(terms)) for token in tokens)
+        self._doc_lengths.append(len(tokens))
+        if len(self._term_ids) >= self._spill_tokens:
+            self.flush()
+
+    def add_from(self, doc_index):
+        """Menyalin posting dokumen ke-doc_index dari base (tanpa tokenisasi ulang)."""
+        self._copied_old.append(doc_index)
+        self._copied_new.append(self._next_doc + len(self._doc_lengths))
+        # Dokumen kosong di run: hanya menempati ID, posting-nya diambil dari base saat close()
+        self._doc_lengths.append(0)
+
+    def _encode_postings(self):
+        """
+        Posting dokumen yang sedang ditampung, urut per term lalu dokumen.
+        Output: term setiap posting, dokumen setiap posting, byte_indptr, data (bytes varint)
+        """
+        term_ids = np.frombuffer(self._term_ids, dtype=np.int32)
+        doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.int64)
+
+        # 1. Dokumen dan posisi setiap token, lalu urutkan per term (stable: tetap urut dokumen/posisi)
+        doc_starts = np.cumsum(doc_lengths) - doc_lengths
+        docs = np.repeat(np.arange(self._next_doc, self._next_doc + len(doc_lengths),
+                                   dtype=np.int32), doc_lengths)
+        positions = np.arange(len(term_ids), dtype=np.int64) - np.repeat(doc_starts, doc_lengths)
+        order = np.argsort(term_ids, kind='stable')
+        term_ids, docs, positions = term_ids[order], docs[order], positions[order]
+
+        # 2. Awal setiap posting (pasangan term, dokumen)
+        new_posting = np.ones(len(term_ids), dtype=bool)
+        new_posting[1:] = (term_ids[1:] != term_ids[:-1]) | (docs[1:] != docs[:-1])
+        posting_starts = np.flatnonzero(new_posting)
+
+        # 3. Delta posisi di dalam posting (posisi pertama disimpan utuh)
+        gaps = np.diff(positions, prepend=0)
+        gaps[posting_starts] = positions[posting_starts]
+        data, n_bytes = encode_varints(gaps)
+        byte_indptr = np.zeros(len(posting_starts) + 1, dtype=np.int64)
+        if len(posting_starts):
+            np.cumsum(np.add.reduceat(n_bytes, posting_starts), out=byte_indptr[1:])
+        return term_ids[posting_starts], docs[posting_starts], byte_indptr, data
+
+    def flush(self):
+        """Menulis dokumen yang sedang ditampung ke disk sebagai satu run terurut."""
+        if not self._doc_lengths:
+            return
+        posting_terms, docs, byte_indptr, data = self._encode_postings()
+        run_dir = os.path.join(self._run_dir, str(self._n_runs))
+        os.makedirs(run_dir)
+        np.save(os.path.join(run_dir, "terms.npy"), posting_terms)
+        np.save(os.path.join(run_dir, "docs.npy"), docs)
+        np.save(os.path.join(run_dir, "byte_indptr.npy"), byte_indptr)
+        np.save(os.path.join(run_dir, "data.npy"), data)
+        self._n_runs += 1
+        self._next_doc += len(self._doc_lengths)
+        self._term_ids = array('i')
+        self._doc_lengths = array('q')
+
+    def _base_doc_map(self):
+        """Array ID dokumen base -> ID baru (-1 = tidak disalin)."""
+        copied_old = np.frombuffer(self._copied_old, dtype=np.int64)
+        size = max(self._n_base_docs, int(copied_old.max()) + 1 if len(copied_old) else 0)
+        doc_map = np.full(size, -1, dtype=np.int64)
+        doc_map[:self._n_base_docs] = np.arange(self._n_base_docs)
+        doc_map[copied_old] = np.frombuffer(self._copied_new, dtype=np.int64)
+        return doc_map
+
+    @staticmethod
+    def _map_docs(doc_map, docs):
+        docs = np.asarray(docs, dtype=np.int64)
+        mapped = doc_map[np.minimum(docs, len(doc_map) - 1)] if len(doc_map) else -np.ones_like(docs)
+        mapped[docs >= len(doc_map)] = -1
+        return mapped
+
+    def _runs(self, n_terms):
+        """
+        Posting base (jika ada) lalu setiap run.
+        Output: list (term_indptr hasil, term_indptr posting tersimpan, docs, byte_indptr, data,
+        peta ID dokumen atau None); term_indptr panjangnya n_terms + 1
+        """
+        runs = []
+        if self._base is not None:
+            base = self._base
+            raw_indptr = np.asarray(base.term_indptr)
+            # Term baru (belum ada di base) tidak punya posting base
+            raw_indptr = np.concatenate(
+                [raw_indptr, np.full(n_terms + 1 - len(raw_indptr), raw_indptr[-1])])
+            # Jumlah posting yang tetap ada per term, dihitung per blok posting
+            doc_map = self._base_doc_map()
+            counts = np.zeros(n_terms, dtype=np.int64)
+            for start in range(0, int(raw_indptr[-1]), MERGE_POSTINGS):
+                docs = base.doc_ids[start:start + MERGE_POSTINGS]
+                postings = np.arange(start, start + len(docs))[self._map_docs(doc_map, docs) >= 0]
+                terms = np.searchsorted(raw_indptr, postings, side='right') - 1
+                counts += np.bincount(terms, minlength=n_terms)
+            term_indptr = np.zeros(n_terms + 1, dtype=np.int64)
+            np.cumsum(counts, out=term_indptr[1:])
+            runs.append((term_indptr, raw_indptr, base.doc_ids, base.byte_indptr, base.data, doc_map))
+        for i in range(self._n_runs):
+            run_dir = os.path.join(self._run_dir, str(i))
+            load = lambda name: np.load(os.path.join(run_dir, name), mmap_mode='r')
+            terms = load("terms.npy")
+            term_indptr = np.searchsorted(terms, np.arange(n_terms + 1))
+            runs.append((term_indptr, term_indptr, load("docs.npy"), load("byte_indptr.npy"),
+                         load("data.npy"), None))
+        return runs
+
+    def _merge_block(self, runs, t_start, t_end):
+        """
+        Posting term t_start..t_end-1 dari semua run, urut per term lalu dokumen.
+        Byte posisi hanya dipindahkan, tidak di-decode.
+        Output: docs, panjang byte setiap posting, data
+        """
+        terms, docs, lengths, starts, data = [], [], [], [], []
+        n_bytes = 0
+        for _, raw_indptr, run_docs, run_indptr, run_data, doc_map in runs:
+            p_start, p_end = int(raw_indptr[t_start]), int(raw_indptr[t_end])
+            byte_start = int(run_indptr[p_start])
+            run_terms = np.repeat(np.arange(t_start, t_end, dtype=np.int32),
+                                  np.diff(raw_indptr[t_start:t_end + 1]))
+            block_docs = np.asarray(run_docs[p_start:p_end], dtype=np.int32)
+            block_indptr = np.asarray(run_indptr[p_start:p_end + 1])
+            block_lengths = np.diff(block_indptr)
+            block_starts = block_indptr[:-1] - byte_start + n_bytes
+            if doc_map is not None:
+                mapped = self._map_docs(doc_map, block_docs)
+                keep = mapped >= 0
+                run_terms, block_lengths, block_starts = (
+                    run_terms[keep], block_lengths[keep], block_starts[keep])
+                block_docs = mapped[keep].astype(np.int32)
+            terms.append(run_terms)
+            docs.append(block_docs)
+            lengths.append(block_lengths)
+            starts.append(block_starts)
+            data.append(np.asarray(run_data[byte_start:int(run_indptr[p_end])]))
+            n_bytes += len(data[-1])
+        terms, docs = np.concatenate(terms), np.concatenate(docs)
+        lengths, starts, data = np.concatenate(lengths), np.concatenate(starts), np.concatenate(data)
+
+        order = np.lexsort((docs, terms))
+        lengths = lengths[order]
+        merged_starts = np.cumsum(lengths) - lengths
+        source = np.repeat(starts[order] - merged_starts, lengths) + np.arange(int(lengths.sum()))
+        return docs[order], lengths, data[source]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        n_terms = len(self._terms)
+        runs = self._runs(n_terms)
+
+        # 1. Posting per term disusun seperti CSR; ukuran total diketahui dari run
+        term_indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        for run in runs:
+            term_indptr += run[0]
+        n_postings = int(term_indptr[-1])
+        np.save(os.path.join(self.folder, TERM_INDPTR_FILE), term_indptr)
+        out_docs = np.lib.format.open_memmap(os.path.join(self.folder, POSTING_DOCS_FILE),
+                                             mode='w+', dtype=np.int32, shape=(n_postings,))
+        out_indptr = np.lib.format.open_memmap(os.path.join(self.folder, POSTING_INDPTR_FILE),
+                                               mode='w+', dtype=np.int64, shape=(n_postings + 1,))
+        out_indptr[0] = 0
+
+        # 2. Gabungkan run per blok term (sekitar MERGE_POSTINGS posting per blok)
+        with open(os.path.join(self.folder, POSITIONS_FILE), 'wb') as f:
+            t_start, n_bytes = 0, 0
+            while t_start < n_terms:
+                t_end = int(np.searchsorted(term_indptr, term_indptr[t_start] + MERGE_POSTINGS,
+                                            side='right')) - 1
+                t_end = min(max(t_end, t_start + 1), n_terms)
+                docs, lengths, data = self._merge_block(runs, t_start, t_end)
+                p_start = int(term_indptr[t_start])
+                out_docs[p_start:p_start + len(docs)] = docs
+                out_indptr[p_start + 1:p_start + len(docs) + 1] = n_bytes + np.cumsum(lengths)
+                f.write(data.tobytes())
+                n_bytes += len(data)
+                t_start = t_end
+        out_docs.flush()
+        out_indptr.flush()
+        del out_docs, out_indptr, runs
+        shutil.rmtree(self._run_dir, ignore_errors=True)
+
+        # Term tidak pernah mengandung spasi/newline, jadi cukup satu term per baris
+        with open(os.path.join(self.folder, VOCABULARY_FILE), 'w', encoding='utf-8') as f:
+            f.write("\n".join(self._terms))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PositionalIndex:
+    """
+    Positional index read-only di atas file memmap. Posisi hanya di-decode untuk
+    posting dokumen kandidat, bukan seluruh posting list term.
+    """
+    def __init__(self, folder):
+        self.term_indptr = np.load(os.path.join(folder, TERM_INDPTR_FILE), mmap_mode='r')
+        self.doc_ids = np.load(os.path.join(folder, POSTING_DOCS_FILE), mmap_mode='r')
+        self.byte_indptr = np.load(os.path.join(folder, POSTING_INDPTR_FILE), mmap_mode='r')
+        path = os.path.join(folder, POSITIONS_FILE)
+        if os.path.getsize(path) > 0:
+            self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        else:
+            # np.memmap tidak bisa membuka file kosong
+            self.data = np.empty(0, dtype=np.uint8)
+        with open(os.path.join(folder, VOCABULARY_FILE), 'r', encoding='utf-8') as f:
+            content = f.read()
+        terms = content.split("\n") if content else []
+        self.vocabulary = dict(zip(terms, range(len(terms))))
+
+    @staticmethod
+    def exists(folder):
+        return os.path.exists(os.path.join(folder, TERM_INDPTR_FILE))
+
+    def documents(self, term):
+        """Dokumen (terurut naik) yang memuat term; array kosong jika term tidak dikenal."""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return np.empty(0, dtype=np.int32)
+        return self.doc_ids[self.term_indptr[term_id]:self.term_indptr[term_id + 1]]
+
+    def positions(self, term, doc_ids):
+        """
+        Posisi term di setiap dokumen doc_ids (semua dokumen harus memuat term).
+        Output: group (indeks ke doc_ids per posisi), positions (np.ndarray)
+        """
+        term_id = self.vocabulary[term]
+        start = int(self.term_indptr[term_id])
+        term_docs = self.doc_ids[start:self.term_indptr[term_id + 1]]
+        postings = start + np.searchsorted(term_docs, doc_ids)
+
+        # 1. Kumpulkan byte posisi milik posting kandidat saja
+        byte_starts = np.asarray(self.byte_indptr[postings])
+        lengths = np.asarray(self.byte_indptr[postings + 1]) - byte_starts
+        offsets = np.cumsum(lengths) - lengths
+        byte_index = np.arange(int(lengths.sum())) + np.repeat(byte_starts - offsets, lengths)
+        gaps, ends = decode_varints(self.data[byte_index])
+
+        # 2. Delta -> posisi absolut, dijumlahkan per posting
+        group = np.repeat(np.arange(len(postings)), lengths)[ends]
+        positions = np.cumsum(gaps)
+        first = np.flatnonzero(np.diff(group, prepend=-1))
+        base = positions[first] - gaps[first]
+        positions -= np.repeat(base, np.diff(np.append(first, len(group))))
+        return group, positions
+
+    def phrase_documents(self, terms, candidates=None):
+        """
+        Dokumen yang memuat terms berurutan sebagai frasa.
+        Dokumen kandidat = irisan posting list (dimulai dari term paling jarang, opsional
+        dibatasi candidates); posisi hanya dibandingkan untuk kandidat tersebut.
+        Output: doc_ids (np.ndarray terurut), jumlah kemunculan frasa per dokumen
+        """
+        if not terms:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        doc_lists = sorted((self.documents(term) for term in set(terms)), key=len)
+        docs = np.asarray(doc_lists[0])
+        if candidates is not None:
+            docs = np.intersect1d(docs, candidates, assume_unique=True)
+        for doc_list in doc_lists[1:]:
+            if len(docs) == 0:
+                break
+            docs = np.intersect1d(docs, doc_list, assume_unique=True)
+        if len(docs) == 0:
+            return docs, np.empty(0, dtype=np.int64)
+
+        # Kunci (kandidat, posisi awal frasa): term ke-i harus berada di posisi awal + i
+        keys = None
+        for i, term in enumerate(terms):
+            group, positions = self.positions(term, docs)
+            valid = positions >= i
+            term_keys = (group[valid].astype(np.int64) << 32) | (positions[valid] - i)
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+            if len(keys) == 0:
+                break
+        counts = np.bincount(keys >> 32, minlength=len(docs))
+        found = counts > 0
+        return docs[found], counts[found]
+
+    def proximity(self, terms, doc_ids):
+        """
+        Skor kedekatan 0 - 1 untuk setiap dokumen: rata-rata 1 / jarak minimum antar pasangan
+        term query yang berurutan (1 berarti bersebelahan). Pasangan yang tidak muncul di
+        dokumen bernilai 0.
+        """
+        doc_ids = np.asarray(doc_ids)
+        pairs = list(dict.fromkeys((a, b) for a, b in zip(terms, terms[1:]) if a != b))
+        scores = np.zeros(len(doc_ids), dtype=np.float64)
+        if not pairs or len(doc_ids) == 0:
+            return scores
+        for a, b in pairs:
+            both = np.intersect1d(np.intersect1d(doc_ids, self.documents(a), assume_unique=True),
+                                  self.documents(b), assume_unique=True)
+            if len(both) == 0:
+                continue
+            # Gabungkan posisi kedua term per dokumen; jarak terkecil ada di antara
+            # dua posisi bertetangga dari term yang berbeda
+            group_a, pos_a = self.positions(a, both)
+            group_b, pos_b = self.positions(b, both)
+            keys = np.concatenate(((group_a.astype(np.int64) << 32) | pos_a,
+                                   (group_b.astype(np.int64) << 32) | pos_b))
+            labels = np.concatenate((np.zeros(len(pos_a), bool), np.ones(len(pos_b), bool)))
+            order = np.argsort(keys, kind='stable')
+            keys, labels = keys[order], labels[order]
+            adjacent = (labels[1:] != labels[:-1]) & ((keys[1:] >> 32) == (keys[:-1] >> 32))
+            min_gap = np.full(len(both), np.iinfo(np.int64).max)
+            np.minimum.at(min_gap, keys[1:][adjacent] >> 32, (keys[1:] - keys[:-1])[adjacent])
+            scores[np.searchsorted(doc_ids, both)] += 1.0 / min_gap
+        return scores / len(pairs)
+
+def load_positional_index(folder):
+    """PositionalIndex di folder index, atau None jika index dibangun tanpa posisi."""
+    return PositionalIndex(folder) if PositionalIndex.exists(folder) else None
+
+def parse_phrase_query(query):
+    """
+    Memisahkan frasa bertanda kutip dari query pengguna.
+    Output: processed_query (str, seluruh query tanpa tanda kutip),
+            phrases (list of list term hasil preprocessing per frasa)
+    """
+    phrases = []
+    for phrase in _PHRASE.findall(query):
+        terms = TOKEN_PATTERN.findall(preprocess_query_pengguna(phrase).lower())
+        if terms:
+            phrases.append(terms)
+    processed_query = preprocess_query_pengguna(query.replace('"', ' '))
+    return processed_query, phrases
+
+def positional_scores(query, vectorizer, doc_vectors, index, n_candidates=PROXIMITY_CANDIDATES):
+    """
+    Skor semua dokumen untuk query dengan frasa bertanda kutip dan proximity boost.
+    - Query dengan frasa: hanya dokumen yang memuat semua frasa yang diskor (lainnya 0).
+    - Query biasa: top n_candidates hasil cosine yang diberi proximity boost.
+    Skor dibagi (1 + PROXIMITY_WEIGHT) sehingga tetap di rentang 0 - 1 seperti cosine,
+    termasuk untuk dokumen di luar kandidat.
+    Input: query (str mentah, boleh berisi "frasa"), vectorizer, doc_vectors,
+           index (PositionalIndex), n_candidates
+    Output: np.ndarray skor (panjang = jumlah dokumen)
+    """
+    processed_query, phrases = parse_phrase_query(query)
+    terms = TOKEN_PATTERN.findall(processed_query.lower())
+    query_vector = vectorizer.transform([processed_query])
+
+    if phrases:
+        # 1a. Kandidat = dokumen yang memuat setiap frasa, skor cosine dihitung hanya untuk mereka
+        candidates = None
+        for phrase in phrases:
+            candidates, _ = index.phrase_documents(phrase, candidates)
+        candidates = np.asarray(candidates, dtype=np.int64)
+        scores = np.zeros(doc_vectors.shape[0], dtype=np.float64)
+        scores[candidates] = compute_scores(query_vector, vectorizer, doc_vectors[candidates])
+    else:
+        # 1b. Kandidat = top n_candidates dari skor cosine seluruh dokumen
+        scores = compute_scores(query_vector, vectorizer, doc_vectors)
+        candidates, _, _ = top_k(scores, n_candidates)
+        candidates = np.sort(candidates)
+
+    # 2. Proximity boost hanya untuk kandidat, lalu skala kembali ke 0 - 1
+    scores /= 1.0 + PROXIMITY_WEIGHT
+    scores[candidates] *= 1.0 + PROXIMITY_WEIGHT * index.proximity(terms, candidates)
+    return scores
+
+def search_positional(query, vectorizer, doc_vectors, index, k=10, min_score=0.0,
+                      n_candidates=PROXIMITY_CANDIDATES):
+    """
+    Top-k dari positional_scores (lihat di atas).
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    return top_k(positional_scores(query, vectorizer, doc_vectors, index, n_candidates),
+                 k, min_score)
+
+# Benchmark: latency phrase/proximity query vs search cosine untuk berbagai ukuran corpus
+if __name__ == "__main__":
+    import tempfile
+    from benchmark import build_vocabulary, generate_corpus, generate_queries
+    from preprocessing import preprocess_kumpulan_dokumen
+    from retrieval import build_index, search_top_k
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rng = np.random.default_rng(42)
+    vocabulary = build_vocabulary()
+    queries = generate_queries(50, np.array(vocabulary))
+
+    print(f"{'docs':>8s} {'cosine (ms)':>12s} {'phrase (ms)':>12s} {'proximity (ms)':>15s}")
+    for n_docs in sizes:
+        docs = list(generate_corpus(n_docs, vocabulary=vocabulary))
+        vectorizer, doc_vectors = build_index(preprocess_kumpulan_dokumen(docs))
+        # Frasa diambil dari dua kata berurutan di dokumen acak supaya selalu ada hasil
+        phrases = []
+        for doc in rng.choice(docs, size=len(queries)):
+            words = doc.split()
+            j = int(rng.integers(len(words) - 1))
+            phrases.append(f'"{words[j]} {words[j + 1]}"')
+
+        with tempfile.TemporaryDirectory() as folder:
+            with PositionalIndexWriter(folder) as writer:
+                for processed in preprocess_kumpulan_dokumen(docs):
+                    writer.add(processed)
+            index = PositionalIndex(folder)
+
+            runs = [
+                lambda q, p: search_top_k(preprocess_query_pengguna(q), vectorizer, doc_vectors, k=10),
+                lambda q, p: search_positional(p, vectorizer, doc_vectors, index, k=10),
+                lambda q, p: search_positional(q, vectorizer, doc_vectors, index, k=10),
+            ]
+            timings = [0.0] * len(runs)
+            for query, phrase in zip(queries, phrases):
+                for i, run in enumerate(runs):
+                    start = time.perf_counter()
+                    run(query, phrase)
+                    timings[i] += time.perf_counter() - start
+            ms = [t / len(queries) * 1000 for t in timings]
+            print(f"{n_docs:>8d} {ms[0]:>12.3f} {ms[1]:>12.3f} {ms[2]:>15.3f}")
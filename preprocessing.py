@@ -2,44 +2,505 @@
 import os
 import re
 import string
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+import uuid
+import pickle
+import logging
+import threading
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import metrics
 
-# Inisialisasi stemmer dan stopword remover
-stem_factory = StemmerFactory()
-stemmer = stem_factory.create_stemmer()
+logger = logging.getLogger(__name__)
 
-stop_factory = StopWordRemoverFactory()
-stopword_remover = stop_factory.create_stop_word_remover()
+# Kamus Sastrawi (kata dasar + stopword) yang sudah dikompilasi ke pickle.
+# Stemmer dan stopword set baru dibuat saat pertama kali dipakai, sehingga proses yang
+# hanya membuka index dari cache tidak membayar biaya membangun factory Sastrawi.
+# DOUGGLE_SASTRAWI_ARTIFACT memindahkan file ini ke luar folder source (mis. instalasi read-only).
+SASTRAWI_ARTIFACT = os.environ.get(
+    "DOUGGLE_SASTRAWI_ARTIFACT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "sastrawi.pkl"))
+ARTIFACT_VERSION = 1
+
+_sastrawi = {}
+_sastrawi_lock = threading.Lock()
+
+class SetDictionary:
+    """
+    Pengganti ArrayDictionary Sastrawi dengan frozenset: contains() O(1), bukan
+    pencarian linear di list ~30 ribu kata dasar untuk setiap percobaan pemotongan imbuhan.
+    """
+    def __init__(self, words):
+        self.words = frozenset(words)
+
+    def contains(self, word):
+        return word in self.words
+
+    def count(self):
+        return len(self.words)
+
+def _sastrawi_source_key():
+    """Ukuran dan mtime file sumber Sastrawi; artefak dibangun ulang jika berubah."""
+    spec = importlib.util.find_spec("Sastrawi")
+    root = spec.submodule_search_locations[0]
+    key = []
+    for parts in (("Stemmer", "data", "kata-dasar.txt"),
+                  ("StopWordRemover", "StopWordRemoverFactory.py")):
+        stat = os.stat(os.path.join(root, *parts))
+        key.append((stat.st_size, stat.st_mtime_ns))
+    return (ARTIFACT_VERSION, tuple(key))
+
+def build_sastrawi_artifact(path=SASTRAWI_ARTIFACT):
+    """
+    Membaca kamus kata dasar dan daftar stopword dari Sastrawi lalu menyimpannya
+    sebagai frozenset di satu file pickle (ditulis atomik).
+    Output: dict {"key", "words", "stopwords"}
+    """
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+    artifact = {
+        "key": _sastrawi_source_key(),
+        # ArrayDictionary mengabaikan kata kosong, jadi di sini juga
+        "words": frozenset(word for word in StemmerFactory().get_words() if word.strip()),
+        "stopwords": frozenset(StopWordRemoverFactory().get_stop_words()),
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex}"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Artefak Sastrawi tidak bisa disimpan di {path}: {e}")
+    return artifact
+
+def load_sastrawi_artifact(path=SASTRAWI_ARTIFACT):
+    """Memuat artefak Sastrawi; dibangun ulang jika belum ada, rusak, atau usang."""
+    try:
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+        if artifact.get("key") == _sastrawi_source_key():
+            return artifact
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        pass
+    return build_sastrawi_artifact(path)
+
+def _get_sastrawi(name):
+    """Objek Sastrawi yang dibuat saat pertama kali dibutuhkan (sekali per proses)."""
+    resource = _sastrawi.get(name)
+    if resource is not None:
+        return resource
+    with _sastrawi_lock:
+        if not _sastrawi:
+            from Sastrawi.Stemmer.Stemmer import Stemmer
+            from Sastrawi.Stemmer.Filter import TextNormalizer
+            artifact = load_sastrawi_artifact()
+            _sastrawi["stopwords"] = artifact["stopwords"]
+            _sastrawi["stemmer"] = Stemmer(SetDictionary(artifact["words"]))
+            _sastrawi["normalize_text"] = TextNormalizer.normalize_text
+        return _sastrawi[name]
+
+def get_stemmer():
+    """Stemmer Sastrawi (tanpa CachedStemmer; caching dilakukan oleh stem_cache)."""
+    return _get_sastrawi("stemmer")
+
+def get_stopwords():
+    """Daftar stopword Sastrawi sebagai frozenset."""
+    return _get_sastrawi("stopwords")
+
+def remove_stopwords(text):
+    """
+    Setara dengan StopWordRemover.remove Sastrawi, termasuk perilakunya menghapus
+    elemen list saat iterasi (stopword tepat setelah stopword yang dihapus tetap ada),
+    supaya hasil preprocessing tidak berubah. Bedanya hanya lookup di frozenset.
+    """
+    words = text.split(' ')
+    _hapus_stopword_list(words)
+    return ' '.join(words)
+
+def _hapus_stopword_list(words):
+    """Inti remove_stopwords: menghapus stopword dari list kata secara in-place."""
+    stopwords = get_stopwords()
+    for word in words:
+        if word in stopwords:
+            words.remove(word)
+
+# Di bawah jumlah ini, biaya start process pool lebih besar dari hasilnya
+PARALLEL_MIN_DOCS = 200
+
+class StemCache:
+    """
+    Cache hasil stemming per kata.
+    LRU di memori dengan ukuran terbatas, ditambah kamus stem di disk
+    (opsional) yang dimuat saat startup dan di-merge setelah setiap run.
+    """
+    def __init__(self, max_size=200000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._new_entries = {}  # Kata yang belum tersimpan ke disk
+        self._lock = threading.Lock()
+
+    def get(self, word):
+        """
+        Ambil stem dari cache, None jika belum pernah dilihat.
+        Dipanggil sekali per kata di pipeline gabungan, jadi tanpa lock: operasi
+        OrderedDict di bawah sudah atomik terhadap put() di thread lain (counter
+        hit/miss hanya untuk statistik).
+        """
+        stem = self._data.get(word)
+        if stem is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._data.move_to_end(word)
+        except KeyError:
+            # Baru saja dibuang oleh put() di thread lain
+            pass
+        return stem
+
+    def put(self, word, stem, new=True):
+        """Simpan stem ke cache dan buang entri paling lama jika penuh."""
+        with self._lock:
+            self._data[word] = stem
+            self._data.move_to_end(word)
+            if new:
+                self._new_entries[word] = stem
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def load(self, path):
+        """Muat kamus stem dari disk. Return jumlah entri yang dimuat."""
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'rb') as f:
+                stems = pickle.load(f)
+        except Exception:
+            return 0
+        for word, stem in stems.items():
+            self.put(word, stem, new=False)
+        return len(stems)
+
+    def save(self, path):
+        """Merge entri baru ke kamus stem di disk. Return ukuran kamus."""
+        with self._lock:
+            new_entries = dict(self._new_entries)
+        stems = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    stems = pickle.load(f)
+            except Exception:
+                stems = {}
+        if not new_entries and stems:
+            return len(stems)
+        stems.update(new_entries)
+        # Tulis ke file sementara (unik per proses & pemanggilan, sehingga beberapa proses
+        # yang menyimpan bersamaan tidak saling menimpa) lalu rename supaya file lama tidak korup
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex}"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(stems, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            for word in new_entries:
+                self._new_entries.pop(word, None)
+        return len(stems)
+
+    def snapshot(self):
+        """Salinan isi cache (kata -> stem)."""
+        with self._lock:
+            return dict(self._data)
+
+    def drain_new_entries(self):
+        """Ambil dan kosongkan daftar kata baru yang belum tersimpan."""
+        with self._lock:
+            new_entries = self._new_entries
+            self._new_entries = {}
+            return new_entries
+
+    def stats(self):
+        """Statistik hit/miss cache."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._data),
+            "max_size": self.max_size,
+        }
+
+    def clear_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Kosongkan cache di memori (kamus di disk tidak ikut terhapus)."""
+        with self._lock:
+            self._data.clear()
+            self._new_entries = {}
+        self.clear_stats()
+
+stem_cache = StemCache()
+
+def stem_kata(word):
+    """Stemming satu kata (sudah dinormalisasi) melalui cache."""
+    stem = stem_cache.get(word)
+    if stem is None:
+        stem = get_stemmer().stem_word(word)
+        stem_cache.put(word, stem)
+    return stem
+
+def stem_teks(text):
+    """Setara dengan stemmer.stem(text) Sastrawi, tetapi per kata lewat stem_cache."""
+    text = _get_sastrawi("normalize_text")(text)
+    if not text:
+        return ""
+    return ' '.join(stem_kata(word) for word in text.split(' '))
+
+def load_stem_cache(path):
+    """Muat kamus stem dari disk ke stem_cache."""
+    return stem_cache.load(path)
+
+def save_stem_cache(path):
+    """Simpan (merge) kata-kata baru di stem_cache ke kamus stem di disk."""
+    return stem_cache.save(path)
+
+def get_stem_cache_stats():
+    """Counter hit/miss untuk memantau efektivitas cache stemming."""
+    return stem_cache.stats()
+
+# Tabel dan pola yang dipakai ulang (tidak dibuat ulang setiap pemanggilan)
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+
+# token_pattern default CountVectorizer / TfidfVectorizer scikit-learn
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Langkah preprocess_satu_teks, berurutan: (nama untuk metrics, fungsi).
+# Versi per langkah ini dipakai saat metrics aktif dan sebagai acuan daftar_stem.
+PREPROCESS_STEPS = [
+    # 1. Lowercase
+    ("lowercase", str.lower),
+    # 2. Hapus punctuation
+    ("punctuation", lambda text: text.translate(_PUNCTUATION_TABLE)),
+    # 3. Hapus angka
+    ("digits", lambda text: _DIGITS.sub('', text)),
+    # 4. Hapus whitespace berlebihan
+    ("whitespace", lambda text: _WHITESPACE.sub(' ', text).strip()),
+    # 5. Stopword removal
+    ("stopwords", remove_stopwords),
+    # 6. Stemming (per kata, lewat stem_cache)
+    ("stemming", lambda text: stem_teks(text)),
+]
+
+# Kata yang tidak diubah oleh normalize_text Sastrawi (bisa langsung ke stem_cache)
+_NORMALIZED_WORD = re.compile(r'[a-z0-9-]+')
+
+# Cache per kata untuk pipeline gabungan; dikosongkan jika melebihi batas.
+# Hasil stemming tidak di-cache di sini: memoisasinya hanya di stem_cache.
+WORD_CACHE_MAX = 200000
+_clean_cache = {}    # kata mentah -> kata setelah langkah 1-3
+_token_cache = {}    # kata bersih -> tuple token yang dilihat vectorizer
+
+def _cache_put(cache, key, value):
+    if len(cache) >= WORD_CACHE_MAX:
+        cache.clear()
+    cache[key] = value
+
+def clear_word_caches():
+    """Kosongkan cache per kata pipeline gabungan (stem_cache tidak ikut)."""
+    _clean_cache.clear()
+    _token_cache.clear()
+
+def bersihkan_kata(word):
+    """Langkah 1-3 (lowercase, punctuation, angka) untuk satu kata; '' jika tidak tersisa apa pun."""
+    cleaned = _clean_cache.get(word)
+    if cleaned is None:
+        cleaned = _DIGITS.sub('', word.lower().translate(_PUNCTUATION_TABLE))
+        _cache_put(_clean_cache, word, cleaned)
+    return cleaned
+
+def stem_kata_bersih(word):
+    """Langkah 6 untuk satu kata bersih: normalisasi Sastrawi (bisa memecah kata) lalu stem."""
+    # stem_cache hanya berisi kata yang sudah ternormalisasi, jadi hit berarti satu stem
+    stem = stem_cache.get(word)
+    if stem is not None:
+        return (stem,)
+    if _NORMALIZED_WORD.fullmatch(word):
+        stem = get_stemmer().stem_word(word)
+        stem_cache.put(word, stem)
+        return (stem,)
+    # Hanya kata dengan huruf non-ASCII yang perlu dinormalisasi (dan bisa terpecah)
+    return tuple(stem_kata(part) for part in _get_sastrawi("normalize_text")(word).split())
+
+def _kata_sesudah_stopword(text):
+    """Langkah 1-5: kata bersih tanpa stopword, dalam satu pass per kata."""
+    # Semua langkah 1-3 hanya menghapus karakter, jadi bisa dikerjakan per kata;
+    # kata yang habis ikut hilang seperti pada penggabungan whitespace di langkah 4
+    words = [word for word in map(bersihkan_kata, text.split()) if word]
+    _hapus_stopword_list(words)
+    return words
+
+def daftar_stem(text):
+    """
+    Langkah 1-6 preprocess_satu_teks tanpa membangun string perantara.
+    Output: list of str, dengan ' '.join(hasil) == preprocess_satu_teks(text)
+    """
+    stems = []
+    for word in _kata_sesudah_stopword(text):
+        stems.extend(stem_kata_bersih(word))
+    return stems
+
+def tokenize_satu_teks(text):
+    """
+    Token yang akan dilihat vectorizer untuk teks mentah, dalam satu pass per kata:
+    sama dengan TOKEN_PATTERN.findall(preprocess_satu_teks(text).lower()).
+    Output: list of str
+    """
+    if not isinstance(text, str):
+        return []
+    tokens = []
+    for word in _kata_sesudah_stopword(text):
+        word_tokens = _token_cache.get(word)
+        if word_tokens is None:
+            word_tokens = tuple(token for stem in stem_kata_bersih(word)
+                                for token in TOKEN_PATTERN.findall(stem.lower()))
+            _cache_put(_token_cache, word, word_tokens)
+        tokens.extend(word_tokens)
+    return tokens
 
 def preprocess_satu_teks(text):
     """Membersihkan satu teks secara mendalam."""
     if not isinstance(text, str) or not text.strip():
         return ""
     
-    # 1. Lowercase
-    text = text.lower()
-    
-    # 2. Hapus punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
+    # Satu pengecekan flag: tanpa metrics tidak ada timer per langkah sama sekali
+    if metrics.registry.enabled:
+        return _preprocess_satu_teks_timed(text)
+    return ' '.join(daftar_stem(text))
+
+def _preprocess_satu_teks_timed(text):
+    """preprocess_satu_teks dengan histogram durasi per langkah."""
+    metrics.inc("douggle_preprocess_documents_total", help_text="Jumlah teks yang dipreprocess")
+    for name, step in PREPROCESS_STEPS:
+        with metrics.timer("douggle_preprocess_step_seconds",
+                           "Durasi setiap langkah preprocess_satu_teks", step=name):
+            text = step(text)
+    return text
+
+def _init_worker(known_stems, metrics_enabled=False):
+    """
+    Initializer untuk setiap worker process.
+    Stemmer dan stopword remover dibuat sekali per worker (saat modul diimpor),
+    lalu stem_cache worker diisi dengan kata yang sudah diketahui proses utama.
+    """
+    for word, stem in known_stems.items():
+        stem_cache.put(word, stem, new=False)
+    stem_cache.clear_stats()
+    metrics.registry.enabled = metrics_enabled
+    metrics.reset()
+
+def _preprocess_chunk(chunk):
+    """Memproses satu chunk dokumen di worker process."""
+    hits, misses = stem_cache.hits, stem_cache.misses
+    processed = [preprocess_satu_teks(doc) for doc in chunk]
+    # Kata baru (dan metrics chunk ini) dikirim balik untuk di-merge di proses utama
+    return (processed, stem_cache.drain_new_entries(),
+            stem_cache.hits - hits, stem_cache.misses - misses,
+            metrics.registry.drain() if metrics.is_enabled() else None)
+
+def _create_pool(n_workers):
+    """Process pool preprocessing; setiap worker diisi kamus stem proses utama."""
+    return ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                               initargs=(stem_cache.snapshot(), metrics.is_enabled()))
+
+def _map_parallel(executor, list_dokumen, n_workers, chunksize=None):
+    """Memproses list dokumen di pool; urutan output sama dengan input."""
+    if chunksize is None:
+        chunksize = max(1, len(list_dokumen) // (n_workers * 4))
+    chunks = [list_dokumen[i:i + chunksize] for i in range(0, len(list_dokumen), chunksize)]
     
-    # 3. Hapus angka
-    text = re.sub(r'\d+', '', text)
+    hasil = []
+    # executor.map menjaga urutan chunk sesuai input
+    for processed, new_stems, hits, misses, worker_metrics in executor.map(_preprocess_chunk, chunks):
+        hasil.extend(processed)
+        for word, stem in new_stems.items():
+            stem_cache.put(word, stem)
+        stem_cache.hits += hits
+        stem_cache.misses += misses
+        if worker_metrics is not None:
+            metrics.registry.merge(worker_metrics)
+    return hasil
+
+def _resolve_workers(n_workers):
+    return (os.cpu_count() or 1) if n_workers is None else n_workers
+
+def preprocess_kumpulan_dokumen(list_dokumen, n_workers=1, chunksize=None,
+                                min_parallel_docs=PARALLEL_MIN_DOCS):
+    """
+    Memproses list dokumen secara massal.
+    n_workers > 1 (atau None = semua core) memakai process pool; urutan output
+    selalu sama dengan urutan input. Corpus kecil tetap diproses serial.
+    """
+    list_dokumen = list(list_dokumen)
+    n_workers = min(_resolve_workers(n_workers), len(list_dokumen))
     
-    # 4. Hapus whitespace berlebihan
-    text = re.sub(r'\s+', ' ', text).strip()
+    if n_workers <= 1 or len(list_dokumen) < min_parallel_docs:
+        return [preprocess_satu_teks(doc) for doc in list_dokumen]
     
-    # 5. Stopword removal
-    text = stopword_remover.remove(text)
+    with _create_pool(n_workers) as executor:
+        return _map_parallel(executor, list_dokumen, n_workers, chunksize)
+
+def preprocess_stream(doc_stream, chunk_size=1000, n_workers=1, chunksize=None,
+                      min_parallel_docs=PARALLEL_MIN_DOCS, lookup=None):
+    """
+    Memproses stream (doc_id, text) per chunk sehingga memori tetap terbatas.
+    Process pool (jika n_workers > 1) dibuat sekali dan dipakai untuk semua chunk.
+    lookup(doc_id, text) opsional: mengembalikan hasil preprocessing yang sudah ada
+    (misalnya dari cache), atau None jika dokumen perlu diproses.
+    Output: generator (doc_id, teks hasil preprocessing) dengan urutan sama seperti input
+    """
+    n_workers = _resolve_workers(n_workers)
+    executor = None
+    try:
+        chunk = []
+        for item in doc_stream:
+            chunk.append(item)
+            if len(chunk) < chunk_size:
+                continue
+            executor = yield from _process_stream_chunk(chunk, executor, n_workers, chunksize,
+                                                        min_parallel_docs, lookup)
+            chunk = []
+        if chunk:
+            yield from _process_stream_chunk(chunk, executor, n_workers, chunksize,
+                                             min_parallel_docs, lookup)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def _process_stream_chunk(chunk, executor, n_workers, chunksize, min_parallel_docs, lookup):
+    """Helper preprocess_stream: memproses satu chunk, pool dibuat saat pertama kali perlu."""
+    processed = [lookup(doc_id, text) if lookup else None for doc_id, text in chunk]
+    todo = [i for i, result in enumerate(processed) if result is None]
+    texts = [chunk[i][1] for i in todo]
     
-    # 6. Stemming
-    text = stemmer.stem(text)
+    if n_workers > 1 and len(texts) >= min_parallel_docs:
+        if executor is None:
+            executor = _create_pool(n_workers)
+        results = _map_parallel(executor, texts, n_workers, chunksize)
+    else:
+        results = [preprocess_satu_teks(text) for text in texts]
+    for i, result in zip(todo, results):
+        processed[i] = result
     
-    return text
-
-def preprocess_kumpulan_dokumen(list_dokumen):
-    """Memproses list dokumen secara massal."""
-    return [preprocess_satu_teks(doc) for doc in list_dokumen]
+    yield from zip((doc_id for doc_id, _ in chunk), processed)
+    return executor
 
 def preprocess_query_pengguna(query):
     """Menjamin hasil query konsisten dengan indeks dokumen."""
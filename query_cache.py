@@ -0,0 +1,130 @@
+# query_cache.py (Modul 3d - Query Result Cache)
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from retrieval import compute_scores, search_top_k, top_k
+
+class RankingEntry:
+    """
+    Hasil ranking satu query yang disimpan di cache.
+    doc_ids/scores: top max_results dokumen (terurut), hit_scores: skor semua dokumen
+    dengan skor > 0 (terurut naik) untuk menghitung jumlah hasil pada min_score apa pun.
+    """
+    def __init__(self, doc_ids, scores, hit_scores):
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.hit_scores = hit_scores
+        self.created = time.monotonic()
+        self.nbytes = doc_ids.nbytes + scores.nbytes + hit_scores.nbytes
+
+    def slice(self, k, min_score=0.0):
+        """Top-k dengan filter min_score, tanpa menghitung ulang skor."""
+        n_hits = len(self.hit_scores) - int(np.searchsorted(self.hit_scores, min_score, side='left'))
+        keep = int(np.count_nonzero(self.scores[:k] >= min_score))
+        return self.doc_ids[:keep], self.scores[:keep], n_hits
+
+class QueryResultCache:
+    """
+    Cache hasil search dengan key (query hasil preprocessing, scorer, versi index, ...);
+    elemen setelah versi index membedakan mode search lain (misalnya positional).
+    Eviction LRU dibatasi jumlah entri dan total byte, ditambah TTL per entri.
+    Aman dipakai bersama oleh banyak session/thread.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=600, max_results=100):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_results = max_results
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Entri yang lebih besar dari batas total tidak disimpan
+            if entry.nbytes > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, keep_version=None):
+        """Hapus semua entri, atau hanya entri yang versi index-nya bukan keep_version."""
+        with self._lock:
+            for key in list(self._entries):
+                if keep_version is None or key[2] != keep_version:
+                    self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._nbytes -= entry.nbytes
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._nbytes,
+        }
+
+def ranking_entry(doc_ids, top_scores, hit_scores):
+    """RankingEntry dari array hasil ranking (misalnya yang dihitung di worker process)."""
+    return RankingEntry(np.asarray(doc_ids), np.asarray(top_scores), np.asarray(hit_scores))
+
+def rank_scores(scores, max_results):
+    """
+    Array ranking untuk RankingEntry dari skor semua dokumen.
+    Output: doc_ids (top max_results), top_scores, hit_scores (skor > 0, terurut naik)
+    """
+    doc_ids, top_scores, _ = top_k(scores, max_results)
+    return doc_ids, top_scores, np.sort(scores[scores > 0])
+
+def cached_ranking(cache, key, rank, k=10, min_score=0.0):
+    """
+    Ranking dari cache, atau dihitung dengan rank(max_results) -> RankingEntry lalu disimpan.
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = rank(cache.max_results)
+        cache.put(key, entry)
+    return entry.slice(k, min_score)
+
+def cached_search(cache, query, vectorizer, doc_vectors, index_version, scorer, k=10, min_score=0.0):
+    """
+    search_top_k dengan QueryResultCache di depannya.
+    Ranking disimpan sekali per (query, scorer, index_version); perubahan k / min_score
+    dilayani dengan memotong ranking yang sudah ada, bukan search ulang.
+    Input: cache, query (hasil preprocessing), vectorizer, doc_vectors, index_version, scorer, k, min_score
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    # k di atas kapasitas entri cache dilayani langsung
+    if k is None or k > cache.max_results:
+        return search_top_k(query, vectorizer, doc_vectors, k=k, min_score=min_score)
+
+    def rank(max_results):
+        scores = compute_scores(vectorizer.transform([query]), vectorizer, doc_vectors)
+        return ranking_entry(*rank_scores(scores, max_results))
+
+    return cached_ranking(cache, (query, scorer, index_version), rank, k, min_score)
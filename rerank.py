@@ -0,0 +1,277 @@
+# rerank.py (Modul 3j - Retrieve-then-Rerank)
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+import numpy as np
+import metrics
+from preprocessing import preprocess_query_pengguna
+from retrieval import TOKEN_PATTERN, search_top_k, term_column
+from inverted_index import search_inverted
+
+RERANK_METRIC = ("douggle_rerank_stage_seconds", "Durasi per tahap pipeline retrieve-then-rerank")
+
+# Jumlah kandidat stage 1 dan budget latency per tahap (ms, None = tanpa batas)
+STAGE1_CANDIDATES = 100
+STAGE1_BUDGET_MS = 50.0
+RERANK_BUDGET_MS = 100.0
+# Kandidat di-rerank per potongan; budget dicek di antara potongan
+RERANK_CHUNK = 16
+
+# Field dokumen untuk BM25F: bobot dan normalisasi panjang (b) per field
+FIELD_WEIGHTS = {"title": 2.0, "body": 1.0}
+FIELD_B = {"title": 0.0, "body": 0.75}
+# Bobot fitur pada skor akhir
+FEATURE_WEIGHTS = {"stage1": 1.0, "bm25f": 0.5, "proximity": 0.3, "length": 0.05}
+
+_TITLE_SEPARATOR = re.compile(r'[_\-.]+')
+
+def retrieve_cosine(processed_query, data, n, min_score=0.0):
+    """Stage 1 default: top-n cosine similarity (atau BM25) seluruh dokumen."""
+    return search_top_k(processed_query, data["vectorizer"], data["doc_vectors"], k=n, min_score=min_score)
+
+def retrieve_inverted(processed_query, data, n, min_score=0.0):
+    """
+    Stage 1 lewat inverted index (pruning MaxScore) yang dibuka load_index.
+    total_hits hanya menghitung kandidat yang dikembalikan.
+    """
+    doc_ids, scores = search_inverted(processed_query, data["vectorizer"], data["inverted_index"],
+                                      k=n, min_score=min_score)
+    return doc_ids, scores, len(doc_ids)
+
+class FeatureReranker:
+    """
+    Reranker berbasis fitur untuk kandidat stage 1:
+    - bm25f: BM25F dari field judul (nama file) dan isi (teks hasil preprocessing),
+      dinormalisasi terhadap skor maksimum yang mungkin (jumlah IDF term query)
+    - proximity: rata-rata 1 / jarak minimum pasangan term query berurutan di isi
+    - length: prior panjang dokumen 1 - exp(-panjang / rata-rata panjang)
+    Skor akhir = jumlah fitur x bobot di FEATURE_WEIGHTS (termasuk skor stage 1), dibagi
+    jumlah bobot sehingga tetap di rentang 0 - 1 seperti skor stage 1.
+    """
+    def __init__(self, field_weights=None, field_b=None, feature_weights=None, k1=1.2):
+        self.field_weights = dict(FIELD_WEIGHTS if field_weights is None else field_weights)
+        self.field_b = dict(FIELD_B if field_b is None else field_b)
+        self.feature_weights = dict(FEATURE_WEIGHTS if feature_weights is None else feature_weights)
+        self.k1 = k1
+        # Rata-rata panjang isi dihitung sekali per versi index (tanpa menahan objek index lama)
+        self._avg_body = (None, 1.0)
+
+    @property
+    def total_weight(self):
+        """Jumlah bobot fitur; skor akhir dibagi nilai ini."""
+        return sum(self.feature_weights.values()) or 1.0
+
+    @property
+    def stage1_scale(self):
+        """Faktor skor stage 1 di skor akhir, untuk kandidat yang tidak sempat di-rerank."""
+        return self.feature_weights.get("stage1", 0.0) / self.total_weight
+
+    def average_body_length(self, snippets, index_version):
+        """Rata-rata jumlah kata non-stopword per dokumen (dari data snippet) di seluruh corpus."""
+        if self._avg_body[0] != index_version:
+            indptr = snippets.indptr
+            n_docs = len(indptr) - 1
+            self._avg_body = (index_version, float(indptr[-1]) / n_docs if n_docs and indptr[-1] else 1.0)
+        return self._avg_body[1]
+
+    def __call__(self, query_terms, doc_ids, stage1_scores, data):
+        """
+        Input: query_terms (list term hasil preprocessing), doc_ids, stage1_scores, data (index)
+        Output: np.ndarray skor akhir per kandidat
+        """
+        features = self.features(query_terms, doc_ids, data)
+        scores = self.feature_weights.get("stage1", 0.0) * np.asarray(stage1_scores, dtype=np.float64)
+        for name, values in features.items():
+            scores += self.feature_weights.get(name, 0.0) * values
+        return scores / self.total_weight
+
+    def features(self, query_terms, doc_ids, data):
+        """Nilai setiap fitur (0 - 1) untuk setiap kandidat. Output: dict nama -> np.ndarray"""
+        unique_terms = list(dict.fromkeys(query_terms))
+        vectorizer = data["vectorizer"]
+        idf = {}
+        for term in unique_terms:
+            column = term_column(vectorizer, term)
+            if column is not None:
+                idf[term] = float(vectorizer.idf_[column])
+        max_bm25f = sum(idf.values()) or 1.0
+
+        # Panjang isi diukur dari jumlah kata non-stopword (data snippet)
+        indptr = data["snippets"].indptr
+        avg_body = self.average_body_length(data["snippets"], data["index_version"])
+
+        bm25f = np.zeros(len(doc_ids))
+        proximity = np.zeros(len(doc_ids))
+        length = np.zeros(len(doc_ids))
+        for i, doc_idx in enumerate(doc_ids):
+            body = TOKEN_PATTERN.findall(data["processed_documents"][doc_idx])
+            title = TOKEN_PATTERN.findall(preprocess_query_pengguna(
+                _TITLE_SEPARATOR.sub(" ", os.path.splitext(data["document_ids"][doc_idx])[0])))
+            body_length = int(indptr[doc_idx + 1] - indptr[doc_idx])
+            # Panjang judul tidak dinormalisasi (b judul = 0), jadi rata-ratanya tidak diperlukan
+            fields = {
+                "title": (Counter(title), len(title), 1.0),
+                "body": (Counter(body), body_length, avg_body),
+            }
+
+            # 1. BM25F: tf tiap field dinormalisasi panjang lalu dijumlahkan dengan bobot field
+            for term, term_idf in idf.items():
+                tf = 0.0
+                for name, (counts, field_length, avg_length) in fields.items():
+                    b = self.field_b.get(name, 0.0)
+                    norm = 1.0 - b + b * field_length / avg_length
+                    tf += self.field_weights.get(name, 0.0) * counts[term] / norm
+                bm25f[i] += term_idf * tf / (self.k1 + tf)
+
+            proximity[i] = _proximity(query_terms, body)
+            length[i] = 1.0 - np.exp(-body_length / avg_body)
+        return {"bm25f": bm25f / max_bm25f, "proximity": proximity, "length": length}
+
+def _proximity(query_terms, tokens):
+    """Rata-rata 1 / jarak minimum pasangan term query berurutan (0 jika pasangan tidak muncul)."""
+    pairs = list(dict.fromkeys((a, b) for a, b in zip(query_terms, query_terms[1:]) if a != b))
+    if not pairs:
+        return 0.0
+    wanted = set(query_terms)
+    positions = defaultdict(list)
+    for position, token in enumerate(tokens):
+        if token in wanted:
+            positions[token].append(position)
+    total = 0.0
+    for a, b in pairs:
+        if positions[a] and positions[b]:
+            # Dua pointer di atas daftar posisi yang sudah terurut
+            pos_a, pos_b = positions[a], positions[b]
+            i = j = 0
+            best = None
+            while i < len(pos_a) and j < len(pos_b):
+                gap = abs(pos_a[i] - pos_b[j])
+                best = gap if best is None else min(best, gap)
+                if pos_a[i] < pos_b[j]:
+                    i += 1
+                else:
+                    j += 1
+            total += 1.0 / best
+    return total / len(pairs)
+
+class RerankPipeline:
+    """
+    Search dua tahap: stage 1 (retriever murah) memilih n_candidates dokumen teratas,
+    lalu reranker (fitur mahal) hanya menghitung skor kandidat tersebut.
+    Retriever: fungsi (processed_query, data, n, min_score) -> doc_ids, scores, total_hits.
+    Reranker: fungsi (query_terms, doc_ids, stage1_scores, data) -> skor akhir (0 - 1);
+    atribut opsional stage1_scale = faktor skor stage 1 di skor akhir (default 1).
+    Reranker berjalan per potongan RERANK_CHUNK kandidat (urut skor stage 1) dan berhenti
+    saat rerank_budget_ms habis; kandidat sisanya tetap di urutan stage 1 di bawah
+    kandidat yang sudah di-rerank, dengan skor stage 1 x stage1_scale yang dibatasi paling
+    tinggi skor rerank terakhir, sehingga skor akhir tetap menurun. Stage 1 tidak bisa
+    dihentikan di tengah jalan, jadi kelebihan waktunya dari stage1_budget_ms mengurangi
+    budget rerank.
+    """
+    def __init__(self, retriever=retrieve_cosine, reranker=None, n_candidates=STAGE1_CANDIDATES,
+                 stage1_budget_ms=STAGE1_BUDGET_MS, rerank_budget_ms=RERANK_BUDGET_MS,
+                 chunk_size=RERANK_CHUNK):
+        self.retriever = retriever
+        self.reranker = FeatureReranker() if reranker is None else reranker
+        self.n_candidates = n_candidates
+        self.stage1_budget_ms = stage1_budget_ms
+        self.rerank_budget_ms = rerank_budget_ms
+        self.chunk_size = chunk_size
+
+    def search(self, processed_query, data, k=10, min_score=0.0):
+        """
+        Input: processed_query (str hasil preprocessing), data (index dari load_index), k,
+               min_score (diterapkan pada skor stage 1 dan skor akhir)
+        Output: doc_ids, scores (skor akhir), total_hits (hit stage 1 dikurangi kandidat yang
+                skor akhirnya di bawah min_score), report (dict timing per tahap)
+        """
+        # 1. Stage 1: kandidat dari retriever murah
+        start = time.perf_counter()
+        with metrics.timer(*RERANK_METRIC, stage="retrieve"):
+            candidates, stage1_scores, total_hits = self.retriever(
+                processed_query, data, max(self.n_candidates, k or 0), min_score)
+        stage1_ms = (time.perf_counter() - start) * 1000
+
+        # 2. Stage 2: rerank per potongan sampai kandidat habis atau budget terpakai
+        query_terms = TOKEN_PATTERN.findall(processed_query.lower())
+        rerank_budget_ms = self.rerank_budget_ms
+        if rerank_budget_ms is not None and self.stage1_budget_ms is not None:
+            rerank_budget_ms -= max(0.0, stage1_ms - self.stage1_budget_ms)
+        scores = np.empty(0, dtype=np.float64)
+        start = time.perf_counter()
+        with metrics.timer(*RERANK_METRIC, stage="rerank"):
+            for lo in range(0, len(candidates), self.chunk_size):
+                # Potongan pertama selalu di-rerank supaya hasil teratas tetap memakai fitur
+                if (rerank_budget_ms is not None and lo > 0
+                        and (time.perf_counter() - start) * 1000 >= rerank_budget_ms):
+                    break
+                hi = lo + self.chunk_size
+                chunk_scores = self.reranker(query_terms, candidates[lo:hi], stage1_scores[lo:hi], data)
+                scores = np.concatenate((scores, chunk_scores))
+        rerank_ms = (time.perf_counter() - start) * 1000
+        n_reranked = len(scores)
+
+        # 3. Urutan akhir: kandidat yang di-rerank (skor menurun, seri per ID), lalu sisanya
+        # dengan skor stage 1 pada skala skor akhir, dibatasi skor rerank terakhir supaya
+        # tidak melebihi kandidat di atasnya; filter min_score memakai skor akhir
+        reranked = np.asarray(candidates[:n_reranked])
+        order = np.lexsort((reranked, -scores))
+        doc_ids = np.concatenate((reranked[order], candidates[n_reranked:]))
+        stage1_scale = getattr(self.reranker, "stage1_scale", 1.0)
+        tail_scores = stage1_scale * np.asarray(stage1_scores[n_reranked:])
+        if n_reranked:
+            tail_scores = np.minimum(tail_scores, scores[order][-1])
+        final_scores = np.concatenate((scores[order], tail_scores))
+        keep = final_scores >= min_score
+        total_hits -= int(np.count_nonzero(~keep))
+        doc_ids, final_scores = doc_ids[keep][:k], final_scores[keep][:k]
+
+        report = {
+            "stage1_ms": stage1_ms,
+            "rerank_ms": rerank_ms,
+            "total_ms": stage1_ms + rerank_ms,
+            "n_candidates": int(len(candidates)),
+            "n_reranked": int(n_reranked),
+            "stage1_over_budget": self.stage1_budget_ms is not None and stage1_ms > self.stage1_budget_ms,
+            "rerank_over_budget": n_reranked < len(candidates),
+        }
+        return doc_ids, final_scores, total_hits, report
+
+# Benchmark: tradeoff kualitas/latency untuk beberapa nilai n_candidates
+if __name__ == "__main__":
+    import tempfile
+    from benchmark import build_vocabulary, generate_corpus, generate_queries
+    from preprocessing import preprocess_kumpulan_dokumen
+    from retrieval import build_index
+    from index_store import save_index, load_index
+
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    candidate_sizes = [int(arg) for arg in sys.argv[2:]] or [20, 50, 100, 200, 500]
+    vocabulary = build_vocabulary()
+    docs = list(generate_corpus(n_docs, vocabulary=vocabulary))
+    processed = preprocess_kumpulan_dokumen(docs)
+    queries = [preprocess_query_pengguna(query) for query in generate_queries(30, np.array(vocabulary))]
+    vectorizer, doc_vectors = build_index(processed)
+
+    with tempfile.TemporaryDirectory() as folder:
+        save_index(folder, vectorizer, doc_vectors, [f"doc{i:06d}.txt" for i in range(n_docs)],
+                   docs, processed)
+        data = load_index(folder)
+
+        # Referensi: rerank dengan kandidat terbanyak tanpa budget
+        reference = RerankPipeline(n_candidates=max(candidate_sizes), rerank_budget_ms=None)
+        expected = [set(reference.search(query, data)[0].tolist()) for query in queries]
+
+        print(f"{'N':>6s} {'stage1 (ms)':>12s} {'rerank (ms)':>12s} {'overlap@10':>11s}")
+        for n in candidate_sizes:
+            pipeline = RerankPipeline(n_candidates=n, rerank_budget_ms=None)
+            stage1 = rerank = overlap = 0.0
+            for query, reference_ids in zip(queries, expected):
+                doc_ids, _, _, report = pipeline.search(query, data)
+                stage1 += report["stage1_ms"]
+                rerank += report["rerank_ms"]
+                overlap += len(reference_ids & set(doc_ids.tolist())) / max(len(reference_ids), 1)
+            print(f"{n:>6d} {stage1 / len(queries):>12.3f} {rerank / len(queries):>12.3f} "
+                  f"{overlap / len(queries):>11.3f}")
@@ -1,21 +1,483 @@
 # retrieval.py (Modul 3 - Indexing & Retrieval)
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import zlib
+from array import array
+from itertools import islice
+from collections import Counter, defaultdict
+import numpy as np
+from scipy.sparse import csr_matrix, diags, vstack
+from preprocessing import preprocess_kumpulan_dokumen, tokenize_satu_teks, TOKEN_PATTERN
+import metrics
 
-def build_index(processed_docs):
+# Scorer yang tersedia untuk build_index
+SCORERS = ("tfidf", "bm25", "hashing")
+
+# Jumlah kolom (bucket hash) untuk scorer "hashing" dan ukuran batch saat streaming
+DEFAULT_HASH_FEATURES = int(os.environ.get("DOUGGLE_HASH_FEATURES", 2 ** 20))
+HASH_BATCH_SIZE = 10000
+
+# Histogram metrics (nama, keterangan) untuk skoring dan search
+SCORE_METRIC = ("douggle_score_seconds", "Durasi skoring (cosine similarity / dot product BM25)")
+SEARCH_METRIC = ("douggle_search_seconds", "Durasi search per fungsi")
+
+def tokenize_processed(processed_docs):
+    """Token setiap dokumen hasil preprocessing, sama dengan tokenisasi CountVectorizer default."""
+    for document in processed_docs:
+        yield TOKEN_PATTERN.findall(document.lower())
+
+def _as_float(counts):
+    """Salinan float64 matriks frekuensi tanpa mengubah susunan indices (astype scipy mengurutkannya)."""
+    return csr_matrix((counts.data.astype(np.float64), counts.indices.copy(), counts.indptr.copy()),
+                      shape=counts.shape)
+
+def count_matrix(token_lists):
+    """
+    Matriks frekuensi term langsung dari token: ID term diberikan saat token pertama kali
+    muncul, frekuensi per dokumen dihitung dengan Counter, lalu ditambahkan ke array CSR.
+    Setara dengan CountVectorizer().fit_transform, termasuk vocabulary yang diurutkan
+    alfabetis dan susunan indices per baris (supaya normalisasi menghasilkan bit yang sama).
+    Input: iterable of list of str (bisa generator, dikonsumsi satu kali)
+    Output: counts (CSR int64), vocabulary (dict term -> kolom)
+    """
+    vocabulary = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    indices = array('q')
+    values = array('q')
+    indptr = array('q', [0])
+    for tokens in token_lists:
+        counts = Counter(map(vocabulary.__getitem__, tokens))
+        indices.extend(counts.keys())
+        values.extend(counts.values())
+        indptr.append(len(indices))
+    if not vocabulary:
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+
+    counts = csr_matrix(
+        (np.array(values, dtype=np.int64), np.array(indices, dtype=np.int64),
+         np.array(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(vocabulary))
+    )
+    counts.sort_indices()
+
+    # Kolom diurutkan alfabetis seperti CountVectorizer._sort_features
+    terms = sorted(vocabulary)
+    old_ids = np.fromiter((vocabulary[term] for term in terms), dtype=np.int64, count=len(terms))
+    map_index = np.empty(len(terms), dtype=counts.indices.dtype)
+    map_index[old_ids] = np.arange(len(terms), dtype=counts.indices.dtype)
+    counts.indices = map_index.take(counts.indices)
+    # Indices per baris tidak lagi terurut setelah dipetakan ulang
+    counts.has_sorted_indices = False
+    return counts, dict(zip(terms, range(len(terms))))
+
+class TermCounter:
+    """
+    Setara dengan CountVectorizer(vocabulary=...).transform scikit-learn (lowercase,
+    token_pattern default) untuk vocabulary yang sudah tetap, tanpa scikit-learn.
+    """
+    def __init__(self, vocabulary):
+        self.vocabulary_ = vocabulary
+
+    def transform(self, raw_documents):
+        indptr = [0]
+        indices = []
+        values = []
+        for document in raw_documents:
+            counts = {}
+            for token in TOKEN_PATTERN.findall(document.lower()):
+                term_id = self.vocabulary_.get(token)
+                if term_id is not None:
+                    counts[term_id] = counts.get(term_id, 0) + 1
+            for term_id in sorted(counts):
+                indices.append(term_id)
+                values.append(counts[term_id])
+            indptr.append(len(indices))
+        return csr_matrix(
+            (np.asarray(values, dtype=np.int64), np.asarray(indices, dtype=np.int32),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.vocabulary_))
+        )
+
+    def get_feature_names_out(self):
+        return np.asarray(sorted(self.vocabulary_, key=self.vocabulary_.get), dtype=object)
+
+def l2_normalize_rows(matrix):
+    """
+    Normalisasi L2 per baris (in-place) dengan urutan operasi yang sama seperti
+    sklearn.preprocessing.normalize untuk matriks CSR; baris nol dibiarkan.
+    """
+    row_ids = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    norms = np.sqrt(np.bincount(row_ids, weights=matrix.data * matrix.data,
+                                minlength=matrix.shape[0]))
+    norms[norms == 0] = 1.0
+    matrix.data /= norms[row_ids]
+    return matrix
+
+def smooth_idf(df, n_docs):
+    """IDF dengan smoothing: ln((1 + n) / (1 + df)) + 1 (sama dengan TfidfVectorizer)."""
+    idf = np.full(len(df), n_docs + 1, dtype=np.float64)
+    idf /= np.asarray(df, dtype=np.float64) + 1.0
+    np.log(idf, out=idf)
+    idf += 1.0
+    return idf
+
+class TfidfIndexVectorizer:
+    """
+    TF-IDF dengan hasil yang sama dengan TfidfVectorizer default scikit-learn
+    (tf mentah x idf dengan smoothing, lalu normalisasi L2), tanpa scikit-learn.
+    Bisa di-fit dari token (fit_transform_tokens) atau dibuat dari statistik
+    yang tersimpan di index_store (from_statistics).
+    """
+    def __init__(self, vocabulary=None, idf=None):
+        self._counter = TermCounter(vocabulary or {})
+        self.idf_ = idf
+
+    @classmethod
+    def from_statistics(cls, vocabulary, idf):
+        return cls(vocabulary, idf)
+
+    def fit_transform_tokens(self, token_lists):
+        counts, vocabulary = count_matrix(token_lists)
+        self._counter = TermCounter(vocabulary)
+
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        self.idf_ = smooth_idf(df, counts.shape[0])
+
+        vectors = _as_float(counts)
+        vectors.data *= self.idf_[vectors.indices]
+        return l2_normalize_rows(vectors)
+
+    def fit_transform(self, raw_documents):
+        return self.fit_transform_tokens(tokenize_processed(raw_documents))
+
+    def transform(self, raw_documents):
+        vectors = self._counter.transform(raw_documents).astype(np.float64)
+        vectors.data *= self.idf_[vectors.indices]
+        return l2_normalize_rows(vectors)
+
+    def transform_documents(self, processed_docs):
+        """Vektor dokumen dengan IDF yang sudah ada (sama seperti transform)."""
+        return self.transform(processed_docs)
+
+    @property
+    def vocabulary_(self):
+        return self._counter.vocabulary_
+
+    def get_feature_names_out(self):
+        return self._counter.get_feature_names_out()
+
+def cosine_scores(query_vectors, doc_vectors):
+    """
+    Cosine similarity (CSR, query x dokumen). Vektor dokumen TF-IDF sudah bernorma L2
+    sejak fit, jadi cukup vektor query yang dinormalisasi sebelum perkalian.
+    """
+    query_vectors = l2_normalize_rows(csr_matrix(query_vectors, dtype=np.float64, copy=True))
+    return query_vectors @ doc_vectors.T
+
+def bm25_idf(df, n_docs):
+    """IDF BM25 (varian Lucene, selalu positif): ln(1 + (n - df + 0.5) / (df + 0.5))."""
+    return np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+class BM25Vectorizer:
+    """
+    Scorer BM25 dengan antarmuka seperti TfidfVectorizer (fit_transform/transform).
+    IDF, panjang dokumen, dan faktor normalisasi panjang dihitung sekali saat fit;
+    bobot BM25 setiap (dokumen, term) disimpan di matriks sparse, sehingga skor query
+    cukup satu perkalian sparse: doc_vectors @ query_vector.T
+
+    Skala skor: skor BM25 dibagi skor maksimum yang mungkin untuk query tersebut,
+    yaitu sum(qtf * idf * (k1 + 1)). Hasilnya selalu di rentang [0, 1), sama seperti
+    cosine similarity, sehingga filter "Minimum score" tetap bermakna.
+    """
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+    def fit_transform_tokens(self, token_lists):
+        counts, vocabulary = count_matrix(token_lists)
+        self._counter = TermCounter(vocabulary)
+        tf = counts.astype(np.float64)
+        n_docs, n_terms = tf.shape
+        
+        # 1. IDF (varian Lucene, selalu positif)
+        df = np.bincount(tf.indices, minlength=n_terms)
+        self.idf_ = bm25_idf(df, n_docs)
+        
+        # 2. Panjang dokumen dan faktor normalisasi panjang
+        self.doc_len_ = np.asarray(tf.sum(axis=1)).ravel()
+        self.avgdl_ = self.doc_len_.mean() if n_docs else 0.0
+        avgdl = self.avgdl_ if self.avgdl_ > 0 else 1.0
+        self.length_norm_ = self.k1 * (1 - self.b + self.b * self.doc_len_ / avgdl)
+        
+        # 3. Bobot BM25 per entri: idf * tf * (k1 + 1) / (tf + length_norm)
+        rows = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+        weights = (self.idf_[tf.indices] * tf.data * (self.k1 + 1)
+                   / (tf.data + self.length_norm_[rows]))
+        return csr_matrix((weights, tf.indices.copy(), tf.indptr.copy()), shape=tf.shape)
+
+    def fit_transform(self, raw_documents):
+        # Tokenisasi sama dengan TfidfVectorizer default
+        return self.fit_transform_tokens(tokenize_processed(raw_documents))
+
+    @classmethod
+    def from_statistics(cls, vocabulary, idf, doc_len, k1=1.5, b=0.75):
+        """Membuat BM25Vectorizer dari statistik yang sudah tersimpan (tanpa fit ulang)."""
+        vectorizer = cls(k1=k1, b=b)
+        vectorizer._counter = TermCounter(vocabulary)
+        vectorizer.idf_ = idf
+        vectorizer.doc_len_ = doc_len
+        vectorizer.avgdl_ = doc_len.mean() if len(doc_len) else 0.0
+        avgdl = vectorizer.avgdl_ if vectorizer.avgdl_ > 0 else 1.0
+        vectorizer.length_norm_ = k1 * (1 - b + b * doc_len / avgdl)
+        return vectorizer
+
+    def fit(self, raw_documents):
+        self.fit_transform(raw_documents)
+        return self
+
+    def transform_documents(self, processed_docs):
+        """
+        Bobot BM25 dokumen dengan IDF dan avgdl yang sudah ada (tanpa fit ulang),
+        sama dengan baris fit_transform untuk dokumen yang sama.
+        """
+        tf = self._counter.transform(processed_docs).astype(np.float64)
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avgdl = self.avgdl_ if self.avgdl_ > 0 else 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+        rows = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+        weights = (self.idf_[tf.indices] * tf.data * (self.k1 + 1)
+                   / (tf.data + length_norm[rows]))
+        return csr_matrix((weights, tf.indices.copy(), tf.indptr.copy()), shape=tf.shape)
+
+    def transform(self, raw_documents):
+        """Vektor query: frekuensi term dibagi skor maksimum query (lihat skala skor)."""
+        counts = self._counter.transform(raw_documents).tocsr().astype(np.float64)
+        max_scores = counts @ (self.idf_ * (self.k1 + 1))
+        scale = np.divide(1.0, max_scores, out=np.zeros_like(max_scores), where=max_scores > 0)
+        return diags(scale) @ counts
+
+    @property
+    def vocabulary_(self):
+        return self._counter.vocabulary_
+
+    def get_feature_names_out(self):
+        return self._counter.get_feature_names_out()
+
+class HashingTfidfVectorizer:
     """
-    Fungsi untuk membangun indeks TF-IDF.
-    Input: list of strings (dokumen hasil preprocessing dari Index 2)
-    Output: vectorizer (objek TF-IDF) dan doc_vectors (matriks numerik)
+    TF-IDF tanpa vocabulary: setiap token dipetakan ke salah satu n_features kolom dengan
+    hash CRC32 (stabil antar proses), sehingga memori vocabulary tetap berapa pun jumlah
+    term unik, dan tidak ada fit global. Document frequency per kolom (df_) dan jumlah
+    dokumen (n_docs_) ditambah setiap batch (partial_fit).
+    IDF hanya dipakai di sisi query (skema SMART nnc.ntc): vektor dokumen = tf mentah
+    ternormalisasi L2, vektor query = tf x idf ternormalisasi L2. Karena bobot dokumen tidak
+    bergantung pada IDF, dokumen baru (append_documents) tidak mengubah baris yang sudah ada.
+    Term berbeda yang jatuh di kolom yang sama ikut tergabung; perbesar n_features
+    untuk mengurangi tabrakan.
+    """
+    def __init__(self, n_features=DEFAULT_HASH_FEATURES):
+        self.n_features = int(n_features)
+        self.df_ = np.zeros(self.n_features, dtype=np.int64)
+        self.n_docs_ = 0
+        self._idf = None
+
+    @classmethod
+    def from_statistics(cls, df, n_docs, idf=None):
+        """Membuat vectorizer dari df, jumlah dokumen, dan (opsional) IDF yang tersimpan."""
+        vectorizer = cls(n_features=len(df))
+        vectorizer.df_ = np.array(df, dtype=np.int64)
+        vectorizer.n_docs_ = int(n_docs)
+        vectorizer._idf = idf
+        return vectorizer
+
+    def hash_counts(self, token_lists):
+        """Matriks frekuensi (CSR int64, indices terurut) dengan kolom = hash token."""
+        indices = array('q')
+        values = array('q')
+        indptr = array('q', [0])
+        n_features = self.n_features
+        for tokens in token_lists:
+            counts = Counter(zlib.crc32(token.encode('utf-8')) % n_features for token in tokens)
+            indices.extend(counts.keys())
+            values.extend(counts.values())
+            indptr.append(len(indices))
+        counts = csr_matrix(
+            (np.array(values, dtype=np.int64), np.array(indices, dtype=np.int64),
+             np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, n_features)
+        )
+        counts.sort_indices()
+        return counts
+
+    def partial_fit(self, counts):
+        """Menambahkan document frequency satu batch matriks frekuensi."""
+        self.df_ += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs_ += counts.shape[0]
+        self._idf = None
+        return self
+
+    @property
+    def idf_(self):
+        # ln((1 + n) / (1 + df)) + 1, sama dengan TfidfIndexVectorizer;
+        # dihitung ulang hanya setelah df berubah
+        if self._idf is None:
+            self._idf = smooth_idf(self.df_, self.n_docs_)
+        return self._idf
+
+    def fit_transform_tokens(self, token_lists, batch_size=HASH_BATCH_SIZE):
+        """
+        Memproses stream token per batch: hash -> frekuensi -> df, lalu bobot dokumen batch
+        tersebut langsung dihitung (tidak perlu menunggu IDF seluruh corpus).
+        """
+        token_lists = iter(token_lists)
+        batches = []
+        while True:
+            counts = self.hash_counts(islice(token_lists, batch_size))
+            if counts.shape[0] == 0:
+                break
+            self.partial_fit(counts)
+            batches.append(l2_normalize_rows(_as_float(counts)))
+        if not self.n_docs_:
+            raise ValueError("Tidak ada dokumen untuk diindeks")
+        return vstack(batches, format='csr') if len(batches) > 1 else batches[0]
+
+    def fit_transform(self, raw_documents):
+        return self.fit_transform_tokens(tokenize_processed(raw_documents))
+
+    def append_documents(self, processed_docs):
+        """
+        Menambahkan dokumen (hasil preprocessing) ke corpus tanpa fit ulang: df diperbarui
+        dan hanya dokumen baru yang diberi bobot; baris dokumen lama tidak berubah.
+        Output: doc_vectors untuk dokumen baru saja
+        """
+        counts = self.hash_counts(tokenize_processed(processed_docs))
+        self.partial_fit(counts)
+        return l2_normalize_rows(_as_float(counts))
+
+    def transform_documents(self, processed_docs):
+        """Vektor dokumen (tf ternormalisasi L2) tanpa mengubah df."""
+        return l2_normalize_rows(_as_float(self.hash_counts(tokenize_processed(processed_docs))))
+
+    def transform(self, raw_documents):
+        """Vektor query: tf x idf (IDF saat ini) ternormalisasi L2."""
+        vectors = _as_float(self.hash_counts(tokenize_processed(raw_documents)))
+        vectors.data *= self.idf_[vectors.indices]
+        return l2_normalize_rows(vectors)
+
+    def get_feature_names_out(self):
+        """Nama kolom tidak tersimpan; hanya bucket yang terisi (untuk statistik jumlah term)."""
+        return np.flatnonzero(self.df_)
+
+def _new_vectorizer(scorer, n_features=None):
+    if scorer not in SCORERS:
+        raise ValueError(f"Scorer '{scorer}' tidak dikenal. Pilihan: {SCORERS}")
+    if scorer == "hashing":
+        return HashingTfidfVectorizer(n_features or DEFAULT_HASH_FEATURES)
+    return BM25Vectorizer() if scorer == "bm25" else TfidfIndexVectorizer()
+
+@metrics.timed("douggle_build_index_seconds", "Durasi build_index (fit_transform)")
+def build_index(processed_docs, scorer="tfidf", n_features=None):
+    """
+    Fungsi untuk membangun indeks TF-IDF (default), BM25, atau TF-IDF hashing.
+    Input: list of strings (dokumen hasil preprocessing dari Index 2),
+           scorer ("tfidf" / "bm25" / "hashing"), n_features (jumlah kolom untuk "hashing")
+    Output: vectorizer (objek TF-IDF / BM25) dan doc_vectors (matriks numerik)
     """
     # Menginisialisasi Vectorizer untuk mengubah teks menjadi angka
-    vectorizer = TfidfVectorizer()
+    vectorizer = _new_vectorizer(scorer, n_features)
     
-    # Menghitung bobot TF-IDF untuk seluruh koleksi dokumen
+    # Menghitung bobot TF-IDF / BM25 untuk seluruh koleksi dokumen
     doc_vectors = vectorizer.fit_transform(processed_docs)
     
     return vectorizer, doc_vectors
 
+@metrics.timed("douggle_build_index_seconds", "Durasi build_index (fit_transform)")
+def build_index_from_texts(raw_texts, scorer="tfidf", n_features=None):
+    """
+    Pipeline gabungan: teks mentah -> token hasil stemming (tokenize_satu_teks) ->
+    ID term -> array CSR, tanpa string hasil preprocessing di antaranya.
+    Hasilnya sama dengan build_index(preprocess_kumpulan_dokumen(raw_texts), scorer).
+    Input: iterable of str (teks mentah), scorer
+    Output: vectorizer dan doc_vectors
+    """
+    vectorizer = _new_vectorizer(scorer, n_features)
+    doc_vectors = vectorizer.fit_transform_tokens(tokenize_satu_teks(text) for text in raw_texts)
+    return vectorizer, doc_vectors
+
+def fit_statistics(processed_docs, scorer="tfidf", n_features=None):
+    """
+    Satu pass statistik corpus tanpa membangun matriks dokumen: vocabulary (alfabetis,
+    sama dengan build_index), document frequency, jumlah dan panjang dokumen.
+    Vektor dokumen bisa dibuat terpisah per bagian corpus lewat
+    vectorizer.transform_documents, dengan IDF global yang sama seperti build_index.
+    Input: iterable of str (dokumen hasil preprocessing, dikonsumsi satu kali), scorer
+    Output: vectorizer
+    """
+    vectorizer = _new_vectorizer(scorer, n_features)
+    if scorer == "hashing":
+        tokens = tokenize_processed(processed_docs)
+        while True:
+            counts = vectorizer.hash_counts(islice(tokens, HASH_BATCH_SIZE))
+            if counts.shape[0] == 0:
+                break
+            vectorizer.partial_fit(counts)
+        if not vectorizer.n_docs_:
+            raise ValueError("Tidak ada dokumen untuk diindeks")
+        return vectorizer
+
+    df = Counter()
+    doc_len = array('d')
+    for tokens in tokenize_processed(processed_docs):
+        df.update(set(tokens))
+        doc_len.append(len(tokens))
+    if not df:
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    terms = sorted(df)
+    vocabulary = dict(zip(terms, range(len(terms))))
+    df = np.fromiter((df[term] for term in terms), dtype=np.int64, count=len(terms))
+    if scorer == "bm25":
+        return BM25Vectorizer.from_statistics(vocabulary, bm25_idf(df, len(doc_len)),
+                                              np.frombuffer(doc_len, dtype=np.float64),
+                                              k1=vectorizer.k1, b=vectorizer.b)
+    return TfidfIndexVectorizer.from_statistics(vocabulary, smooth_idf(df, len(doc_len)))
+
+def term_column(vectorizer, term):
+    """Kolom term (hasil preprocessing) di doc_vectors; None jika term tidak ada di vocabulary."""
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        return int(vectorizer.hash_counts([[term]]).indices[0])
+    return vectorizer.vocabulary_.get(term)
+
+def get_scorer(vectorizer):
+    """Nama scorer yang dipakai sebuah vectorizer."""
+    if isinstance(vectorizer, BM25Vectorizer):
+        return "bm25"
+    return "hashing" if isinstance(vectorizer, HashingTfidfVectorizer) else "tfidf"
+
+@metrics.timed(*SCORE_METRIC, mode="single")
+def compute_scores(query_vector, vectorizer, doc_vectors):
+    """
+    Skor semua dokumen untuk satu vektor query (array 1 dimensi).
+    TF-IDF (termasuk hashing) memakai cosine similarity, BM25 memakai dot product
+    bobot yang sudah dihitung.
+    """
+    if isinstance(vectorizer, BM25Vectorizer):
+        return (doc_vectors @ query_vector.T).toarray().ravel()
+    return cosine_scores(query_vector, doc_vectors).toarray().ravel()
+
+@metrics.timed(*SCORE_METRIC, mode="batch")
+def compute_score_matrix(query_vectors, vectorizer, doc_vectors):
+    """
+    Skor banyak query sekaligus dalam satu perkalian sparse.
+    Output: matriks CSR (n_query x n_dokumen), hanya berisi skor yang tidak nol.
+    """
+    if isinstance(vectorizer, BM25Vectorizer):
+        scores = query_vectors @ doc_vectors.T
+    else:
+        scores = cosine_scores(query_vectors, doc_vectors)
+    scores = csr_matrix(scores)
+    scores.sort_indices()
+    return scores
+
+@metrics.timed(*SEARCH_METRIC, function="search")
 def search(query, vectorizer, doc_vectors):
     """
     Fungsi untuk mencari dokumen paling relevan berdasarkan query pengguna.
@@ -25,9 +487,8 @@ def search(query, vectorizer, doc_vectors):
     # 1. Mengubah query menjadi representasi numerik menggunakan model yang sudah ada
     query_vector = vectorizer.transform([query])
     
-    # 2. Menghitung nilai kemiripan menggunakan Cosine Similarity 
-    # flatten() digunakan untuk mengubah matriks menjadi list sederhana
-    cosine_scores = cosine_similarity(query_vector, doc_vectors).flatten()
+    # 2. Menghitung nilai kemiripan (Cosine Similarity untuk TF-IDF, BM25 ternormalisasi)
+    cosine_scores = compute_scores(query_vector, vectorizer, doc_vectors)
     
     # 3. Menggabungkan ID dokumen (indeks) dengan skornya
     # Format: [(index_0, skor_0), (index_1, skor_1), ...]
@@ -40,4 +501,86 @@ def search(query, vectorizer, doc_vectors):
     doc_ids = [res[0] for res in results]
     scores = [res[1] for res in results]
     
-    return results, doc_ids, scores
\ No newline at end of file
+    return results, doc_ids, scores
+
+def top_k(scores, k, min_score=0.0):
+    """
+    Memilih k skor tertinggi tanpa mengurutkan seluruh dokumen.
+    Dokumen dengan skor 0 atau di bawah min_score dilewati.
+    Urutan: skor menurun, seri diurutkan berdasarkan ID dokumen (sama dengan search).
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (jumlah dokumen yang lolos filter)
+    """
+    scores = np.asarray(scores).ravel()
+    
+    # 1. Kandidat: hanya dokumen dengan skor > 0 dan >= min_score
+    mask = scores > 0
+    if min_score > 0:
+        mask &= scores >= min_score
+    candidates = np.flatnonzero(mask)
+    total_hits = len(candidates)
+    
+    if k is None or k >= total_hits:
+        selected = candidates
+    elif k <= 0:
+        selected = candidates[:0]
+    else:
+        # 2. Partial selection O(N): ambil k terbesar tanpa sort penuh
+        cand_scores = scores[candidates]
+        part = np.argpartition(-cand_scores, k - 1)[:k]
+        threshold = cand_scores[part].min()
+        # Skor yang seri di batas ke-k dipilih berdasarkan ID terkecil
+        above = candidates[cand_scores > threshold]
+        ties = candidates[cand_scores == threshold][:k - len(above)]
+        selected = np.concatenate([above, ties])
+    
+    # 3. Sort hanya k kandidat: O(k log k)
+    order = np.lexsort((selected, -scores[selected]))
+    doc_ids = selected[order]
+    return doc_ids, scores[doc_ids], total_hits
+
+@metrics.timed(*SEARCH_METRIC, function="search_top_k")
+def search_top_k(query, vectorizer, doc_vectors, k=10, min_score=0.0):
+    """
+    Versi search yang hanya mengembalikan top-k dokumen.
+    Input: query (str), vectorizer (objek), doc_vectors (matriks), k, min_score
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    query_vector = vectorizer.transform([query])
+    scores = compute_scores(query_vector, vectorizer, doc_vectors)
+    return top_k(scores, k, min_score)
+
+@metrics.timed(*SEARCH_METRIC, function="search_batch")
+def search_batch(queries, vectorizer, doc_vectors, k=10, min_score=0.0,
+                 preprocess=True, batch_size=1024):
+    """
+    Mencari banyak query sekaligus.
+    Semua query dipreprocess dalam satu pass, diubah menjadi satu matriks query sparse,
+    lalu diskor dengan satu perkalian sparse per batch (batch_size membatasi memori).
+    Input: queries (list of str), vectorizer, doc_vectors, k, min_score,
+           preprocess (False jika query sudah dipreprocess)
+    Output: doc_ids_list, scores_list (list of np.ndarray per query, top-k terurut).
+            doc_ids_list bisa langsung dipakai sebagai retrieved_docs_list
+            di evaluation.evaluate_system.
+    """
+    queries = list(queries)
+    if preprocess:
+        queries = preprocess_kumpulan_dokumen(queries)
+    
+    doc_ids_list = []
+    scores_list = []
+    for start in range(0, len(queries), batch_size):
+        # 1. Satu matriks query untuk seluruh batch
+        query_vectors = vectorizer.transform(queries[start:start + batch_size])
+        
+        # 2. Satu perkalian sparse: skor semua query x semua dokumen
+        score_matrix = compute_score_matrix(query_vectors, vectorizer, doc_vectors)
+        
+        # 3. Top-k per baris, hanya dari entri yang tidak nol
+        for row in range(score_matrix.shape[0]):
+            row_start, row_end = score_matrix.indptr[row], score_matrix.indptr[row + 1]
+            row_ids = score_matrix.indices[row_start:row_end]
+            positions, scores, _ = top_k(score_matrix.data[row_start:row_end], k, min_score)
+            doc_ids_list.append(row_ids[positions])
+            scores_list.append(scores)
+    
+    return doc_ids_list, scores_list
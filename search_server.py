@@ -0,0 +1,456 @@
+# search_server.py (Modul 5 - HTTP Search Server)
+"""
+Server HTTP/JSON tanpa UI untuk Douggle, hanya memakai asyncio dari standard library.
+
+Index tidak dibangun di sini: server membuka index biner yang sudah ditulis oleh
+auto_load_system di app.py (cache/index) lewat memmap. Preprocessing dan skoring
+(CPU-bound, memegang GIL) dijalankan di process pool; setiap worker membuka index yang
+sama lewat memmap sehingga page cache dipakai bersama. Event loop dan thread di proses
+utama hanya menunggu hasil worker, jadi /health tetap dijawab selama query berat diproses.
+
+Endpoint:
+  GET  /health                              status index dan cache
+  GET  /metrics                             metrics format teks Prometheus (DOUGGLE_METRICS=1)
+  GET  /search?q=...&k=10&min_score=0       satu query
+  POST /search        {"query", "k", "min_score"}
+  POST /search_batch  {"queries", "k", "min_score"}
+  POST /reload                              buka ulang index terbaru, tukar secara atomik
+
+Jalankan: python search_server.py --port 8765
+Contoh:   curl "http://127.0.0.1:8765/search?q=machine+learning&k=5"
+"""
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from preprocessing import preprocess_query_pengguna, load_stem_cache
+from retrieval import search_batch, search_top_k, compute_scores
+from index_store import load_index
+from query_cache import QueryResultCache, cached_ranking, ranking_entry, rank_scores
+from shared_index import SharedIndex
+import metrics
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Jumlah worker process untuk preprocessing & skoring query
+SEARCH_WORKERS = 4
+# Versi index yang disimpan setiap worker: request yang masih memakai versi lama
+# setelah /reload tetap bisa dilayani
+WORKER_INDEX_VERSIONS = 2
+
+# Batas ukuran body request dan jumlah query per /search_batch
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_QUERIES = 1000
+MAX_K = 1000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HTTPError(Exception):
+    """Error yang dikirim ke client sebagai response JSON dengan status tertentu."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class IndexVersionError(Exception):
+    """Versi index yang diminta tidak lagi tersedia di worker (index diganti berulang kali)."""
+
+# State setiap worker process (diisi oleh _init_search_worker)
+_worker = {}
+
+def _init_search_worker(index_dir, stem_cache_path, metrics_enabled=False):
+    """
+    Initializer worker: kamus stem dimuat dan index dibuka (memmap) sekali per proses.
+    """
+    metrics.registry.enabled = metrics_enabled
+    metrics.reset()
+    load_stem_cache(stem_cache_path)
+    _worker["index_dir"] = index_dir
+    _worker["indexes"] = OrderedDict()
+    index = load_index(index_dir)
+    if index is not None:
+        _worker["indexes"][index["index_version"]] = index
+
+def _worker_index(index_version):
+    """Index versi tertentu di worker; dibuka ulang dari disk setelah /reload."""
+    indexes = _worker["indexes"]
+    if index_version not in indexes:
+        index = load_index(_worker["index_dir"])
+        if index is None or index["index_version"] != index_version:
+            raise IndexVersionError(f"Index versi {index_version} tidak tersedia lagi")
+        indexes[index_version] = index
+        while len(indexes) > WORKER_INDEX_VERSIONS:
+            indexes.popitem(last=False)
+    return indexes[index_version]
+
+def _worker_result(result):
+    # Metrics worker dikirim balik untuk di-merge di proses utama
+    return result, (metrics.registry.drain() if metrics.is_enabled() else None)
+
+def _worker_preprocess(query):
+    return _worker_result(preprocess_query_pengguna(query))
+
+def _worker_rank(processed_query, index_version, max_results):
+    """Array ranking (untuk QueryResultCache di proses utama) dari skor semua dokumen."""
+    index = _worker_index(index_version)
+    vectorizer = index["vectorizer"]
+    scores = compute_scores(vectorizer.transform([processed_query]), vectorizer, index["doc_vectors"])
+    return _worker_result(rank_scores(scores, max_results))
+
+def _worker_search(processed_query, index_version, k, min_score):
+    index = _worker_index(index_version)
+    return _worker_result(search_top_k(processed_query, index["vectorizer"], index["doc_vectors"],
+                                       k=k, min_score=min_score))
+
+def _worker_search_batch(queries, index_version, k, min_score):
+    index = _worker_index(index_version)
+    return _worker_result(search_batch(queries, index["vectorizer"], index["doc_vectors"],
+                                       k=k, min_score=min_score))
+
+class SearchService:
+    """
+    Logika search tanpa HTTP: index bersama (SharedIndex), query cache, dan process pool.
+    Semua method publik selain health() dipanggil di thread pool (bukan di event loop);
+    thread tersebut hanya menunggu worker process, pekerjaan CPU berjalan di worker.
+    """
+    def __init__(self, index_dir=None, stem_cache_path=None, workers=SEARCH_WORKERS):
+        cache_dir = os.path.join(current_dir, "cache")
+        self.index_dir = index_dir or os.path.join(cache_dir, "index")
+        self.stem_cache_path = stem_cache_path or os.path.join(cache_dir, "stem_cache.pkl")
+        self.query_cache = QueryResultCache(max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=600)
+        self.index = SharedIndex(self._load)
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                        initargs=(self.index_dir, self.stem_cache_path,
+                                                  metrics.is_enabled()))
+        # Thread untuk menunggu worker (beberapa per worker supaya pool selalu terisi)
+        self.executor = ThreadPoolExecutor(max_workers=workers * 4, thread_name_prefix="search")
+        self.started = time.time()
+
+    def _call(self, func, *args):
+        """Menjalankan func di worker process dan menunggu hasilnya."""
+        try:
+            result, worker_metrics = self.pool.submit(func, *args).result()
+        except IndexVersionError as e:
+            raise HTTPError(503, f"{e}; index sedang diganti, coba lagi")
+        if worker_metrics is not None:
+            metrics.registry.merge(worker_metrics)
+        return result
+
+    def _load(self):
+        """Loader SharedIndex: buka index hasil app.py dan buang cache versi lama."""
+        index = load_index(self.index_dir)
+        if index is None:
+            return False, (f"Index belum ada di {self.index_dir}. "
+                           "Jalankan app.py sekali untuk membangun index.")
+        self.query_cache.invalidate(keep_version=index["index_version"])
+        return True, index
+
+    def _get_index(self):
+        success, result, _ = self.index.get()
+        if not success:
+            raise HTTPError(503, result)
+        return result
+
+    @staticmethod
+    def _format_results(index, doc_ids, scores):
+        document_ids = index["document_ids"]
+        return [{"rank": rank, "doc_id": document_ids[int(doc_idx)], "index": int(doc_idx),
+                 "score": round(float(score), 6)}
+                for rank, (doc_idx, score) in enumerate(zip(doc_ids, scores), 1)]
+
+    def search(self, query, k=10, min_score=0.0):
+        index = self._get_index()
+        index_version = index["index_version"]
+        processed_query = self._call(_worker_preprocess, query)
+        if k > self.query_cache.max_results:
+            # k di atas kapasitas entri cache dilayani langsung
+            doc_ids, scores, total_hits = self._call(
+                _worker_search, processed_query, index_version, k, min_score)
+        else:
+            def rank(max_results):
+                return ranking_entry(*self._call(_worker_rank, processed_query, index_version, max_results))
+
+            key = (processed_query, index["manifest"]["scorer"], index_version)
+            doc_ids, scores, total_hits = cached_ranking(self.query_cache, key, rank, k, min_score)
+        return {
+            "query": query,
+            "processed_query": processed_query,
+            "total_hits": int(total_hits),
+            "results": self._format_results(index, doc_ids, scores),
+        }
+
+    def search_batch(self, queries, k=10, min_score=0.0):
+        index = self._get_index()
+        # Batch dibagi rata ke semua worker lalu digabung lagi sesuai urutan
+        size = max(1, -(-len(queries) // self.workers))
+        futures = [self.executor.submit(self._call, _worker_search_batch, queries[i:i + size],
+                                        index["index_version"], k, min_score)
+                   for i in range(0, len(queries), size)]
+        doc_ids_list, scores_list = [], []
+        for future in futures:
+            chunk_doc_ids, chunk_scores = future.result()
+            doc_ids_list.extend(chunk_doc_ids)
+            scores_list.extend(chunk_scores)
+        return {
+            "results": [{"query": query, "results": self._format_results(index, doc_ids, scores)}
+                        for query, doc_ids, scores in zip(queries, doc_ids_list, scores_list)],
+        }
+
+    def reload(self):
+        """Buka ulang index dari disk; request yang sedang berjalan tetap memakai index lama."""
+        success, result, generation = self.index.reload()
+        if not success:
+            raise HTTPError(503, result)
+        return {"status": "reloaded", "generation": generation,
+                "index_version": result["index_version"], "n_docs": len(result["document_ids"])}
+
+    def health(self):
+        state = self.index.current()
+        body = {"status": "starting", "uptime_s": round(time.time() - self.started, 1),
+                "workers": self.workers, "query_cache": self.query_cache.stats()}
+        if state is not None:
+            success, result, generation = state
+            body["generation"] = generation
+            if success:
+                body.update({"status": "ok", "index_version": result["index_version"],
+                             "scorer": result["manifest"]["scorer"],
+                             "n_docs": len(result["document_ids"])})
+            else:
+                body.update({"status": "unavailable", "error": result})
+        return body
+
+    def warm_up(self):
+        """Memuat index di proses utama dan menyalakan semua worker (index dibuka di initializer)."""
+        self.index.get()
+        for future in [self.pool.submit(_worker_result, None) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.shutdown(wait=True)
+
+def _parse_int(value, name, low, high):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"'{name}' harus bilangan bulat")
+    if not low <= value <= high:
+        raise HTTPError(400, f"'{name}' harus di antara {low} dan {high}")
+    return value
+
+def _parse_float(value, name):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"'{name}' harus angka")
+
+def _search_params(params):
+    """k dan min_score dari query string atau body JSON."""
+    return (_parse_int(params.get("k", 10), "k", 0, MAX_K),
+            _parse_float(params.get("min_score", 0.0), "min_score"))
+
+class SearchServer:
+    """
+    Server HTTP/1.1 minimal di atas asyncio.start_server (mendukung keep-alive).
+    Hanya parsing request dan routing yang berjalan di event loop.
+    """
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 = port bebas yang dipilih OS
+        self.port = self._server.sockets[0].getsockname()[1]
+        # Muat index & worker di background supaya /health langsung bisa menjawab "starting"
+        asyncio.get_running_loop().run_in_executor(self.service.executor, self.service.warm_up)
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.service.executor, func, *args)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self._dispatch(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            # Request tidak bisa diparse: kirim error lalu tutup koneksi
+            await self._write_response(writer, e.status, {"error": e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        """Output: (method, target, headers, body) atau None jika koneksi ditutup client."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Request line tidak valid")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = _parse_int(headers.get("content-length", 0), "Content-Length", 0, sys.maxsize)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Body maksimal {MAX_BODY_BYTES} byte")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, body):
+        """Routing request. Output: (status, payload dict, atau str untuk /metrics)"""
+        url = urlsplit(target)
+        routes = {
+            "/health": (("GET",), self._health),
+            "/metrics": (("GET",), self._metrics),
+            "/search": (("GET", "POST"), self._search),
+            "/search_batch": (("POST",), self._search_batch),
+            "/reload": (("POST",), self._reload),
+        }
+        start = time.perf_counter()
+        try:
+            if url.path not in routes:
+                raise HTTPError(404, f"Endpoint {url.path} tidak ada")
+            allowed, handler = routes[url.path]
+            if method not in allowed:
+                raise HTTPError(405, f"Method {method} tidak didukung untuk {url.path}")
+            if method == "GET":
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            else:
+                params = self._parse_json(body)
+            payload = await handler(params)
+            status = 200
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+        metrics.inc("douggle_http_requests_total", help_text="Request HTTP per endpoint dan status",
+                    path=url.path if url.path in routes else "other", status=status)
+        if isinstance(payload, dict):
+            payload["took_ms"] = round(elapsed * 1000, 3)
+        return status, payload
+
+    @staticmethod
+    def _parse_json(body):
+        if not body:
+            return {}
+        try:
+            params = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "Body bukan JSON yang valid")
+        if not isinstance(params, dict):
+            raise HTTPError(400, "Body JSON harus berupa object")
+        return params
+
+    async def _health(self, params):
+        return self.service.health()
+
+    async def _metrics(self, params):
+        return metrics.export_prometheus()
+
+    async def _search(self, params):
+        query = params.get("query", params.get("q"))
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "Parameter 'query' wajib diisi")
+        k, min_score = _search_params(params)
+        return await self._run(self.service.search, query, k, min_score)
+
+    async def _search_batch(self, params):
+        queries = params.get("queries")
+        if (not isinstance(queries, list) or not queries
+                or not all(isinstance(query, str) for query in queries)):
+            raise HTTPError(400, "Parameter 'queries' wajib berupa list of string")
+        if len(queries) > MAX_BATCH_QUERIES:
+            raise HTTPError(413, f"Maksimal {MAX_BATCH_QUERIES} query per batch")
+        k, min_score = _search_params(params)
+        return await self._run(self.service.search_batch, queries, k, min_score)
+
+    async def _reload(self, params):
+        return await self._run(self.service.reload)
+
+    @staticmethod
+    async def _write_response(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = "application/json; charset=utf-8"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+async def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, index_dir=None, workers=SEARCH_WORKERS):
+    """Menjalankan server sampai SIGINT/SIGTERM, lalu menunggu request yang berjalan selesai."""
+    service = SearchService(index_dir=index_dir, workers=workers)
+    server = await SearchServer(service, host, port).start()
+    print(f"Douggle search server di http://{server.host}:{server.port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C tetap menghentikan lewat KeyboardInterrupt
+            pass
+
+    serve_task = asyncio.create_task(server.serve_forever())
+    await stop.wait()
+    await server.stop()
+    serve_task.cancel()
+    service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Douggle HTTP/JSON search server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--index-dir", default=None, help="Default: cache/index")
+    parser.add_argument("--workers", type=int, default=SEARCH_WORKERS)
+    args = parser.parse_args()
+    asyncio.run(run_server(args.host, args.port, args.index_dir, args.workers))
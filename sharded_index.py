@@ -0,0 +1,233 @@
+# sharded_index.py (Modul 3f - Sharded Index)
+import os
+import sys
+import time
+import heapq
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.sparse import csr_matrix
+from preprocessing import preprocess_kumpulan_dokumen
+from retrieval import fit_statistics, get_scorer, top_k, cosine_scores
+from index_store import read_index_manifest
+
+# State shard di setiap worker process (diisi oleh _init_shard)
+_shard = {}
+
+def shard_bounds(n_docs, n_shards):
+    """
+    Membagi dokumen 0..n_docs-1 menjadi n_shards rentang berurutan dengan ukuran hampir sama.
+    Output: list of (start, end)
+    """
+    n_shards = max(1, min(n_shards, n_docs)) if n_docs else 1
+    edges = np.linspace(0, n_docs, n_shards + 1).astype(np.int64)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_shards)]
+
+def _load_shard_rows(index_dir, start, end):
+    """
+    Baris start..end-1 dari index biner (index_store) tanpa menyalin data:
+    slice dari array memmap tetap memmap, jadi worker hanya menyentuh halaman shard-nya.
+    """
+    manifest = read_index_manifest(index_dir)
+
+    def load_array(name):
+        return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode='r')
+
+    indptr = load_array("indptr")
+    lo, hi = int(indptr[start]), int(indptr[end])
+    return csr_matrix(
+        (load_array("data")[lo:hi], load_array("indices")[lo:hi],
+         np.asarray(indptr[start:end + 1]) - lo),
+        shape=(end - start, manifest["n_terms"]), copy=False
+    )
+
+def _init_shard(source, start, end, scorer, vectorizer=None):
+    """
+    Initializer worker: memuat satu shard sekali per proses. Sumber berupa matriks,
+    folder index, atau list dokumen hasil preprocessing yang divektorisasi di worker ini
+    dengan statistik global vectorizer.
+    """
+    if isinstance(source, str):
+        source = _load_shard_rows(source, start, end)
+    elif isinstance(source, list):
+        source = vectorizer.transform_documents(source)
+    _shard["doc_vectors"] = source
+    _shard["offset"] = start
+    _shard["scorer"] = scorer
+
+def _search_shard(query_vectors, k, min_score):
+    """
+    Top-k lokal satu shard untuk setiap baris query_vectors.
+    Vektor dokumen dibuat dengan IDF global, sehingga skor sama persis dengan index tunggal.
+    Output: list of (doc_ids global, scores, total_hits) per query
+    """
+    doc_vectors = _shard["doc_vectors"]
+    if _shard["scorer"] == "bm25":
+        # Urutan perkalian sama dengan retrieval.compute_scores (skor identik per bit)
+        score_matrix = csr_matrix((doc_vectors @ query_vectors.T).T)
+    else:
+        score_matrix = csr_matrix(cosine_scores(query_vectors, doc_vectors))
+    score_matrix.sort_indices()
+
+    results = []
+    for row in range(score_matrix.shape[0]):
+        row_start, row_end = score_matrix.indptr[row], score_matrix.indptr[row + 1]
+        row_ids = score_matrix.indices[row_start:row_end]
+        positions, scores, total_hits = top_k(score_matrix.data[row_start:row_end], k, min_score)
+        results.append((row_ids[positions] + _shard["offset"], scores, total_hits))
+    return results
+
+def merge_top_k(shard_results, k):
+    """
+    Menggabungkan top-k setiap shard dengan heap.
+    Setiap daftar sudah terurut (skor menurun, ID naik), jadi heapq.merge dengan key
+    (-skor, ID) menghasilkan urutan yang sama dengan top_k pada index tunggal.
+    Input: list of (doc_ids, scores, total_hits) dari setiap shard
+    Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+    """
+    total_hits = sum(hits for _, _, hits in shard_results)
+    merged = heapq.merge(*[zip((-scores).tolist(), doc_ids.tolist())
+                           for doc_ids, scores, _ in shard_results])
+    if k is not None:
+        merged = islice(merged, max(k, 0))
+    merged = list(merged)
+    doc_ids = np.array([doc_id for _, doc_id in merged], dtype=np.int64)
+    scores = -np.array([neg_score for neg_score, _ in merged], dtype=np.float64)
+    return doc_ids, scores, total_hits
+
+class ShardedIndex:
+    """
+    Index yang dibagi menjadi beberapa shard, masing-masing dilayani oleh worker process sendiri.
+    Coordinator (proses ini) hanya menyimpan vectorizer: query diubah menjadi vektor sekali,
+    dikirim ke semua shard (scatter), lalu top-k setiap shard digabung dengan heap (gather).
+    Sumber shard: doc_vectors di memori (setiap worker menerima potongan barisnya saja),
+    index_dir hasil index_store (setiap worker membuka potongannya lewat memmap), atau
+    processed_docs (setiap worker memvektorisasi dokumennya sendiri dengan IDF global).
+    """
+    def __init__(self, vectorizer, doc_vectors=None, n_shards=None, index_dir=None,
+                 processed_docs=None):
+        if sum(source is not None for source in (doc_vectors, index_dir, processed_docs)) != 1:
+            raise ValueError("Isi salah satu: doc_vectors, index_dir, atau processed_docs")
+        if processed_docs is not None:
+            processed_docs = list(processed_docs)
+            n_docs = len(processed_docs)
+        elif index_dir is not None:
+            manifest = read_index_manifest(index_dir)
+            if manifest is None:
+                raise ValueError(f"Index tidak ditemukan di {index_dir}")
+            n_docs = manifest["n_docs"]
+        else:
+            doc_vectors = csr_matrix(doc_vectors)
+            n_docs = doc_vectors.shape[0]
+
+        self.vectorizer = vectorizer
+        self.scorer = get_scorer(vectorizer)
+        self.n_docs = n_docs
+        self.bounds = shard_bounds(n_docs, n_shards or os.cpu_count() or 1)
+        self._executors = []
+        try:
+            for start, end in self.bounds:
+                if processed_docs is not None:
+                    source = processed_docs[start:end]
+                else:
+                    source = index_dir if index_dir is not None else doc_vectors[start:end]
+                self._executors.append(ProcessPoolExecutor(
+                    max_workers=1, initializer=_init_shard,
+                    initargs=(source, start, end, self.scorer,
+                              vectorizer if processed_docs is not None else None)
+                ))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def n_shards(self):
+        return len(self.bounds)
+
+    def _scatter_gather(self, query_vectors, k, min_score):
+        """Kirim matriks query ke semua shard, lalu gabungkan hasil per query."""
+        futures = [executor.submit(_search_shard, query_vectors, k, min_score)
+                   for executor in self._executors]
+        per_shard = [future.result() for future in futures]
+        return [merge_top_k([results[row] for results in per_shard], k)
+                for row in range(query_vectors.shape[0])]
+
+    def search(self, query, k=10, min_score=0.0):
+        """
+        Sama dengan retrieval.search_top_k, tetapi diskor paralel di semua shard.
+        Input: query (str, hasil preprocessing), k, min_score
+        Output: doc_ids (np.ndarray), scores (np.ndarray), total_hits (int)
+        """
+        return self._scatter_gather(self.vectorizer.transform([query]), k, min_score)[0]
+
+    def search_batch(self, queries, k=10, min_score=0.0, preprocess=True, batch_size=1024):
+        """
+        Sama dengan retrieval.search_batch: satu matriks query per batch dikirim ke setiap shard.
+        Output: doc_ids_list, scores_list (list of np.ndarray per query, top-k terurut)
+        """
+        queries = list(queries)
+        if preprocess:
+            queries = preprocess_kumpulan_dokumen(queries)
+
+        doc_ids_list = []
+        scores_list = []
+        for start in range(0, len(queries), batch_size):
+            query_vectors = self.vectorizer.transform(queries[start:start + batch_size])
+            for doc_ids, scores, _ in self._scatter_gather(query_vectors, k, min_score):
+                doc_ids_list.append(doc_ids)
+                scores_list.append(scores)
+        return doc_ids_list, scores_list
+
+    def close(self):
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def build_sharded_index(processed_docs, n_shards=None, scorer="tfidf"):
+    """
+    Satu pass document frequency (fit_statistics) untuk IDF global, lalu setiap shard
+    memvektorisasi dokumennya sendiri di worker process dengan IDF tersebut, sehingga skor
+    antar shard tetap sebanding dan matriks seluruh corpus tidak pernah dibangun di satu proses.
+    Vektor dokumen sama dengan build_index (TF-IDF sampai pembulatan floating point).
+    Input: list of strings (dokumen hasil preprocessing), n_shards (None = jumlah core), scorer
+    Output: vectorizer, ShardedIndex
+    """
+    processed_docs = list(processed_docs)
+    vectorizer = fit_statistics(processed_docs, scorer=scorer)
+    return vectorizer, ShardedIndex(vectorizer, processed_docs=processed_docs, n_shards=n_shards)
+
+# Benchmark: throughput index tunggal vs sharded untuk berbagai jumlah shard
+if __name__ == "__main__":
+    from retrieval import build_index, search_batch
+
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    shard_counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, os.cpu_count() or 1]
+    rng = np.random.default_rng(42)
+    vocab = np.array([f"kata{i}" for i in range(20000)])
+    zipf = 1.0 / np.arange(1, len(vocab) + 1)
+    zipf /= zipf.sum()
+    docs = [" ".join(rng.choice(vocab, size=rng.integers(50, 200), p=zipf)) for _ in range(n_docs)]
+    queries = [" ".join(rng.choice(vocab[:2000], size=rng.integers(2, 5))) for _ in range(2000)]
+
+    vectorizer, doc_vectors = build_index(docs)
+    start = time.perf_counter()
+    expected, _ = search_batch(queries, vectorizer, doc_vectors, k=10, preprocess=False)
+    single_qps = len(queries) / (time.perf_counter() - start)
+    print(f"{n_docs} dokumen, {len(queries)} query")
+    print(f"{'shards':>7s} {'query/s':>10s} {'speedup':>8s} {'same ranking':>13s}")
+    print(f"{'single':>7s} {single_qps:>10.1f} {1.0:>7.1f}x {'-':>13s}")
+
+    for n_shards in shard_counts:
+        with ShardedIndex(vectorizer, doc_vectors, n_shards=n_shards) as index:
+            index.search("kata1", k=10)  # tunggu semua worker siap
+            start = time.perf_counter()
+            got, _ = index.search_batch(queries, k=10, preprocess=False, batch_size=256)
+            qps = len(queries) / (time.perf_counter() - start)
+        same = all(np.array_equal(a, b) for a, b in zip(expected, got))
+        print(f"{n_shards:>7d} {qps:>10.1f} {qps / single_qps:>7.1f}x {str(same):>13s}")
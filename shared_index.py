@@ -0,0 +1,60 @@
+# shared_index.py (Modul 3e - Shared Index)
+import threading
+
+class SharedIndex:
+    """
+    Satu index read-only yang dipakai bersama oleh semua session dalam satu proses.
+    Session hanya memegang referensi ke hasil loader, bukan salinan.
+    Loader dipanggil sekali (di bawah lock), dan reload menukar hasilnya secara atomik:
+    session yang sedang berjalan tetap memakai referensi lama sampai rerun berikutnya.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._state = None  # (success, result, generation)
+
+    def get(self):
+        """
+        Mengambil index bersama, memuatnya dulu jika belum ada.
+        Jika load terakhir gagal (misalnya folder data masih kosong), load dicoba lagi.
+        Output: (success, result, generation)
+        """
+        state = self._state
+        if state is not None and state[0]:
+            return state
+        with self._lock:
+            if self._state is None or not self._state[0]:
+                self._load()
+            return self._state
+
+    def reload(self, seen_generation=None, before_load=None):
+        """
+        Memuat ulang index satu kali lalu menukarnya secara atomik.
+        seen_generation: generasi yang dilihat pemanggil; jika session lain sudah reload
+        sejak itu, reload tidak diulang. before_load: dipanggil di bawah lock sebelum load
+        (misalnya untuk menghapus cache).
+        Output: (success, result, generation)
+        """
+        with self._lock:
+            state = self._state
+            if state is not None and seen_generation is not None and state[2] != seen_generation:
+                return state
+            if before_load is not None:
+                before_load()
+            self._load()
+            return self._state
+
+    def current(self):
+        """State terakhir tanpa memicu load. Output: (success, result, generation) atau None"""
+        return self._state
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _load(self):
+        success, result = self._loader()
+        self._generation += 1
+        # Satu assignment: pembaca melihat state lama atau baru, tidak pernah campuran
+        self._state = (success, result, self._generation)
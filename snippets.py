@@ -0,0 +1,255 @@
+# snippets.py (Modul 3g - Snippet)
+import os
+import re
+import html
+import string
+import numpy as np
+from preprocessing import bersihkan_kata, stem_kata_bersih, get_stopwords
+
+# Panjang snippet (byte UTF-8) dan konteks sebelum kata pertama yang cocok
+SNIPPET_BYTES = 240
+SNIPPET_CONTEXT = 60
+
+# Nama file di folder index
+WORD_COUNTS_FILE = "word_counts.npy"
+TOKEN_TERMS_FILE = "snippet_terms"
+TOKEN_STARTS_FILE = "snippet_starts"
+TOKEN_ENDS_FILE = "snippet_ends"
+TOKEN_INDPTR_FILE = "snippet_indptr.npy"
+TERMS_FILE = "snippet_vocabulary.txt"
+
+_WORD = re.compile(r'\S+')
+_WHITESPACE = re.compile(rb'\s')
+
+def tokenize_with_offsets(text):
+    """
+    Memecah teks mentah per kata (sama seperti text.split()) dan menghitung term hasil
+    stemming setiap kata beserta posisi byte UTF-8-nya di teks.
+    Stopword dilewati karena tidak pernah menjadi bagian query yang dicocokkan.
+    Output: word_count (int), list of (term, byte_start, byte_end)
+    """
+    stopwords = get_stopwords()
+    tokens = []
+    word_count = 0
+    byte_pos = 0
+    char_pos = 0
+    for match in _WORD.finditer(text):
+        word_count += 1
+        word = match.group()
+        # Posisi byte dihitung bertahap dari posisi karakter sebelumnya
+        byte_pos += len(text[char_pos:match.start()].encode('utf-8'))
+        char_pos = match.start()
+        normalized = bersihkan_kata(word)
+        if not normalized or normalized in stopwords:
+            continue
+        # Sorot kata tanpa tanda baca di depan/belakangnya
+        core = word.strip(string.punctuation)
+        lead = word.find(core) if core else 0
+        start = byte_pos + len(word[:lead].encode('utf-8'))
+        end = start + len(core.encode('utf-8'))
+        for term in stem_kata_bersih(normalized):
+            if term:
+                tokens.append((term, start, end))
+    return word_count, tokens
+
+class SnippetIndexWriter:
+    """
+    Menulis data snippet per dokumen secara streaming, satu dokumen per add():
+    jumlah kata, serta (term ID, byte start, byte end) setiap kata non-stopword.
+    Array token disusun seperti CSR (snippet_indptr per dokumen).
+    Jika base (SnippetIndex) diberikan, data n_base_docs dokumen pertamanya (None = semua)
+    disalin apa adanya lebih dulu, sehingga hanya dokumen yang di-add() yang ditokenisasi.
+    Dokumen base lain bisa disalin satu per satu lewat add_from(); vocabulary base mendapat
+    term ID pertama, sehingga term ID yang disalin tidak perlu dipetakan ulang.
+    """
+    def __init__(self, folder, base=None, n_base_docs=None):
+        self.folder = folder
+        self._base = base
+        self._files = {name: open(os.path.join(folder, f"{name}.bin"), 'wb')
+                       for name in (TOKEN_TERMS_FILE, TOKEN_STARTS_FILE, TOKEN_ENDS_FILE)}
+        self._indptr = [0]
+        self._word_counts = []
+        self._terms = {}
+        if base is not None:
+            if n_base_docs is None:
+                n_base_docs = len(base.word_counts)
+            n_tokens = int(base.indptr[n_base_docs])
+            base.term_ids[:n_tokens].tofile(self._files[TOKEN_TERMS_FILE])
+            base.starts[:n_tokens].tofile(self._files[TOKEN_STARTS_FILE])
+            base.ends[:n_tokens].tofile(self._files[TOKEN_ENDS_FILE])
+            self._indptr = np.asarray(base.indptr[:n_base_docs + 1]).tolist()
+            self._word_counts = np.asarray(base.word_counts[:n_base_docs]).tolist()
+            self._terms = dict(base.vocabulary)
+
+    def add(self, text):
+        word_count, tokens = tokenize_with_offsets(text)
+        self._word_counts.append(word_count)
+        term_ids = [self._terms.setdefault(term, len(self._terms)) for term, _, _ in tokens]
+        self._files[TOKEN_TERMS_FILE].write(np.asarray(term_ids, dtype=np.int32).tobytes())
+        self._files[TOKEN_STARTS_FILE].write(
+            np.asarray([start for _, start, _ in tokens], dtype=np.int64).tobytes())
+        self._files[TOKEN_ENDS_FILE].write(
+            np.asarray([end for _, _, end in tokens], dtype=np.int64).tobytes())
+        self._indptr.append(self._indptr[-1] + len(tokens))
+
+    def add_from(self, doc_index):
+        """Menyalin data snippet dokumen ke-doc_index dari base tanpa tokenisasi ulang."""
+        base = self._base
+        start, end = int(base.indptr[doc_index]), int(base.indptr[doc_index + 1])
+        self._word_counts.append(int(base.word_counts[doc_index]))
+        self._files[TOKEN_TERMS_FILE].write(base.term_ids[start:end].tobytes())
+        self._files[TOKEN_STARTS_FILE].write(base.starts[start:end].tobytes())
+        self._files[TOKEN_ENDS_FILE].write(base.ends[start:end].tobytes())
+        self._indptr.append(self._indptr[-1] + end - start)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        np.save(os.path.join(self.folder, TOKEN_INDPTR_FILE),
+                np.asarray(self._indptr, dtype=np.int64))
+        np.save(os.path.join(self.folder, WORD_COUNTS_FILE),
+                np.asarray(self._word_counts, dtype=np.int64))
+        # Term tidak pernah mengandung spasi/newline, jadi cukup satu term per baris
+        with open(os.path.join(self.folder, TERMS_FILE), 'w', encoding='utf-8') as f:
+            f.write("\n".join(self._terms))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _load_bin(folder, name, dtype):
+    path = os.path.join(folder, f"{name}.bin")
+    if os.path.getsize(path) == 0:
+        # np.memmap tidak bisa membuka file kosong
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+class SnippetIndex:
+    """
+    Data snippet read-only di atas file memmap. Membuat snippet hanya membaca
+    token dokumen yang ditampilkan dan potongan byte jendela terbaik dari raw_documents,
+    bukan seluruh teks dokumen.
+    """
+    def __init__(self, folder):
+        self.word_counts = np.load(os.path.join(folder, WORD_COUNTS_FILE), mmap_mode='r')
+        self.indptr = np.load(os.path.join(folder, TOKEN_INDPTR_FILE), mmap_mode='r')
+        self.term_ids = _load_bin(folder, TOKEN_TERMS_FILE, np.int32)
+        self.starts = _load_bin(folder, TOKEN_STARTS_FILE, np.int64)
+        self.ends = _load_bin(folder, TOKEN_ENDS_FILE, np.int64)
+        with open(os.path.join(folder, TERMS_FILE), 'r', encoding='utf-8') as f:
+            content = f.read()
+        terms = content.split("\n") if content else []
+        self.vocabulary = dict(zip(terms, range(len(terms))))
+
+    def word_count(self, doc_idx):
+        return int(self.word_counts[doc_idx])
+
+    def query_term_ids(self, processed_query):
+        """ID term untuk query hasil preprocessing (term yang tidak dikenal diabaikan)."""
+        return np.array(sorted({self.vocabulary[term] for term in processed_query.split()
+                                if term in self.vocabulary}), dtype=np.int32)
+
+    def matches(self, doc_idx, query_ids):
+        """
+        Kata di dokumen yang term-nya ada di query.
+        Output: term_ids, starts, ends (np.ndarray, urut berdasarkan posisi)
+        """
+        lo, hi = int(self.indptr[doc_idx]), int(self.indptr[doc_idx + 1])
+        term_ids = np.asarray(self.term_ids[lo:hi])
+        mask = np.isin(term_ids, query_ids)
+        return term_ids[mask], np.asarray(self.starts[lo:hi])[mask], np.asarray(self.ends[lo:hi])[mask]
+
+    def snippet(self, raw_documents, doc_idx, processed_query, width=SNIPPET_BYTES):
+        """
+        Snippet HTML dari jendela sepanjang width byte yang memuat paling banyak term
+        query berbeda (lalu paling banyak kemunculan), dengan kata yang cocok diberi <mark>.
+        Input: raw_documents (StringStore), doc_idx, processed_query (str), width
+        Output: str (HTML, teks dokumen sudah di-escape)
+        """
+        if isinstance(processed_query, str):
+            processed_query = self.query_term_ids(processed_query)
+        term_ids, starts, ends = self.matches(doc_idx, processed_query)
+        return render_snippet(raw_documents, doc_idx, term_ids, starts, ends, width)
+
+def best_window(term_ids, starts, ends, width):
+    """
+    Jendela [start, start + width) yang diawali sebuah kata cocok dan memuat kata cocok
+    terbanyak (prioritas: jumlah term berbeda, lalu jumlah kemunculan).
+    Output: (indeks kata pertama, indeks setelah kata terakhir) di dalam jendela
+    """
+    # Untuk setiap kata awal i, kata terakhir yang masih muat di jendela
+    last = np.searchsorted(ends, starts + width, side='right')
+    best, best_key = (0, 0), (-1, -1)
+    for i in range(len(starts)):
+        j = max(int(last[i]), i + 1)
+        key = (len(set(term_ids[i:j].tolist())), j - i)
+        if key > best_key:
+            best, best_key = (i, j), key
+    return best
+
+def render_snippet(raw_documents, doc_idx, term_ids, starts, ends, width=SNIPPET_BYTES):
+    """Membaca jendela terbaik dari raw_documents lalu menyusun HTML dengan highlight."""
+    doc_length = raw_documents.byte_length(doc_idx)
+    if len(starts) == 0:
+        window_start, first, last = 0, 0, 0
+    else:
+        first, last = best_window(term_ids, starts, ends, width)
+        window_start = max(0, int(starts[first]) - SNIPPET_CONTEXT)
+    window_end = min(doc_length, window_start + width + SNIPPET_CONTEXT)
+    data = raw_documents.get_bytes(doc_idx, window_start, window_end)
+
+    # Potong kata yang terpotong di tepi jendela, tanpa membuang kata yang cocok
+    first_match = int(starts[first]) - window_start if len(starts) else 0
+    last_match = int(ends[last - 1]) - window_start if len(starts) else 0
+    cut_start = 0
+    if window_start > 0:
+        match = _WHITESPACE.search(data, 0, first_match)
+        cut_start = match.end() if match else 0
+    cut_end = len(data)
+    if window_end < doc_length:
+        spaces = [m.start() for m in _WHITESPACE.finditer(data, last_match)]
+        if spaces:
+            cut_end = spaces[-1]
+
+    parts = []
+    position = cut_start
+    for start, end in zip(starts[first:last], ends[first:last]):
+        start, end = int(start) - window_start, int(end) - window_start
+        if start < position or end > cut_end:
+            continue
+        parts.append(_decode(data[position:start]))
+        parts.append(f"<mark>{_decode(data[start:end])}</mark>")
+        position = end
+    parts.append(_decode(data[position:cut_end]))
+
+    text = " ".join("".join(parts).split())
+    prefix = "..." if window_start + cut_start > 0 else ""
+    suffix = "..." if window_start + cut_end < doc_length else ""
+    return prefix + text + suffix
+
+def _decode(data):
+    return html.escape(data.decode('utf-8', errors='ignore'))
+
+# Contoh penggunaan
+if __name__ == "__main__":
+    import tempfile
+    from index_store import write_strings, StringStore
+    from preprocessing import preprocess_query_pengguna
+
+    documents = [
+        "Pembelajaran mesin (machine learning) adalah cabang kecerdasan buatan. "
+        "Algoritma pembelajaran mesin mempelajari pola dari data.",
+        "Jaringan saraf tiruan digunakan untuk pengenalan gambar dan suara.",
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        write_strings(folder, "raw_documents", documents)
+        with SnippetIndexWriter(folder) as writer:
+            for document in documents:
+                writer.add(document)
+        snippets = SnippetIndex(folder)
+        raw = StringStore(folder, "raw_documents")
+        query = preprocess_query_pengguna("belajar mesin")
+        for i in range(len(documents)):
+            print(f"[{i}] {snippets.word_count(i)} kata: {snippets.snippet(raw, i, query, width=80)}")
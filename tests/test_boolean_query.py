@@ -0,0 +1,126 @@
+# tests/test_boolean_query.py (Test - Query Boolean)
+"""
+Test boolean_query.py: pohon hasil parse_boolean_query untuk AND / OR / NOT, +kata / -kata,
+kurung, dan "frasa", serta dokumen hasil search_boolean dibandingkan dengan penyaringan
+brute force pada token dokumen.
+
+Jalankan: python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boolean_query import parse_boolean_query, is_boolean_query, query_terms, search_boolean
+from inverted_index import InvertedIndex
+from positional_index import PositionalIndexWriter, PositionalIndex
+from retrieval import build_index
+
+def term(*terms):
+    return ("term", list(terms))
+
+def phrase(*terms):
+    return ("phrase", list(terms))
+
+# Dokumen hasil preprocessing (term sudah di-stem, tanpa stopword)
+PROCESSED = [
+    "data sistem informasi",
+    "machine learning data",
+    "deep learning jaring saraf",
+    "sistem web data",
+    "learning machine sistem",
+    "web desain",
+]
+
+class ParseTest(unittest.TestCase):
+    def test_and_or_precedence(self):
+        # AND mengikat lebih kuat dari OR; kata berdampingan = AND
+        self.assertEqual(parse_boolean_query("data AND sistem"),
+                         ("and", [("must", term("data")), ("must", term("sistem"))]))
+        self.assertEqual(parse_boolean_query("data OR sistem web"),
+                         ("or", [term("data"),
+                                 ("and", [("must", term("sistem")), ("must", term("web"))])]))
+
+    def test_parentheses_and_not(self):
+        self.assertEqual(parse_boolean_query("(data OR sistem) AND NOT web"),
+                         ("and", [("must", ("or", [term("data"), term("sistem")])),
+                                  ("not", term("web"))]))
+        self.assertEqual(parse_boolean_query("-(data OR web) sistem"),
+                         ("and", [("not", ("or", [term("data"), term("web")])),
+                                  ("must", term("sistem"))]))
+
+    def test_plus_minus(self):
+        # Dengan +kata, kata biasa di kelompok yang sama hanya opsional
+        self.assertEqual(parse_boolean_query("+machine learning -deep"),
+                         ("and", [("must", term("machine")), ("should", term("learning")),
+                                  ("not", term("deep"))]))
+
+    def test_quoted_phrases(self):
+        self.assertEqual(parse_boolean_query('"machine learning" AND data -"deep learning"'),
+                         ("and", [("must", phrase("machine", "learning")),
+                                  ("must", term("data")),
+                                  ("not", phrase("deep", "learning"))]))
+        # Frasa satu term sama dengan kata biasa
+        self.assertEqual(parse_boolean_query('"data"'), term("data"))
+
+    def test_is_boolean_query(self):
+        for query in ("data AND web", "data OR web", "NOT web", "+data web", "data -web",
+                      "(data web)", '-"deep learning" data'):
+            with self.subTest(query=query):
+                self.assertTrue(is_boolean_query(query))
+        for query in ("data web", '"machine learning"', "e-learning", "and or not"):
+            with self.subTest(query=query):
+                self.assertFalse(is_boolean_query(query))
+
+    def test_query_terms_skip_negated(self):
+        node = parse_boolean_query('"machine learning" OR data NOT web')
+        self.assertEqual(query_terms(node), ["machine", "learning", "data"])
+
+class SearchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.vectorizer, cls.doc_vectors = build_index(PROCESSED)
+        cls.index = InvertedIndex(cls.doc_vectors)
+        with PositionalIndexWriter(cls.tmp.name) as writer:
+            for document in PROCESSED:
+                writer.add(document)
+        cls.positions = PositionalIndex(cls.tmp.name)
+        cls.tokens = [document.split() for document in PROCESSED]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def has_phrase(self, doc_id, terms):
+        tokens = self.tokens[doc_id]
+        return any(tokens[i:i + len(terms)] == terms for i in range(len(tokens) - len(terms) + 1))
+
+    def assert_documents(self, query, predicate):
+        doc_ids, _, total_hits = search_boolean(query, self.vectorizer, self.doc_vectors,
+                                                self.index, k=None, positions=self.positions)
+        expected = {doc_id for doc_id, tokens in enumerate(self.tokens) if predicate(doc_id, tokens)}
+        self.assertEqual(set(doc_ids.tolist()), expected)
+        self.assertEqual(total_hits, len(expected))
+
+    def test_boolean_matches_brute_force(self):
+        cases = {
+            "data AND sistem": lambda d, t: "data" in t and "sistem" in t,
+            "data OR web": lambda d, t: "data" in t or "web" in t,
+            "(data OR sistem) AND NOT web":
+                lambda d, t: ("data" in t or "sistem" in t) and "web" not in t,
+            "+learning -deep": lambda d, t: "learning" in t and "deep" not in t,
+            '"machine learning"': lambda d, t: self.has_phrase(d, ["machine", "learning"]),
+            '"machine learning" OR web':
+                lambda d, t: self.has_phrase(d, ["machine", "learning"]) or "web" in t,
+            'learning -"deep learning"':
+                lambda d, t: "learning" in t and not self.has_phrase(d, ["deep", "learning"]),
+        }
+        for query, predicate in cases.items():
+            with self.subTest(query=query):
+                self.assert_documents(query, predicate)
+
+if __name__ == "__main__":
+    unittest.main()
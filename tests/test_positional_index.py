@@ -0,0 +1,126 @@
+# tests/test_positional_index.py (Test - Positional Index)
+"""
+Test positional_index.py: round-trip variable-byte encoding, dan phrase_documents
+dibandingkan dengan pencarian frasa brute force pada corpus acak (termasuk index yang
+ditulis lewat beberapa run dan yang menyalin dokumen dari index lama).
+
+Jalankan: python -m unittest discover tests
+"""
+import os
+import sys
+import random
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from positional_index import (encode_varints, decode_varints, PositionalIndexWriter,
+                              PositionalIndex)
+
+def random_corpus(rng, n_docs, n_words=12, max_len=40):
+    """Kosakata kecil supaya frasa sering muncul (termasuk term berulang dalam dokumen)."""
+    words = [f"w{i}" for i in range(n_words)]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, max_len)))
+            for _ in range(n_docs)]
+
+def brute_force_phrase(documents, terms):
+    """Dokumen (dan jumlah kemunculan) yang memuat terms berurutan."""
+    doc_ids, counts = [], []
+    for doc_id, document in enumerate(documents):
+        tokens = document.split()
+        count = sum(tokens[start:start + len(terms)] == terms
+                    for start in range(len(tokens) - len(terms) + 1))
+        if count:
+            doc_ids.append(doc_id)
+            counts.append(count)
+    return doc_ids, counts
+
+def write_positional(folder, documents, spill_tokens, base=None, sources=None):
+    with PositionalIndexWriter(folder, base=base, spill_tokens=spill_tokens) as writer:
+        for i, document in enumerate(documents):
+            if sources is not None and sources[i] is not None:
+                writer.add_from(sources[i])
+            else:
+                writer.add(document)
+    return PositionalIndex(folder)
+
+class VarintTest(unittest.TestCase):
+    def test_round_trip(self):
+        values = np.array([0, 1, 127, 128, 255, 300, 16383, 16384, 2 ** 21, 2 ** 28 - 1,
+                           2 ** 28, 2 ** 35 + 12345, 7], dtype=np.int64)
+        data, n_bytes = encode_varints(values)
+        self.assertEqual(int(n_bytes.sum()), len(data))
+        self.assertEqual(n_bytes.tolist(), [1, 1, 1, 2, 2, 2, 2, 3, 4, 4, 5, 6, 1])
+        decoded, ends = decode_varints(data)
+        np.testing.assert_array_equal(decoded, values)
+        np.testing.assert_array_equal(ends, np.cumsum(n_bytes) - 1)
+
+    def test_random_round_trip(self):
+        values = np.random.default_rng(0).integers(0, 2 ** 40, size=5000)
+        decoded, _ = decode_varints(encode_varints(values)[0])
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_empty(self):
+        data, n_bytes = encode_varints([])
+        self.assertEqual(len(data), 0)
+        self.assertEqual(len(decode_varints(data)[0]), 0)
+
+class PhraseQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rng = random.Random(42)
+        self.documents = random_corpus(self.rng, 200)
+        self.queries = [["w1", "w2"], ["w3", "w3"], ["w0", "w5", "w7"], ["w4"],
+                        ["w2", "w9", "w2", "w9"], ["w1", "tidak_ada"]]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_matches_brute_force(self, index, documents):
+        for terms in self.queries:
+            with self.subTest(terms=terms):
+                doc_ids, counts = index.phrase_documents(terms)
+                expected_ids, expected_counts = brute_force_phrase(documents, terms)
+                self.assertEqual(doc_ids.tolist(), expected_ids)
+                self.assertEqual(counts.tolist(), expected_counts)
+
+    def test_single_run(self):
+        index = write_positional(self.tmp.name, self.documents, spill_tokens=10 ** 9)
+        self.assert_matches_brute_force(index, self.documents)
+
+    def test_spilled_runs(self):
+        # Satu run per beberapa dokumen: hasil penggabungan run harus sama
+        index = write_positional(self.tmp.name, self.documents, spill_tokens=50)
+        self.assert_matches_brute_force(index, self.documents)
+
+    def test_candidates(self):
+        index = write_positional(self.tmp.name, self.documents, spill_tokens=10 ** 9)
+        candidates = np.arange(0, len(self.documents), 3)
+        doc_ids, _ = index.phrase_documents(["w1", "w2"], candidates=candidates)
+        expected, _ = brute_force_phrase(self.documents, ["w1", "w2"])
+        self.assertEqual(doc_ids.tolist(), [doc_id for doc_id in expected if doc_id % 3 == 0])
+
+    def test_copied_documents(self):
+        # Index baru: sebagian dokumen disalin dari index lama (add_from), sebagian baru
+        base_folder = os.path.join(self.tmp.name, "base")
+        os.makedirs(base_folder)
+        base = write_positional(base_folder, self.documents, spill_tokens=80)
+        new_documents, sources = [], []
+        for i, document in enumerate(self.documents):
+            if i % 5 == 0:
+                continue
+            if i % 7 == 0:
+                new_documents.append(random_corpus(self.rng, 1)[0])
+                sources.append(None)
+            else:
+                new_documents.append(document)
+                sources.append(i)
+        folder = os.path.join(self.tmp.name, "new")
+        os.makedirs(folder)
+        index = write_positional(folder, new_documents, spill_tokens=80, base=base,
+                                 sources=sources)
+        self.assert_matches_brute_force(index, new_documents)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_retrieval.py (Test - Indexing & Retrieval)
+"""
+Test build_index terhadap baseline TF-IDF: TfidfVectorizer scikit-learn (jika terpasang)
+dan rumus referensi NumPy, serta pipeline gabungan build_index_from_texts.
+
+Jalankan: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+from collections import Counter
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import preprocess_kumpulan_dokumen
+from retrieval import build_index, build_index_from_texts
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except ImportError:
+    TfidfVectorizer = None
+
+# Dokumen hasil preprocessing (term berulang, term di satu dokumen saja, dokumen pendek)
+PROCESSED = [
+    "sistem informasi sistem data",
+    "data mining data data gudang",
+    "jaring saraf tiru ajar mesin",
+    "ajar mesin data sistem",
+    "resep nasi goreng",
+]
+
+RAW = [
+    "Sistem informasi akademik menyimpan data mahasiswa.",
+    "Pembelajaran mesin memakai jaringan saraf tiruan.",
+    "Data mining menggali pola dari gudang data.",
+]
+
+def reference_tfidf(documents):
+    """TF-IDF referensi: tf mentah x (ln((1 + n) / (1 + df)) + 1), dinormalisasi L2 per baris."""
+    tokens = [document.split() for document in documents]
+    vocabulary = sorted({term for doc_tokens in tokens for term in doc_tokens})
+    columns = {term: i for i, term in enumerate(vocabulary)}
+    tf = np.zeros((len(documents), len(vocabulary)))
+    for row, doc_tokens in enumerate(tokens):
+        for term, count in Counter(doc_tokens).items():
+            tf[row, columns[term]] = count
+    df = (tf > 0).sum(axis=0)
+    vectors = tf * (np.log((1 + len(documents)) / (1 + df)) + 1)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return columns, vectors
+
+class TfidfBaselineTest(unittest.TestCase):
+    def test_matches_reference_formula(self):
+        vectorizer, doc_vectors = build_index(PROCESSED)
+        vocabulary, expected = reference_tfidf(PROCESSED)
+        self.assertEqual(vectorizer.vocabulary_, vocabulary)
+        np.testing.assert_allclose(doc_vectors.toarray(), expected, rtol=1e-12, atol=1e-15)
+
+    @unittest.skipIf(TfidfVectorizer is None, "scikit-learn tidak terpasang")
+    def test_matches_sklearn(self):
+        vectorizer, doc_vectors = build_index(PROCESSED)
+        baseline = TfidfVectorizer()
+        expected = baseline.fit_transform(PROCESSED)
+        self.assertEqual(vectorizer.vocabulary_, baseline.vocabulary_)
+        np.testing.assert_allclose(vectorizer.idf_, baseline.idf_, rtol=1e-12)
+        np.testing.assert_allclose(doc_vectors.toarray(), expected.toarray(), rtol=1e-12, atol=1e-15)
+        # Vektor query juga sama dengan transform scikit-learn
+        query = ["data sistem sistem", "kata tidak dikenal"]
+        np.testing.assert_allclose(vectorizer.transform(query).toarray(),
+                                   baseline.transform(query).toarray(), rtol=1e-12, atol=1e-15)
+
+    def test_single_pass_pipeline_matches_preprocessed(self):
+        for scorer in ("tfidf", "bm25", "hashing"):
+            with self.subTest(scorer=scorer):
+                expected_vectorizer, expected = build_index(preprocess_kumpulan_dokumen(RAW),
+                                                            scorer=scorer)
+                vectorizer, doc_vectors = build_index_from_texts(RAW, scorer=scorer)
+                if scorer != "hashing":
+                    self.assertEqual(vectorizer.vocabulary_, expected_vectorizer.vocabulary_)
+                self.assertEqual((doc_vectors != expected).nnz, 0)
+
+if __name__ == "__main__":
+    unittest.main()
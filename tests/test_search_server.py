@@ -0,0 +1,148 @@
+# tests/test_search_server.py (Test - HTTP Search Server)
+"""
+Test end-to-end search_server.py dengan client standard library (http.client):
+server dijalankan di thread terpisah dengan index kecil di folder sementara.
+
+Jalankan: python -m unittest discover tests
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import preprocess_kumpulan_dokumen
+from retrieval import build_index
+from index_store import save_index
+import search_server
+from search_server import SearchService, SearchServer
+
+DOCUMENTS = [
+    ("doc_a", "Machine learning adalah cabang kecerdasan buatan"),
+    ("doc_b", "Deep learning memakai jaringan saraf tiruan"),
+    ("doc_c", "Resep nasi goreng dengan telur dan kecap"),
+]
+
+def write_index(index_dir, documents):
+    document_ids = [doc_id for doc_id, _ in documents]
+    raw_documents = [text for _, text in documents]
+    processed = preprocess_kumpulan_dokumen(raw_documents)
+    vectorizer, doc_vectors = build_index(processed)
+    save_index(index_dir, vectorizer, doc_vectors, document_ids, raw_documents, processed)
+
+class SearchServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.index_dir = os.path.join(cls.tmp.name, "index")
+        write_index(cls.index_dir, DOCUMENTS)
+
+        # 1. Server di event loop milik thread terpisah, port 0 = port bebas
+        cls.service = SearchService(index_dir=cls.index_dir,
+                                    stem_cache_path=os.path.join(cls.tmp.name, "stem_cache.pkl"),
+                                    workers=2)
+        cls.loop = asyncio.new_event_loop()
+        cls.server = cls.loop.run_until_complete(SearchServer(cls.service, port=0).start())
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        # 2. Tunggu index dan semua worker siap
+        asyncio.run_coroutine_threadsafe(cls._wait_ready(), cls.loop).result(timeout=120)
+
+    @classmethod
+    async def _wait_ready(cls):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(cls.service.executor, cls.service.warm_up)
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.stop(), cls.loop).result(timeout=30)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(timeout=30)
+        cls.service.close()
+        cls.loop.close()
+        cls.tmp.cleanup()
+
+    def request(self, method, path, body=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=60)
+        try:
+            if body is not None and not isinstance(body, bytes):
+                body = json.dumps(body).encode('utf-8')
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode('utf-8'))
+        finally:
+            connection.close()
+
+    def test_health(self):
+        status, body = self.request("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "ok")
+        self.assertEqual(body["workers"], 2)
+        self.assertGreaterEqual(body["n_docs"], len(DOCUMENTS))
+
+    def test_search_get_and_post(self):
+        status, body = self.request("GET", "/search?q=machine+learning&k=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["results"][0]["doc_id"], "doc_a")
+        self.assertLessEqual(len(body["results"]), 2)
+
+        # Query yang sama lewat POST dilayani dari query cache dengan hasil yang sama
+        status, posted = self.request("POST", "/search", {"query": "machine learning", "k": 2})
+        self.assertEqual(status, 200)
+        self.assertEqual(posted["results"], body["results"])
+
+    def test_search_large_k(self):
+        k = self.service.query_cache.max_results + 1
+        status, body = self.request("GET", f"/search?q=nasi+goreng&k={k}")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["results"][0]["doc_id"], "doc_c")
+
+    def test_search_batch(self):
+        queries = ["machine learning", "nasi goreng", "jaringan saraf"]
+        status, body = self.request("POST", "/search_batch", {"queries": queries, "k": 1})
+        self.assertEqual(status, 200)
+        self.assertEqual([item["query"] for item in body["results"]], queries)
+        self.assertEqual([item["results"][0]["doc_id"] for item in body["results"]],
+                         ["doc_a", "doc_c", "doc_b"])
+
+    def test_reload(self):
+        _, before = self.request("GET", "/health")
+        write_index(self.index_dir, DOCUMENTS + [("doc_d", "Sate ayam bumbu kacang khas Madura")])
+        status, body = self.request("POST", "/reload")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["n_docs"], len(DOCUMENTS) + 1)
+        self.assertNotEqual(body["index_version"], before["index_version"])
+
+        # Worker membuka versi baru dari disk pada request berikutnya
+        status, body = self.request("GET", "/search?q=sate+ayam")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["results"][0]["doc_id"], "doc_d")
+
+    def test_errors(self):
+        cases = [
+            ("GET", "/search", None, 400),
+            ("GET", "/search?q=data&k=abc", None, 400),
+            ("GET", f"/search?q=data&k={search_server.MAX_K + 1}", None, 400),
+            ("GET", "/search?q=data&min_score=x", None, 400),
+            ("POST", "/search", b"{bukan json", 400),
+            ("POST", "/search", b"[1, 2]", 400),
+            ("POST", "/search_batch", {"queries": "data"}, 400),
+            ("POST", "/search_batch", {"queries": ["data"] * (search_server.MAX_BATCH_QUERIES + 1)}, 413),
+            ("GET", "/tidak_ada", None, 404),
+            ("GET", "/search_batch", None, 405),
+            ("DELETE", "/search", None, 405),
+        ]
+        for method, path, body, expected in cases:
+            with self.subTest(method=method, path=path):
+                status, payload = self.request(method, path, body)
+                self.assertEqual(status, expected)
+                self.assertIn("error", payload)
+
+if __name__ == "__main__":
+    unittest.main()